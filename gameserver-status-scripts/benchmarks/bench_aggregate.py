@@ -0,0 +1,84 @@
+"""Benchmark: Dashboard-Seitenaufruf über N Instanzen – N x /players vs. 1 x /api/all/players.
+
+Legt `--instances` JSON-Dateien mit je `--players` Spielern und eine config.ini an, registriert
+die Endpunkte wie app.py und misst im Prozess (Flask-Testclient, ohne Netzwerk) die Serverzeit pro
+Seitenaufruf: einmal N Einzelanfragen, einmal die zusammengefasste Antwort (Cache-Treffer)
+und einmal die zusammengefasste Antwort direkt nach der Änderung einer Instanz.
+Über das Netzwerk kommen zu den N Einzelanfragen noch N Round-Trips hinzu.
+
+Aufruf:  python3 benchmarks/bench_aggregate.py [--instances 20] [--players 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flask_api"))
+from flask import Flask
+from modules import game_api
+from modules.instance_registry import InstanceRegistry
+
+
+def write_players(path, count, offset=0):
+    players = [{"id": i, "name": f"Player{i + offset}", "permissions": [], "role": "Admin" if i % 10 == 0 else "Community",
+                "last_seen": 1700000000.0} for i in range(count)]
+    with open(path, "w") as f:
+        json.dump(players, f)
+
+
+def measure(label, func, repeat=200):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<44} {statistics.median(samples):>8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--players", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.ini")
+        with open(config_path, "w") as f:
+            f.write(f"[main]\nenabled_instances = {', '.join(f'instance{i}' for i in range(args.instances))}\n")
+            for index in range(args.instances):
+                path = os.path.join(tmp, f"instance{index}.json")
+                write_players(path, args.players)
+                f.write(f"[instance{index}]\nmodule = enshrouded\napi_endpoint = instance{index}\njson_path = {path}\n")
+        registry = InstanceRegistry(config_path)
+        registry.load()
+        app = Flask(__name__)
+        app.register_blueprint(game_api.create_blueprint(registry))
+        client = app.test_client()
+        first_cache = registry.state.instances["instance0"].player_cache
+
+        def page_single():
+            for index in range(args.instances):
+                client.get(f"/api/instance{index}/players")
+
+        changes = [0]
+
+        def page_after_change():
+            # Eine Instanz ändert sich; ihr Cache wird wie vom ChangeNotifier sofort aktualisiert.
+            changes[0] += 1
+            write_players(first_cache.json_path, args.players, changes[0])
+            first_cache.refresh()
+            client.get("/api/all/players")
+
+        print(f"{args.instances} Instanzen mit je {args.players} Spielern, Serverzeit pro Seitenaufruf:")
+        measure(f"{args.instances} x /api/<instanz>/players", page_single)
+        measure("1 x /api/all/players (Cache-Treffer)", lambda: client.get("/api/all/players"))
+        measure("1 x /api/all/summary?role=Admin", lambda: client.get("/api/all/summary?role=Admin"))
+        measure("1 x /api/all/players (nach Änderung)", page_after_change, repeat=50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark: Startzeit und Speicher der Flask-API mit vielen konfigurierten Instanzen.
+
+Legt `--instances` Instanzen (abwechselnd Enshrouded und Valheim, je eine JSON-Datei mit
+`--players` Spielern) in einer Test-config.ini an und misst:
+
+-   den Import von app.py in einem frischen Prozess (Zeit, Anzahl URL-Regeln, max. RSS),
+-   gunicorn mit `--workers` gevent-Workern, ohne und mit `--preload`: Zeit bis zur ersten
+    Antwort der letzten Instanz sowie RSS und PSS (anteilig geteilter Speicher) von Master
+    und Workern, nachdem jede Instanz einmal abgefragt wurde (Linux, /proc),
+-   mit `--reload` zusätzlich, wie lange eine neu in die config.ini eingetragene Instanz
+    bis zur ersten Antwort braucht (ohne Neustart).
+
+Vorher/Nachher-Vergleich wie bei load_test_api.py über `--app-dir`.
+
+Aufruf:  python3 benchmarks/bench_boot.py [--instances 100] [--workers 3] [--reload]
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_test_api import BASE_DIR, free_port
+
+GAMES = ("enshrouded", "valheim")
+
+
+def write_config(app_dir, tmp, instances, players):
+    lines = [f"[main]\nenabled_instances = {', '.join(f'inst{i}' for i in range(instances))}\n"]
+    for index in range(instances):
+        json_path = os.path.join(tmp, f"inst{index}.json")
+        with open(json_path, "w") as f:
+            json.dump([{"id": i, "name": f"Player{i}", "role": "Community", "last_seen": 1700000000.0}
+                       for i in range(players)], f)
+        lines.append(f"[inst{index}]\nmodule = {GAMES[index % 2]}\napi_endpoint = inst{index}\njson_path = {json_path}\n")
+    with open(os.path.join(app_dir, "config.ini"), "w") as f:
+        f.write("\n".join(lines))
+
+
+def add_instance(app_dir, tmp, name):
+    """Trägt eine weitere Instanz in die config.ini ein (wie ein Administrator im laufenden Betrieb)."""
+    json_path = os.path.join(tmp, f"{name}.json")
+    with open(json_path, "w") as f:
+        json.dump([], f)
+    path = os.path.join(app_dir, "config.ini")
+    with open(path) as f:
+        lines = f.read().split("\n")
+    lines = [f"{line}, {name}" if line.startswith("enabled_instances") else line for line in lines]
+    lines.append(f"[{name}]\nmodule = enshrouded\napi_endpoint = {name}\njson_path = {json_path}\n")
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def measure_import(app_dir):
+    code = ("import resource, time; start = time.perf_counter(); import app; "
+            "print(time.perf_counter() - start, len(list(app.app.url_map.iter_rules())), "
+            "resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=app_dir, capture_output=True, text=True, check=True)
+    seconds, rules, max_rss_kib = result.stdout.split()[-3:]
+    return float(seconds), int(rules), int(max_rss_kib) / 1024
+
+
+def get_status(port, path):
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", path)
+        status = conn.getresponse().status
+        conn.close()
+        return status
+    except OSError:
+        return None
+
+
+def wait_for(port, path, timeout=30.0):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if get_status(port, path) == 200:
+            return time.perf_counter() - start
+        time.sleep(0.02)
+    raise RuntimeError(f"{path} antwortet nicht")
+
+
+def memory_kib(pid):
+    """(RSS, PSS) eines Prozesses in KiB aus /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0])
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure_gunicorn(app_dir, tmp, args, extra):
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn", "--workers", str(args.workers), "--worker-class", "gevent",
+                                *extra, "--bind", f"127.0.0.1:{port}", "app:app"],
+                               cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port, f"/api/inst{args.instances - 1}/players")
+        boot = time.perf_counter() - start
+        # Jede Instanz mehrmals abfragen, damit alle Worker ihre Caches gefüllt haben.
+        for _ in range(args.workers * 2):
+            for index in range(args.instances):
+                get_status(port, f"/api/inst{index}/players")
+        master = memory_kib(process.pid)
+        workers = [memory_kib(pid) for pid in children(process.pid)]
+        reload_seconds = None
+        if args.reload:
+            add_instance(app_dir, tmp, "neu")
+            reload_seconds = wait_for(port, "/api/neu/players")
+    finally:
+        process.terminate()
+        process.wait()
+    return boot, master, workers, reload_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.path.join(BASE_DIR, "flask_api"))
+    parser.add_argument("--instances", type=int, default=100)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--reload", action="store_true", help="Neue Instanz ohne Neustart übernehmen")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_dir = os.path.join(tmp, "flask_api")
+        shutil.copytree(args.app_dir, app_dir, ignore=shutil.ignore_patterns("venv", "__pycache__"))
+        write_config(app_dir, tmp, args.instances, args.players)
+
+        seconds, rules, max_rss = measure_import(app_dir)
+        print(f"{args.instances} Instanzen, {args.workers} gevent-Worker")
+        print(f"Import app.py:   {seconds * 1000:.0f} ms, {rules} URL-Regeln, max. RSS {max_rss:.1f} MiB")
+        print(f"{'Variante':<20} {'Start':>8} {'RSS MiB':>9} {'PSS MiB':>9} {'Neue Instanz':>13}")
+        for label, extra in (("gunicorn", []), ("gunicorn --preload", ["--preload"])):
+            write_config(app_dir, tmp, args.instances, args.players)
+            boot, master, workers, reload_seconds = measure_gunicorn(app_dir, tmp, args, extra)
+            rss = (master[0] + sum(worker[0] for worker in workers)) / 1024
+            pss = (master[1] + sum(worker[1] for worker in workers)) / 1024
+            reload_text = "-" if reload_seconds is None else f"{reload_seconds * 1000:.0f} ms"
+            print(f"{label:<20} {boot:>7.2f}s {rss:>9.1f} {pss:>9.1f} {reload_text:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark: Neustart mit Checkpoint vs. Replay des ganzen Logs.
+
+Erzeugt ein Valheim-Log mit `--size-mb` MiB und `--players` Spielern. Ein erster Parser
+verarbeitet alles bis auf die letzten `--delta-lines` Zeilen (wie vor einem Absturz) und
+schreibt einen Checkpoint. Danach wird der Neustart gemessen: ohne Checkpoint per
+replay_log über die ganze Datei, mit Checkpoint per restore_checkpoint und Nachlesen
+des Deltas ab dem gespeicherten Offset. Beide Wege müssen denselben Zustand ergeben wie
+eine ununterbrochene Verarbeitung. Dazu Größe und Schreibdauer eines Checkpoints.
+
+Aufruf:  python3 benchmarks/bench_checkpoint.py [--size-mb 256] [--players 500] [--delta-lines 5000]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loggen import valheim_lines
+from parser_core.checkpoint import restore_checkpoint
+from parser_core.games import GAME_PARSERS
+from parser_core.replay import replay_log
+from parser_core.tail import FileFollower
+
+AVERAGE_LINE_BYTES = 55
+
+
+def new_parser(tmp, name, checkpoint=True):
+    settings = {
+        "output_json_path": os.path.join(tmp, f"{name}.json"),
+        "json_flush_interval_seconds": "3600",
+        "admin_list_path": os.path.join(tmp, "adminlist.txt"),
+    }
+    if checkpoint:
+        settings["checkpoint_path"] = os.path.join(tmp, "checkpoint.json")
+    return GAME_PARSERS["valheim"](settings, name)
+
+
+def follow_to_end(parser, path, start_position):
+    """Liest wie das Live-Tail bis zum Dateiende."""
+    follower = parser.log_follower = FileFollower(path, log=parser.logger, start_position=start_position)
+    follower.open()
+    while True:
+        lines = follower.read_lines()
+        if not lines:
+            break
+        parser.process_log_lines(lines)
+    follower.close()
+
+
+def state_of(parser):
+    return sorted(parser.store.active_players)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--delta-lines", type=int, default=5000)
+    args = parser.parse_args()
+    # Hunderttausende An- und Abmeldungen nicht einzeln protokollieren.
+    logging.disable(logging.WARNING)
+
+    count = args.size_mb * 1048576 // AVERAGE_LINE_BYTES
+    lines = list(valheim_lines(count, players=args.players, noise_ratio=0.9))
+    head, delta = lines[:-args.delta_lines], lines[-args.delta_lines:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as f:
+            f.write("\n".join(head) + "\n")
+        print(f"{len(lines):,} Zeilen ({os.path.getsize(log_path) / 1048576:.0f} MiB vor dem Absturz), "
+              f"{args.delta_lines:,} Zeilen danach")
+
+        reference = new_parser(tmp, "reference", checkpoint=False)
+        reference.process_log_lines(lines)
+
+        before_crash = new_parser(tmp, "before-crash")
+        follow_to_end(before_crash, log_path, (os.stat(log_path).st_ino, 0))
+        started = time.perf_counter()
+        before_crash.checkpoint.save()
+        save_ms = (time.perf_counter() - started) * 1000
+        size = os.path.getsize(before_crash.checkpoint.path)
+        print(f"Checkpoint: {len(before_crash.store.active_players)} Spieler online, {size / 1024:.1f} KiB, "
+              f"{save_ms:.2f} ms pro Sicherung (inkl. fsync)")
+
+        with open(log_path, "a") as f:
+            f.write("\n".join(delta) + "\n")
+
+        print(f"{'Neustart':<26} {'Sekunden':>9} {'Zustand':>8}")
+        replayed = new_parser(tmp, "replay", checkpoint=False)
+        started = time.perf_counter()
+        position = replay_log(replayed, log_path, include_archives=False)
+        follow_to_end(replayed, log_path, position)
+        elapsed = time.perf_counter() - started
+        print(f"{'Replay der ganzen Datei':<26} {elapsed:>9.3f} {'gleich' if state_of(replayed) == state_of(reference) else 'ANDERS':>8}")
+
+        restored = new_parser(tmp, "restored")
+        started = time.perf_counter()
+        position = restore_checkpoint(restored, log_path)
+        follow_to_end(restored, log_path, position)
+        elapsed = time.perf_counter() - started
+        same = json.dumps(restored.store.to_state()) == json.dumps(reference.store.to_state())
+        print(f"{'Checkpoint + Delta':<26} {elapsed:>9.3f} {'gleich' if same else 'ANDERS':>8}")
+
+
+if __name__ == "__main__":
+    main()
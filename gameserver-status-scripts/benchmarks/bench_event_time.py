@@ -0,0 +1,214 @@
+"""Benchmark: Ereigniszeit aus der Logzeile statt der Verarbeitungszeit beim Aufholen eines Rückstands.
+
+Erzeugt ein Valheim-Log über `--hours` Stunden mit `--players` Spielern: Connect und Login
+liegen 2–50 s auseinander, jeder vierte Login kommt zu spät (70–110 s, außerhalb des
+60-s-Fensters), angemeldete Spieler spawnen alle paar Minuten neu, manche Sessions enden
+ohne Disconnect (Absturz, Timeout 600 s). Dazu `--noise-per-second` Rauschzeilen pro
+Sekunde. Das Log endet jetzt.
+
+Referenz ist replay_log über die Datei. Danach wird dasselbe Log so schnell wie möglich
+live verarbeitet (wie nach einem Neustart mit Rückstand), als Datei und als Docker-Stream
+mit `--timestamps` (Meldungen ohne Spielpräfix), jeweils einmal mit der Uhrzeit der
+Verarbeitung als Ereigniszeit (bisheriges Verhalten) und einmal mit der Zeit aus dem Log.
+Gemeldet werden Zeilen/s, Spieler online und Abweichungen von der Referenz. Vorab misst
+der Benchmark die Kosten pro Zeitstempel: Regex bzw. strptime pro Zeile gegen die
+gecachten Parser.
+
+Aufruf:  python3 benchmarks/bench_event_time.py [--hours 24] [--players 40] [--noise-per-second 5]
+"""
+import argparse
+import calendar
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parser_core.docker_source import DockerLogSource, docker_time
+from parser_core.games import GAME_PARSERS, enshrouded, valheim
+from parser_core.replay import replay_log
+
+BATCH_LINES = 2000
+TIMEOUT_SECONDS = 600
+ENSHROUDED_TIME_PATTERN = re.compile(r"\[[A-Z] (\d{2}):(\d{2}):(\d{2}),(\d{3})\]")
+
+
+class ProcessingTimeClock:
+    """Verhalten vor der Umstellung: jedes Ereignis erhält die Uhrzeit seiner Verarbeitung."""
+
+    def now(self):
+        return time.time()
+
+    def timestamp(self, value=None, absolute=None):
+        return time.time()
+
+
+def enshrouded_regex(line):
+    """Bisheriger Enshrouded-Parser: Regex und int() für jede Zeile."""
+    match = ENSHROUDED_TIME_PATTERN.match(line)
+    if match is None:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+def valheim_regex(line):
+    """Bisheriger Valheim-Parser: Regex und int() für jede Zeile (mktime schon gecacht)."""
+    match = valheim.LOG_TIME_PATTERN.match(line)
+    if match is None:
+        return None
+    month, day, year, hour, minutes, seconds = match.groups()
+    return valheim._hour_start(year, month, day, hour) + int(minutes) * 60 + int(seconds)
+
+
+def docker_strptime(timestamp):
+    """Docker-Zeitstempel per strptime, wie bisher _timestamp_to_unix."""
+    seconds, _, fraction = timestamp.rstrip("Z").partition(".")
+    return calendar.timegm(time.strptime(seconds, "%Y-%m-%dT%H:%M:%S")) + float("0." + (fraction or "0"))
+
+
+def session_events(hours, players, noise_per_second, seed=1):
+    """(Unix-Zeit, Meldung) eines Valheim-Servers, zeitlich sortiert; endet jetzt."""
+    rng = random.Random(seed)
+    end = time.time()
+    start = end - hours * 3600
+    events = []
+    for index in range(players):
+        steam_id = 76561198000000000 + index
+        name = f"Viking{index}"
+        moment = start + rng.uniform(0, 1800)
+        while moment < end:
+            events.append((moment, f"Got connection SteamID {steam_id}"))
+            moment += rng.uniform(70, 110) if rng.random() < 0.25 else rng.uniform(2, 50)
+            online_until = moment + rng.uniform(600, 7200)
+            while moment < min(online_until, end):
+                events.append((moment, f"Got character ZDOID from {name} : -123456:1"))
+                moment += rng.uniform(60, 400)
+            if rng.random() < 0.8:
+                events.append((moment, f"Closing socket {steam_id}"))
+            moment += rng.uniform(300, 5400)
+    second = start
+    while second < end:
+        for _ in range(noise_per_second):
+            events.append((second + rng.random(), "Connections 3 ZDOS:45123  sent:12 recv:40"))
+        second += 1
+    events = [event for event in events if event[0] < end]
+    events.sort()
+    return events
+
+
+def file_line(moment, message):
+    return f"{time.strftime('%m/%d/%Y %H:%M:%S', time.localtime(moment))}: {message}"
+
+
+def docker_line(moment, message):
+    nanos = int(moment % 1 * 1e9)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(moment))}.{nanos:09d}Z {message}"
+
+
+def new_parser(tmp, name):
+    return GAME_PARSERS["valheim"]({
+        "output_json_path": os.path.join(tmp, f"{name}.json"),
+        "json_flush_interval_seconds": "3600",
+        "player_timeout_seconds": str(TIMEOUT_SECONDS),
+        "admin_list_path": os.path.join(tmp, "adminlist.txt"),
+    }, name)
+
+
+def finish(parser):
+    """Was die 10-Sekunden-Timer nach dem Aufholen tun: Timeouts und unbenannte Sessions abräumen."""
+    parser.expire_inactive_players()
+    parser.evict_pending_sessions()
+    return set(parser.store.active_players)
+
+
+def run_file(tmp, lines, legacy):
+    parser = new_parser(tmp, "file")
+    if legacy:
+        parser.clock = ProcessingTimeClock()
+    started = time.perf_counter()
+    for index in range(0, len(lines), BATCH_LINES):
+        parser.process_log_lines(lines[index:index + BATCH_LINES])
+    elapsed = time.perf_counter() - started
+    return elapsed, finish(parser)
+
+
+def run_docker(tmp, data, legacy):
+    parser = new_parser(tmp, "docker")
+    if legacy:
+        parser.clock = ProcessingTimeClock()
+    source = DockerLogSource("valheim")
+    source.restart()
+    started = time.perf_counter()
+    for index in range(0, len(data), 256 * 1024):
+        lines = source.feed(data[index:index + 256 * 1024])
+        if lines:
+            parser.process_log_lines(lines, source.line_timestamps)
+    elapsed = time.perf_counter() - started
+    return elapsed, finish(parser)
+
+
+def measure_parsers():
+    cases = [
+        ("Enshrouded-Präfix", enshrouded_regex, enshrouded.parse_log_time,
+         [f"[I 12:{minute:02d}:{second:02d},{millis:03d}] [server] Remove Player 'Alice'"
+          for minute in range(2) for second in range(60) for millis in range(0, 1000, 50)]),
+        ("Valheim-Präfix", valheim_regex, valheim.parse_log_time,
+         [f"02/14/2024 12:{minute:02d}:{second:02d}: Closing socket 76561198000000001"
+          for minute in range(2) for second in range(60) for _ in range(20)]),
+        ("Docker-Zeitstempel", docker_strptime, docker_time,
+         [f"2024-02-14T12:{minute:02d}:{second:02d}.{nanos:09d}Z"
+          for minute in range(2) for second in range(60) for nanos in range(0, 10 ** 9, 5 * 10 ** 7)]),
+    ]
+    # Je 20 Zeilen pro Logsekunde, wie beim Aufholen eines Rückstands.
+    print(f"{'Format':<20} {'bisher ns':>10} {'gecacht ns':>11}")
+    for label, old, new, samples in cases:
+        assert all(abs(old(sample) - new(sample)) < 1e-6 for sample in samples)
+        timings = []
+        for function in (old, new):
+            started = time.perf_counter()
+            for _ in range(5):
+                for sample in samples:
+                    function(sample)
+            timings.append((time.perf_counter() - started) / (5 * len(samples)) * 1e9)
+        print(f"{label:<20} {timings[0]:>10.0f} {timings[1]:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--noise-per-second", type=int, default=5)
+    args = parser.parse_args()
+    # Fehlgeschlagene Zuordnungen nicht einzeln protokollieren.
+    logging.disable(logging.WARNING)
+
+    measure_parsers()
+    events = session_events(args.hours, args.players, args.noise_per_second)
+    lines = [file_line(moment, message) for moment, message in events]
+    data = "".join(docker_line(moment, message) + "\n" for moment, message in events).encode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        reference_parser = new_parser(tmp, "replay")
+        replay_log(reference_parser, log_path, include_archives=False)
+        reference = finish(reference_parser)
+
+        print(f"\n{len(lines):,} Zeilen über {args.hours} h, Referenz (Replay): {len(reference)} Spieler online")
+        print(f"{'Variante':<34} {'Zeilen/s':>10} {'online':>7} {'Abweichungen':>13}")
+        for label, run, source, legacy in (
+                ("Datei, Verarbeitungszeit (bisher)", run_file, lines, True),
+                ("Datei, Logzeit", run_file, lines, False),
+                ("Docker, Verarbeitungszeit (bisher)", run_docker, data, True),
+                ("Docker, Logzeit", run_docker, data, False)):
+            elapsed, online = run(tmp, source, legacy)
+            print(f"{label:<34} {len(lines) / elapsed:>10,.0f} {len(online):>7} {len(online ^ reference):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: Matching mehrerer Instanzen im Daemon-Prozess vs. in Worker-Prozessen (match_workers).
+
+Erzeugt `--instances` Logdateien (abwechselnd Enshrouded und Valheim) mit je `--lines`
+Zeilen und lässt sie von den Followern des Daemons (follow_file_async) von Anfang an
+verarbeiten, einmal ohne Worker und dann mit 1, 2, 4, ... Worker-Prozessen bis
+`--max-workers` (Standard: Anzahl der Kerne). Gemeldet werden Zeilen/s über alle
+Instanzen, der Faktor gegenüber dem Betrieb ohne Worker und die CPU-Zeit des
+Hauptprozesses (dort laufen Lesen und Zustandsübergänge, also der vom GIL begrenzte
+Teil). Die Spieler und Ereigniszähler jeder Instanz müssen in allen Varianten gleich sein.
+
+Aufruf:  python3 benchmarks/bench_fanout.py [--instances 8] [--lines 500000] [--noise-ratio 0.95]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loggen import enshrouded_lines, valheim_lines
+from parser_core.aio import follow_file_async
+from parser_core.fanout import MatchPool
+from parser_core.games import GAME_PARSERS
+
+GAMES = (("enshrouded", enshrouded_lines), ("valheim", valheim_lines))
+
+
+def write_logs(tmp, instances, lines, noise_ratio):
+    paths = []
+    for index in range(instances):
+        game, line_source = GAMES[index % 2]
+        path = os.path.join(tmp, f"inst{index}.log")
+        with open(path, "w") as f:
+            for line in line_source(lines, players=50, noise_ratio=noise_ratio, seed=index):
+                f.write(line + "\n")
+        paths.append((f"inst{index}", game, path))
+    return paths
+
+
+def worker_counts(max_workers):
+    counts = [0]
+    workers = 1
+    while workers <= max_workers:
+        counts.append(workers)
+        workers *= 2
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def result_of(parser):
+    players = sorted(json.dumps(player, sort_keys=True, default=str) for player in parser.snapshot_data())
+    return players, dict(parser.metrics.events)
+
+
+async def run(tmp, logs, lines, workers):
+    pool = None
+    if workers:
+        pool = MatchPool(workers)
+        await pool.start()
+    parsers = []
+    for name, game, path in logs:
+        parser = GAME_PARSERS[game]({
+            "output_json_path": os.path.join(tmp, f"{name}.json"),
+            "json_flush_interval_seconds": "3600",
+            "admin_list_path": os.path.join(tmp, "adminlist.txt"),
+        }, name)
+        if pool is not None:
+            pool.register(parser)
+        parsers.append((parser, path))
+
+    cpu_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(follow_file_async(parser, path, start_position=(os.stat(path).st_ino, 0), pool=pool))
+             for parser, path in parsers]
+    while any(parser.metrics.lines < lines for parser, _ in parsers):
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    cpu_after = resource.getrusage(resource.RUSAGE_SELF)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if pool is not None:
+        await pool.close()
+    owner_cpu = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+    return elapsed, owner_cpu, [result_of(parser) for parser, _ in parsers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=8)
+    parser.add_argument("--lines", type=int, default=500000, help="Zeilen pro Instanz")
+    parser.add_argument("--noise-ratio", type=float, default=0.95)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    # Hunderttausende An- und Abmeldungen nicht einzeln protokollieren.
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logs = write_logs(tmp, args.instances, args.lines, args.noise_ratio)
+        size = sum(os.path.getsize(path) for _, _, path in logs)
+        print(f"{args.instances} Instanzen, je {args.lines:,} Zeilen ({size / 1048576:.0f} MiB gesamt), "
+              f"{os.cpu_count()} Kerne")
+        print(f"{'Worker':>6} {'Sekunden':>9} {'Zeilen/s':>11} {'Faktor':>7} {'CPU Hauptprozess':>17}")
+        baseline = reference = None
+        for workers in worker_counts(args.max_workers):
+            elapsed, owner_cpu, results = asyncio.run(run(tmp, logs, args.lines, workers))
+            if reference is None:
+                baseline, reference = elapsed, results
+            elif results != reference:
+                raise SystemExit(f"Abweichendes Ergebnis mit {workers} Worker(n)")
+            print(f"{workers:>6} {elapsed:>9.2f} {args.instances * args.lines / elapsed:>11,.0f} "
+                  f"{baseline / elapsed:>6.2f}x {owner_cpu:>16.2f}s")
+
+
+if __name__ == "__main__":
+    main()
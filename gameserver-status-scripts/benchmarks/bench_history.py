@@ -0,0 +1,103 @@
+"""Benchmark: Session-Historie (SQLite/WAL) für einen Monat auf einem gut besuchten Server.
+
+Simuliert `--days` Tage mit `--players` Spielern und `--sessions-per-day` Sessions pro
+Spieler und Tag, schreibt An- und Abmeldungen über SessionHistory (gebündelt alle
+`--flush-interval` simulierte Sekunden) und misst danach die Antwortzeiten der Abfragen
+hinter /stats und /history ohne Ergebnis-Cache.
+
+Aufruf:  python3 benchmarks/bench_history.py [--days 30] [--players 300] [--sessions-per-day 6]
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flask_api"))
+from modules.session_history import HistoryReader
+from parser_core.history import SessionHistory
+
+
+class SimulatedClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(history, clock, days, players, sessions_per_day, seed=1):
+    """Erzeugt zeitlich sortierte Login/Logout-Ereignisse und gibt deren Anzahl zurück."""
+    rng = random.Random(seed)
+    start = time.time() - days * 86400
+    events = []
+    for index in range(players):
+        name = f"Player{index}"
+        for _ in range(days * sessions_per_day):
+            login = start + rng.random() * days * 86400
+            events.append((login, 0, name))
+            events.append((login + rng.expovariate(1 / 2700), 1, name))
+    heapq.heapify(events)
+    online = {}
+    count = 0
+    while events:
+        timestamp, kind, name = heapq.heappop(events)
+        clock.now = timestamp
+        if kind == 0:
+            online[name] = online.get(name, 0) + 1
+            if online[name] == 1:
+                history.login(name, timestamp)
+                count += 1
+        else:
+            online[name] -= 1
+            if online[name] == 0:
+                history.logout(name, timestamp)
+                count += 1
+        history.flush_if_due()
+    history.flush()
+    return count
+
+
+def measure(label, func, repeat=20):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<32} {statistics.median(samples):>8.2f} ms (max {max(samples):.2f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--sessions-per-day", type=int, default=6)
+    parser.add_argument("--flush-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "history.db")
+        clock = SimulatedClock(0.0)
+        history = SessionHistory(db_path, args.flush_interval, clock=clock)
+        start = time.perf_counter()
+        events = simulate(history, clock, args.days, args.players, args.sessions_per_day)
+        elapsed = time.perf_counter() - start
+        history.close()
+        size_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / (1024 * 1024)
+        print(f"{events:,} Ereignisse, {history.sessions_written:,} Sessions in {history.transactions:,} Transaktionen "
+              f"({elapsed:.2f}s, {events / elapsed:,.0f} Ereignisse/s), Datenbank {size_mb:.1f} MiB")
+
+        reader = HistoryReader(db_path, cache_seconds=0)
+        measure(f"/stats?days={args.days}", lambda: reader.stats(args.days))
+        measure("/stats?days=1", lambda: reader.stats(1))
+        measure(f"/history?hours={args.days * 24}", lambda: reader.history(args.days * 24))
+        measure("/history?player=Player7", lambda: reader.history(args.days * 24, "Player7"))
+
+
+if __name__ == "__main__":
+    main()
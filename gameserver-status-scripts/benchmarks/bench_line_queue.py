@@ -0,0 +1,159 @@
+"""Benchmark: Log-Burst bei langsamer Platte, mit und ohne LineQueue zwischen Lesen und Verarbeitung.
+
+Ein Schreib-Thread liefert `--lines` Valheim-Zeilen mit `--rate` Zeilen/s in eine Pipe
+(ein Burst wie bei `docker logs -f` beim Speichern oder Absturz des Servers). Der Parser liest sie per
+follow_pipe; jeder Snapshot braucht künstlich `--write-ms` Millisekunden (langsame Platte).
+Verglichen werden die bisherige Schleife (Lesen und Verarbeiten in einem Thread) und die
+LineQueue mit den Policies 'block' und 'drop':
+
+  Schreiben    Wie lange der Schreiber für den Burst brauchte (blockiert, solange die Pipe voll ist).
+  Latenz       Zeit vom geplanten Schreibzeitpunkt einer Ereigniszeile bis zu ihrem Handler
+               (p50/p99/max); ein blockierter Schreiber staut also wie Docker die Zeilen auf.
+  verworfen    Zeilen ohne mögliches Ereignis, die unter Druck verworfen wurden.
+  Füllstand    Höchster Füllstand der Warteschlange in Zeilen; Pause: pausiertes Lesen.
+
+Alle Läufe müssen denselben Endzustand ergeben.
+
+Aufruf:  python3 benchmarks/bench_line_queue.py [--lines 1000000] [--rate 100000] [--write-ms 200] [--high-watermark 50000]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loggen import valheim_lines
+from parser_core.games import GAME_PARSERS
+from parser_core.line_queue import LineQueue
+from parser_core.runner import run_queued
+from parser_core.tail import follow_pipe
+
+CHUNK_BYTES = 64 * 1024
+
+
+def chunked(lines):
+    """Teilt die Zeilen in Pipe-Blöcke; gibt (Bytes, Anzahl Zeilen) pro Block zurück."""
+    chunks = []
+    current, size = [], 0
+    for line in lines:
+        current.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_BYTES:
+            chunks.append(("\n".join(current) + "\n", len(current)))
+            current, size = [], 0
+    if current:
+        chunks.append(("\n".join(current) + "\n", len(current)))
+    return [(text.encode("utf-8"), count) for text, count in chunks]
+
+
+def new_parser(tmp, name, write_seconds):
+    parser = GAME_PARSERS["valheim"]({
+        "output_json_path": os.path.join(tmp, f"{name}.json"),
+        "json_flush_interval_seconds": "0.05",
+    }, name)
+    writer = parser.snapshot_writer
+    flush = writer.flush
+
+    def slow_flush():
+        time.sleep(write_seconds)
+        flush()
+    writer.flush = slow_flush
+    return parser
+
+
+def run(tmp, mode, chunks, event_chunks, args):
+    parser = new_parser(tmp, mode, args.write_ms / 1000)
+    handled = []
+    for name, handler in list(parser.handlers.items()):
+        def record(groups, timestamp, handler=handler):
+            handled.append(time.monotonic())
+            handler(groups, timestamp)
+        parser.handlers[name] = record
+    parser.start()
+
+    read_fd, write_fd = os.pipe()
+    scheduled = []
+    written = []
+
+    def write_burst():
+        started = time.monotonic()
+        produced = 0
+        for data, count in chunks:
+            due = started + produced / args.rate
+            scheduled.append(due)
+            produced += count
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(write_fd, view):]
+        written.append(time.monotonic() - started)
+        os.close(write_fd)
+
+    writer = threading.Thread(target=write_burst)
+    pipe = os.fdopen(read_fd, "rb", buffering=0)
+    writer.start()
+    line_queue = None
+    if mode == "ohne Warteschlange":
+        follow_pipe(pipe, parser.process_log_lines, on_tick=parser.run_timers, timeout_func=parser.next_timer_timeout)
+    else:
+        line_queue = LineQueue(args.high_watermark, args.high_watermark // 5, mode, parser.matcher.literals)
+        run_queued(parser, line_queue, lambda put: follow_pipe(pipe, put))
+    writer.join()
+    pipe.close()
+    parser.shutdown()
+
+    assert len(handled) == len(event_chunks), (len(handled), len(event_chunks))
+    latencies = sorted(done - scheduled[chunk] for done, chunk in zip(handled, event_chunks))
+    return {
+        "write": written[0],
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "dropped": line_queue.lines_dropped if line_queue else 0,
+        "depth": line_queue.max_depth if line_queue else 0,
+        "stall": line_queue.stall_seconds if line_queue else 0.0,
+        "state": json.dumps(parser.store.to_state(), sort_keys=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=100000)
+    parser.add_argument("--write-ms", type=float, default=200)
+    parser.add_argument("--high-watermark", type=int, default=50000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    lines = list(valheim_lines(args.lines, players=args.players, noise_ratio=0.99))
+    chunks = chunked(lines)
+    matcher = GAME_PARSERS["valheim"].matcher
+    event_chunks = []
+    line_index = 0
+    for chunk, (_, count) in enumerate(chunks):
+        event_chunks.extend(chunk for line in lines[line_index:line_index + count] if matcher.match(line))
+        line_index += count
+    print(f"{len(lines):,} Zeilen ({sum(len(data) for data, _ in chunks) / 1048576:.0f} MiB), "
+          f"{len(event_chunks):,} Ereignisse, {args.rate:,.0f} Zeilen/s, Snapshot {args.write_ms:.0f} ms, Hochwasser {args.high_watermark:,} Zeilen")
+
+    print(f"{'Modus':<20} {'Schreiben':>10} {'p50':>8} {'p99':>8} {'max':>8} {'verworfen':>10} {'Füllstand':>10} {'Pause':>7}")
+    reference = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("ohne Warteschlange", "block", "drop"):
+            result = run(tmp, mode, chunks, event_chunks, args)
+            reference = reference or result["state"]
+            same = "" if result["state"] == reference else "  ZUSTAND ANDERS"
+            print(f"{mode:<20} {result['write']:>9.2f}s {result['p50']:>7.3f}s {result['p99']:>7.3f}s {result['max']:>7.3f}s "
+                  f"{result['dropped']:>10,} {result['depth']:>10,} {result['stall']:>6.2f}s{same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: sequentielle re.search-Aufrufe vs. LineMatcher (Literal-Vorfilter + Dispatch-Tabelle).
+
+Erzeugt eine synthetische Logdatei mit `--size-mb` MiB (für Multi-GB-Läufe z.B. 4096)
+und `--noise-ratio` Anteil Zeilen ohne Ereignis, liest sie wie im Betrieb blockweise
+und lässt sie durch den Parser laufen. "vorher" ist die bisherige Reihenfolge einzelner
+Suchen pro Zeile, "nachher" der LineMatcher. Gemeldet werden Zeilen/s und MiB/s; die
+Anzahl der am Ende aktiven Spieler muss bei beiden Varianten gleich sein.
+
+Aufruf:  python3 benchmarks/bench_matcher.py [--game enshrouded] [--size-mb 256] [--noise-ratio 0.98]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loggen import enshrouded_lines, valheim_lines
+from parser_core.games import GAME_DEFINITIONS
+from parser_core.tail import LineSplitter
+
+GAMES = {
+    "enshrouded": (GAME_DEFINITIONS["enshrouded"], enshrouded_lines),
+    "valheim": (GAME_DEFINITIONS["valheim"], valheim_lines),
+}
+CHUNK_SIZE = 1024 * 1024
+
+
+def legacy_parser_class(parser_class, rules):
+    """Parser-Variante mit der bisherigen Erkennung: ein re.search pro Muster, in Regel-Reihenfolge."""
+
+    class LegacyParser(parser_class):
+        def process_log_line(self, line):
+            timestamp = time.time()
+            for rule in rules:
+                match = rule.pattern.search(line)
+                if match:
+                    self.handlers[rule.name](match.groupdict(), timestamp)
+                    return
+
+    return LegacyParser
+
+
+def write_log(path, line_source, size_mb, noise_ratio):
+    target = size_mb * 1024 * 1024
+    written = 0
+    lines = 0
+    with open(path, "w") as f:
+        for line in line_source(10 ** 12, players=200, noise_ratio=noise_ratio):
+            f.write(line + "\n")
+            written += len(line) + 1
+            lines += 1
+            if written >= target:
+                break
+    return lines
+
+
+def run(parser_class, tmp, log_path):
+    settings = {
+        "output_json_path": os.path.join(tmp, "players.json"),
+        "json_flush_interval_seconds": "3600",
+        "admin_list_path": os.path.join(tmp, "adminlist.txt"),
+    }
+    parser = parser_class(settings)
+    splitter = LineSplitter()
+    lines = 0
+    start = time.perf_counter()
+    with open(log_path, "rb") as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            batch = splitter.feed(data)
+            lines += len(batch)
+            parser.process_log_lines(batch)
+    elapsed = time.perf_counter() - start
+    return lines, elapsed, len(parser.store.active_players)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", choices=GAMES, default="enshrouded")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--noise-ratio", type=float, default=0.98)
+    args = parser.parse_args()
+
+    definition, line_source = GAMES[args.game]
+    parser_class, rules = definition.parser_class, definition.rules
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "server.log")
+        total = write_log(log_path, line_source, args.size_mb, args.noise_ratio)
+        size_mb = os.path.getsize(log_path) / (1024 * 1024)
+        print(f"Logdatei: {size_mb:,.0f} MiB, {total:,} Zeilen, Rauschanteil {args.noise_ratio:.0%}")
+        print(f"{'Variante':<10} {'Zeilen/s':>12} {'MiB/s':>8} {'Spieler':>8}")
+        for name, variant in (("vorher", legacy_parser_class(parser_class, rules)), ("nachher", parser_class)):
+            lines, elapsed, players = run(variant, tmp, log_path)
+            print(f"{name:<10} {lines / elapsed:>12,.0f} {size_mb / elapsed:>8.1f} {players:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark: N Instanzen im Parser-Daemon (ein Prozess) vs. N einzelne Parser-Prozesse.
+
+Startet beide Varianten gegen N synthetische Logdateien, schreibt für `--seconds`
+Sekunden Zeilen mit `--rate` Zeilen/s pro Instanz und misst die Summe aus
+RSS (VmRSS) und verbrauchter CPU-Zeit aller beteiligten Prozesse (Linux, /proc).
+
+Aufruf:  python3 benchmarks/bench_multi_instance.py [--instances 20] [--seconds 10] [--rate 50]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loggen import enshrouded_lines
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SINGLE_SCRIPT = os.path.join(BASE_DIR, "enshrouded-parser", "enshrouded_log_parser.py")
+DAEMON_SCRIPT = os.path.join(BASE_DIR, "parser-daemon", "parser_daemon.py")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def instance_settings(tmp, index):
+    return {
+        "mode": "native",
+        "log_path": os.path.join(tmp, f"server_{index}.log"),
+        "output_json_path": os.path.join(tmp, f"players_{index}.json"),
+        "player_timeout_seconds": "0",
+        "json_flush_interval_seconds": "1.0",
+    }
+
+
+def start_single_processes(tmp, count):
+    processes = []
+    for index in range(count):
+        settings = instance_settings(tmp, index)
+        workdir = os.path.join(tmp, f"single_{index}")
+        os.makedirs(workdir)
+        with open(os.path.join(workdir, "config.ini"), "w") as f:
+            f.write("[main]\nmode = native\n")
+            f.write(f"output_json_path = {settings['output_json_path']}\n")
+            f.write(f"log_file_path = {os.path.join(workdir, 'parser.log')}\n")
+            f.write("player_timeout_seconds = 0\njson_flush_interval_seconds = 1.0\n")
+            f.write(f"[native]\nlog_path = {settings['log_path']}\n")
+        processes.append(subprocess.Popen([sys.executable, SINGLE_SCRIPT], cwd=workdir,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    return processes
+
+
+def start_daemon(tmp, count):
+    config_path = os.path.join(tmp, "daemon.ini")
+    with open(config_path, "w") as f:
+        names = [f"inst{index}" for index in range(count)]
+        f.write(f"[main]\nenabled_instances = {', '.join(names)}\n")
+        f.write(f"log_file_path = {os.path.join(tmp, 'daemon.log')}\n")
+        for index, name in enumerate(names):
+            f.write(f"[{name}]\ngame = enshrouded\n")
+            for key, value in instance_settings(tmp, index).items():
+                f.write(f"{key} = {value}\n")
+    return [subprocess.Popen([sys.executable, DAEMON_SCRIPT, config_path], cwd=tmp,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)]
+
+
+def read_usage(pid):
+    """Gibt (CPU-Sekunden, RSS in KiB) eines Prozesses zurück."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    return cpu, rss
+
+
+def run_variant(name, starter, count, seconds, rate):
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(count):
+            open(instance_settings(tmp, index)["log_path"], "w").close()
+        processes = starter(tmp, count)
+        try:
+            time.sleep(2.0)  # Start und Imports abwarten
+            cpu_start = sum(read_usage(p.pid)[0] for p in processes)
+            generators = [enshrouded_lines(10 ** 9, seed=index) for index in range(count)]
+            handles = [open(instance_settings(tmp, index)["log_path"], "a") for index in range(count)]
+            per_tick = max(1, rate // 10)
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                for generator, handle in zip(generators, handles):
+                    handle.write("\n".join(next(generator) for _ in range(per_tick)) + "\n")
+                    handle.flush()
+                time.sleep(0.1)
+            for handle in handles:
+                handle.close()
+            time.sleep(1.0)
+            usage = [read_usage(p.pid) for p in processes]
+            cpu = sum(u[0] for u in usage) - cpu_start
+            rss = sum(u[1] for u in usage)
+        finally:
+            for process in processes:
+                process.send_signal(signal.SIGINT)
+            for process in processes:
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+    print(f"{name:<12} {len(processes):>9} {rss / 1024:>10.1f} {cpu:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=50, help="Zeilen pro Sekunde und Instanz")
+    args = parser.parse_args()
+
+    print(f"{'Variante':<12} {'Prozesse':>9} {'RSS (MiB)':>10} {'CPU (s)':>10}")
+    run_variant("einzeln", start_single_processes, args.instances, args.seconds, args.rate)
+    run_variant("daemon", start_daemon, args.instances, args.seconds, args.rate)
+
+
+if __name__ == "__main__":
+    main()
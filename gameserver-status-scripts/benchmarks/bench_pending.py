@@ -0,0 +1,100 @@
+"""Benchmark: Speicher des Spielerzustands bei Verbindungen ohne Login (Steam-Abfragen, Portscanner).
+
+Simuliert `--days` Tage Serverbetrieb: pro Stunde `--probes-per-hour` Verbindungen, die
+nie einen Login abschließen (und nie sauber getrennt werden), dazu normale Spieler mit
+Connect, Login und Disconnect. Gemessen werden verbleibende Sessions und der per
+tracemalloc ermittelte Speicher des PlayerStore, einmal mit dem bisherigen Verhalten
+(Sessions als Dicts, verworfene Verbindungen bleiben bis zum Disconnect) und einmal mit
+den Standardwerten (TTL 120 s, höchstens 1000 unbenannte Sessions).
+
+Aufruf:  python3 benchmarks/bench_pending.py [--days 90] [--probes-per-hour 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parser_core.player_state import PlayerStore
+
+
+class LegacyPlayerStore(PlayerStore):
+    """Verhalten vor der Eviction: Session-Dicts, die erst ein Disconnect entfernt."""
+
+    def open_session(self, key, timestamp):
+        if key in self.sessions:
+            return False
+        self.sessions[key] = {"name": None, "last_activity": timestamp}
+        self.pending[key] = timestamp
+        return True
+
+    def claim_pending(self, timestamp, max_age):
+        while self.pending:
+            key, started = self.pending.popitem(last=False)
+            if timestamp - started < max_age:
+                return key
+        return None
+
+    def evict_stale(self, now):
+        return 0
+
+    def activate(self, key, name, player_data):
+        self.pending.pop(key, None)
+        self.sessions.setdefault(key, {"name": None, "last_activity": None})["name"] = name
+        self.key_to_name[key] = name
+        self.name_to_key[name] = key
+        self.active_players[name] = player_data
+
+
+def simulate(store, days, probes_per_hour, seed=1):
+    rng = random.Random(seed)
+    now = 1700000000.0
+    next_key = 1
+    next_sweep = now
+    for _ in range(days * 24):
+        for _ in range(probes_per_hour):
+            now += 3600 / (probes_per_hour + 4)
+            store.open_session(next_key, now)
+            next_key += 1
+            if now >= next_sweep:
+                # Wie der 10-Sekunden-Timer des Parsers.
+                store.evict_stale(now)
+                next_sweep = now + 10
+        for _ in range(4):
+            store.open_session(next_key, now)
+            next_key += 1
+            name = f"Player{rng.randrange(50)}"
+            # Wie im Parser erhält der Login die älteste noch passende unbenannte Session.
+            key = store.claim_pending(now + 1, 60)
+            if key is not None:
+                store.activate(key, name, {"name": name, "last_seen": now})
+                store.remove_session(key)
+    return next_key - 1
+
+
+def measure(label, store, days, probes_per_hour):
+    tracemalloc.start()
+    start = time.perf_counter()
+    connections = simulate(store, days, probes_per_hour)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<18} {connections:>11,} {len(store.sessions):>10,} {len(store.pending):>10,} "
+          f"{current / (1024 * 1024):>9.1f} {store.pending_expired + store.pending_evicted:>10,} {elapsed:>7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--probes-per-hour", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'Variante':<18} {'Verbindungen':>11} {'Sessions':>10} {'wartend':>10} {'MiB':>9} {'verworfen':>10} {'Zeit':>8}")
+    measure("bisher", LegacyPlayerStore(), args.days, args.probes_per_hour)
+    measure("TTL + Obergrenze", PlayerStore(), args.days, args.probes_per_hour)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Regressionslauf: Parser und API-Cache über synthetische Logs mit bekanntem Endzustand.
+
+Erzeugt für jedes Spiel (`--games`) ein deterministisches Log (loggen.Scenario) mit
+`--lines` Zeilen, `--players` Spielern, Rauschanteil `--noise-ratio` und `--storms`
+Reconnect-Stürmen und spielt es über jede Quelle (`--sources`) ein:
+
+  file    Die Zeilen werden blockweise (auch mitten in einer Zeile) an eine echte Datei
+          angehängt und wie im Live-Betrieb per FileFollower gelesen; `--rotations` Mal
+          wird die Datei rotiert, bevor der Follower alles gelesen hat.
+  docker  Die Zeilen gehen mit Docker-Zeitstempeln an eine DockerLogSource; `--restarts`
+          Mal bricht der Stream mitten in einer Zeile ab und wird wie `docker logs --since`
+          ab dem letzten Zeitstempel neu geliefert.
+
+Die monotone Uhr der Parser (Timer, Snapshot-Intervall, EventClock) ist eine Fake-Uhr, die
+pro Block auf die Logsekunde gestellt wird; Timer und JSON-Schreibvorgänge hängen so nur
+vom Log ab. Nach jedem Block fragt ein PlayerCache der flask_api die JSON-Datei ab.
+
+Jeder Fall läuft in einem eigenen Prozess (für den Spitzenwert des RSS). Gemeldet werden
+Zeilen/s (nur Lesen und Verarbeiten), Spitzen-RSS, geschriebene JSON-Dateien und neu geladene
+API-Snapshots. `--json` speichert die Ergebnisse; `--baseline` vergleicht mit einer früheren
+Datei und endet mit Code 1 bei anderen Ereigniszählern oder JSON-Schreibvorgängen oder wenn
+Zeilen/s bzw. RSS mehr als `--tolerance` schlechter sind. Den Endzustand (Spieler, Rollen,
+API-Cache) prüft tests/test_regression.py mit denselben Abläufen (`replay`).
+
+Aufruf:  python3 benchmarks/bench_regression.py [--lines 500000] [--players 200] [--json ergebnis.json]
+         python3 benchmarks/bench_regression.py --baseline ergebnis.json
+"""
+import argparse
+import calendar
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "flask_api"))
+from loggen import Scenario
+from modules.player_cache import PlayerCache
+from parser_core.docker_source import DockerLogSource
+from parser_core.games import GAME_PARSERS
+from parser_core.tail import FileFollower
+
+RESULT_VERSION = 1
+# Docker-Zeitstempel der Logsekunde 0 (UTC); die Valheim-Zeilen tragen dasselbe Datum.
+DOCKER_EPOCH = calendar.timegm((2024, 2, 14, 0, 0, 0))
+# Werte, die bei gleichen Einstellungen exakt gleich bleiben müssen.
+EXACT_FIELDS = ("lines", "json_writes", "api_reloads", "events")
+SETTINGS = ("lines", "players", "noise_ratio", "seed", "storms", "rotations", "restarts", "chunk_lines")
+
+
+class FakeClock:
+    """Monotone Uhr, die der Lauf selbst stellt (Sekunden seit Beginn des Logs)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Run:
+    """Ein Fall (Spiel und Quelle): Parser, API-Cache und Zähler."""
+
+    def __init__(self, tmp, game, clock, admins=()):
+        self.clock = clock
+        self.json_path = os.path.join(tmp, "players.json")
+        admin_list = os.path.join(tmp, "adminlist.txt")
+        with open(admin_list, "w") as f:
+            f.write("".join(f"{admin}\n" for admin in admins))
+        self.parser = GAME_PARSERS[game]({
+            "output_json_path": self.json_path,
+            "admin_list_path": admin_list,
+            "json_flush_interval_seconds": "1",
+            "player_timeout_seconds": "0",
+        }, game, clock=clock)
+        self.cache = PlayerCache(self.json_path, revalidate_interval=0, clock=clock)
+        self.seconds = 0.0
+        self.api_seconds = 0.0
+        self.api_reloads = 0
+
+    def process(self, lines, docker_timestamps=None):
+        started = time.perf_counter()
+        if lines:
+            self.parser.process_log_lines(lines, docker_timestamps)
+        self.seconds += time.perf_counter() - started
+
+    def tick(self, second):
+        """Block fertig: Uhr auf die Logsekunde stellen, Timer ausführen, API abfragen."""
+        self.clock.now = float(second)
+        started = time.perf_counter()
+        self.parser.run_timers()
+        self.seconds += time.perf_counter() - started
+        self.poll_api()
+
+    def poll_api(self):
+        previous = self.cache.snapshot
+        started = time.perf_counter()
+        snapshot = self.cache.get()
+        self.api_seconds += time.perf_counter() - started
+        if snapshot is not previous:
+            self.api_reloads += 1
+
+
+def blocks(scenario, size):
+    block = []
+    for item in scenario:
+        block.append(item)
+        if len(block) >= size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def split_points(count, lines, chunk_lines):
+    """Blocknummern für `count` gleichmäßig verteilte Rotationen bzw. Neustarts."""
+    total = -(-lines // chunk_lines)
+    return {total * (index + 1) // (count + 1) for index in range(count)}
+
+
+def drive_file(run, scenario, tmp, args):
+    path = os.path.join(tmp, "server.log")
+    writer = open(path, "ab", buffering=0)
+    follower = run.parser.log_follower = FileFollower(path, start_at_end=False, log=run.parser.logger)
+    rotate_at = split_points(args.rotations, args.lines, args.chunk_lines)
+
+    def read_all():
+        while True:
+            started = time.perf_counter()
+            lines = follower.read_lines()
+            run.seconds += time.perf_counter() - started
+            if not lines:
+                return
+            run.process(lines)
+
+    for index, block in enumerate(blocks(scenario, args.chunk_lines)):
+        data = "".join(f"{line}\n" for _, line in block).encode("utf-8")
+        # Halber Block: der Follower sieht eine unvollständige Zeile.
+        writer.write(data[:len(data) // 2])
+        read_all()
+        writer.write(data[len(data) // 2:])
+        if index in rotate_at:
+            writer.close()
+            os.replace(path, f"{path}.1")
+            writer = open(path, "ab", buffering=0)
+        read_all()
+        run.tick(block[-1][0])
+    writer.close()
+    follower.close()
+    return {"rotations": len(rotate_at)}
+
+
+def docker_timestamp(second):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime(DOCKER_EPOCH + second))
+
+
+def drive_docker(run, scenario, args):
+    source = run.parser.docker_source = DockerLogSource(f"bench-{scenario.game}")
+    source.restart()
+    restart_at = split_points(args.restarts, args.lines, args.chunk_lines)
+    previous = []
+
+    def feed(data):
+        started = time.perf_counter()
+        lines = source.feed(data)
+        run.seconds += time.perf_counter() - started
+        run.process(lines, source.line_timestamps)
+
+    for index, block in enumerate(blocks(scenario, args.chunk_lines)):
+        framed = []
+        for second, line in block:
+            timestamp = docker_timestamp(second)
+            framed.append((timestamp, f"{timestamp} {line}\n".encode("utf-8")))
+        data = b"".join(chunk for _, chunk in framed)
+        if index in restart_at:
+            # Abbruch mitten im Block; Docker liefert danach alles ab dem letzten Zeitstempel erneut.
+            feed(data[:len(data) // 2])
+            source.restart()
+            since = source.last_timestamp
+            feed(b"".join(chunk for timestamp, chunk in previous + framed if timestamp >= since))
+        else:
+            feed(data)
+        previous = framed
+        run.tick(block[-1][0])
+    return {"restarts": source.restarts, "duplicates_skipped": source.lines_skipped}
+
+
+def replay(game, source, tmp, args, admins=()):
+    """Spielt das Szenario eines Falls ein; gibt (Scenario, Run, Details der Quelle) zurück.
+
+    Der Parser ist danach beendet (letzter Snapshot geschrieben), der API-Cache hat ihn geladen.
+    """
+    scenario = Scenario(game, args.lines, args.players, args.noise_ratio, args.seed, args.storms)
+    run = Run(tmp, game, FakeClock(), admins)
+    run.parser.start()
+    if source == "file":
+        details = drive_file(run, scenario, tmp, args)
+    else:
+        details = drive_docker(run, scenario, args)
+    run.parser.shutdown()
+    run.poll_api()
+    return scenario, run, details
+
+
+def run_case(game, source, args):
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario, run, details = replay(game, source, tmp, args)
+
+    lines = run.parser.metrics.lines
+    return dict(details, **{
+        "lines": lines,
+        "seconds": round(run.seconds, 4),
+        "lines_per_second": round(lines / run.seconds) if run.seconds else 0,
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "json_writes": run.parser.snapshot_writer.writes_performed,
+        "api_reloads": run.api_reloads,
+        "api_ms_per_reload": round(run.api_seconds * 1000 / max(1, run.api_reloads), 3),
+        "events": dict(run.parser.metrics.events),
+        "players_online": len(scenario.expected),
+    })
+
+
+def run_in_subprocess(case, args):
+    command = [sys.executable, os.path.abspath(__file__), "--case", case]
+    for name in SETTINGS:
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"Fall {case} fehlgeschlagen:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def compare(results, baseline, tolerance):
+    """Vergleicht mit einer Baseline; gibt die Liste der Regressionen zurück."""
+    if baseline.get("settings") != results["settings"]:
+        raise SystemExit(f"Baseline wurde mit anderen Einstellungen erzeugt: {baseline.get('settings')}")
+    regressions = []
+    print(f"\nVergleich mit der Baseline (Toleranz {tolerance:.0%}):")
+    for case, current in results["cases"].items():
+        before = baseline["cases"].get(case)
+        if before is None:
+            print(f"  {case}: nicht in der Baseline")
+            continue
+        speed = current["lines_per_second"] / before["lines_per_second"] - 1 if before["lines_per_second"] else 0.0
+        memory = current["peak_rss_mib"] / before["peak_rss_mib"] - 1 if before["peak_rss_mib"] else 0.0
+        print(f"  {case:<18} Zeilen/s {speed:+7.1%}   RSS {memory:+7.1%}")
+        for field in EXACT_FIELDS:
+            if current[field] != before[field]:
+                regressions.append(f"{case}: {field} {current[field]} statt {before[field]}")
+        if speed < -tolerance:
+            regressions.append(f"{case}: {-speed:.0%} weniger Zeilen/s")
+        if memory > tolerance:
+            regressions.append(f"{case}: {memory:.0%} mehr RSS")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", default="enshrouded,valheim")
+    parser.add_argument("--sources", default="file,docker")
+    parser.add_argument("--lines", type=int, default=500000, help="Zeilen pro Fall")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--noise-ratio", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--storms", type=int, default=5, help="Reconnect-Stürme pro Log")
+    parser.add_argument("--rotations", type=int, default=3, help="Rotationen der Logdatei (file)")
+    parser.add_argument("--restarts", type=int, default=3, help="Abbrüche des Docker-Streams (docker)")
+    parser.add_argument("--chunk-lines", type=int, default=500, help="Zeilen pro geschriebenem Block")
+    parser.add_argument("--json", help="Ergebnisse als JSON in diese Datei schreiben")
+    parser.add_argument("--baseline", help="Mit den Ergebnissen einer früheren --json-Datei vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Erlaubte Verschlechterung von Zeilen/s und RSS")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        game, source = args.case.split("/")
+        print(json.dumps(run_case(game, source, args)))
+        return
+
+    results = {
+        "version": RESULT_VERSION,
+        "settings": {name: getattr(args, name) for name in SETTINGS},
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "cases": {},
+    }
+    print(f"{'Fall':<18} {'Zeilen':>9} {'Zeilen/s':>10} {'RSS MiB':>8} {'JSON':>6} {'API':>6} {'Online':>6}")
+    for game in args.games.split(","):
+        for source in args.sources.split(","):
+            case = f"{game}/{source}"
+            result = results["cases"][case] = run_in_subprocess(case, args)
+            print(f"{case:<18} {result['lines']:>9,} {result['lines_per_second']:>10,} {result['peak_rss_mib']:>8.1f} "
+                  f"{result['json_writes']:>6} {result['api_reloads']:>6} {result['players_online']:>6}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nErgebnisse in {args.json} geschrieben.")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: Replay vorhandener Logs (--replay) inkl. rotiertem .gz-Archiv.
+
+Erzeugt ein synthetisches Log mit `--size-mb` MiB, dessen erste Hälfte als
+`server.log.1.gz` archiviert wird, und spielt beides mit replay_log ein. Zum Vergleich
+laufen dieselben Zeilen zeilenweise durch process_log_lines; die am Ende aktiven Spieler
+müssen übereinstimmen. Gemeldet werden MiB/s (unkomprimiert) beider Varianten.
+
+Aufruf:  python3 benchmarks/bench_replay.py [--game enshrouded] [--size-mb 256] [--noise-ratio 0.98]
+"""
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loggen import enshrouded_lines, valheim_lines
+from parser_core.games import GAME_PARSERS
+from parser_core.replay import replay_log
+from parser_core.tail import LineSplitter
+
+GAMES = {
+    "enshrouded": (GAME_PARSERS["enshrouded"], enshrouded_lines),
+    "valheim": (GAME_PARSERS["valheim"], valheim_lines),
+}
+CHUNK_SIZE = 1024 * 1024
+
+
+def write_logs(log_path, line_source, size_mb, noise_ratio):
+    """Schreibt die erste Hälfte nach `<log_path>.1.gz`, die zweite nach `log_path`."""
+    target = size_mb * 1024 * 1024
+    written = 0
+    archive = gzip.open(log_path + ".1.gz", "wt", compresslevel=1)
+    live = open(log_path, "w")
+    try:
+        for line in line_source(10 ** 12, players=200, noise_ratio=noise_ratio):
+            (archive if written < target // 2 else live).write(line + "\n")
+            written += len(line) + 1
+            if written >= target:
+                break
+    finally:
+        archive.close()
+        live.close()
+    # Das Archiv ist älter als die aktuelle Datei.
+    os.utime(log_path + ".1.gz", (time.time() - 3600, time.time() - 3600))
+    return written
+
+
+def new_parser(parser_class, tmp, name):
+    return parser_class({
+        "output_json_path": os.path.join(tmp, f"{name}.json"),
+        "json_flush_interval_seconds": "3600",
+        "admin_list_path": os.path.join(tmp, "adminlist.txt"),
+    })
+
+
+def run_replay(parser_class, tmp, log_path):
+    parser = new_parser(parser_class, tmp, "replay")
+    start = time.perf_counter()
+    replay_log(parser, log_path)
+    return time.perf_counter() - start, set(parser.store.active_players)
+
+
+def run_sequential(parser_class, tmp, log_path):
+    parser = new_parser(parser_class, tmp, "sequential")
+    start = time.perf_counter()
+    for path, opener in ((log_path + ".1.gz", gzip.open), (log_path, open)):
+        splitter = LineSplitter()
+        with opener(path, "rb") as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    break
+                parser.process_log_lines(splitter.feed(data))
+    return time.perf_counter() - start, set(parser.store.active_players)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", choices=GAMES, default="enshrouded")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--noise-ratio", type=float, default=0.98)
+    args = parser.parse_args()
+
+    parser_class, line_source = GAMES[args.game]
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "server.log")
+        size_mb = write_logs(log_path, line_source, args.size_mb, args.noise_ratio) / (1024 * 1024)
+        print(f"Logs: {size_mb:,.0f} MiB (davon die Hälfte gzip-komprimiert), Rauschanteil {args.noise_ratio:.0%}")
+        print(f"{'Variante':<12} {'Sekunden':>9} {'MiB/s':>8} {'Spieler':>8}")
+        results = {}
+        for name, run in (("zeilenweise", run_sequential), ("replay", run_replay)):
+            elapsed, players = run(parser_class, tmp, log_path)
+            results[name] = players
+            print(f"{name:<12} {elapsed:>9.2f} {size_mb / elapsed:>8.1f} {len(players):>8}")
+        if results["zeilenweise"] != results["replay"]:
+            print("FEHLER: Aktive Spieler unterscheiden sich!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
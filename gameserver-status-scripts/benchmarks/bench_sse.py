@@ -0,0 +1,136 @@
+"""Benchmark: viele untätige SSE-Abonnenten auf /api/<instanz>/events.
+
+Startet gunicorn mit gevent-Worker für ein flask_api-Verzeichnis (oder nutzt mit --url einen
+laufenden Server), öffnet `--subscribers` SSE-Verbindungen, ersetzt dann die JSON-Datei
+`--changes` Mal und misst, wie lange es dauert, bis alle Abonnenten das Delta erhalten haben.
+Außerdem wird die CPU-Zeit der gunicorn-Prozesse in der Ruhephase gemessen (Linux, /proc).
+
+Aufruf:  python3 benchmarks/bench_sse.py [--subscribers 2000] [--workers 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_multi_instance import read_usage
+from load_test_api import BASE_DIR, percentile, start_gunicorn, write_players
+
+
+def replace_players(path, players):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(players, f)
+    os.replace(tmp, path)
+
+
+async def subscribe(host, port, path, ready, received):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    ready.append(True)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b"event: delta"):
+                received.append(time.perf_counter())
+    finally:
+        writer.close()
+
+
+def gunicorn_pids(process):
+    pids = [process.pid]
+    try:
+        with open(f"/proc/{process.pid}/task/{process.pid}/children") as f:
+            pids.extend(int(pid) for pid in f.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+async def run(url, json_path, process, subscribers, changes, idle_seconds):
+    parsed = urllib.parse.urlsplit(url)
+    ready, received = [], []
+    tasks = []
+    for _ in range(subscribers):
+        tasks.append(asyncio.create_task(subscribe(parsed.hostname, parsed.port, parsed.path, ready, received)))
+        if len(tasks) % 200 == 0:
+            await asyncio.sleep(0.05)
+    while len(ready) < subscribers:
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(2.0)
+
+    idle_cpu = None
+    if process:
+        pids = gunicorn_pids(process)
+        cpu_start = sum(read_usage(pid)[0] for pid in pids)
+        await asyncio.sleep(idle_seconds)
+        idle_cpu = sum(read_usage(pid)[0] for pid in pids) - cpu_start
+
+    fanout = []
+    for change in range(changes):
+        received.clear()
+        start = time.perf_counter()
+        replace_players(json_path, [{"name": f"Player{i}", "role": "Community", "change": change} for i in range(10)])
+        deadline = start + 10
+        while len(received) < subscribers and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        if received:
+            fanout.append((max(received) - start, len(received)))
+        await asyncio.sleep(1.0)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return idle_cpu, fanout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.path.join(BASE_DIR, "flask_api"))
+    parser.add_argument("--url", help="Vorhandenen /events-Endpunkt testen (erfordert --json-path)")
+    parser.add_argument("--json-path", help="JSON-Datei des vorhandenen Servers")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--changes", type=int, default=5)
+    parser.add_argument("--idle-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, args.subscribers + 256)), hard))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        url, json_path = args.url, args.json_path
+        if not url:
+            json_path = os.path.join(tmp, "players.json")
+            write_players(json_path, 0)
+            worker_args = ["-k", "gevent", "--worker-connections", str(args.subscribers + 100)]
+            process, players_url = start_gunicorn(args.app_dir, tmp, json_path, args.workers, worker_args)
+            url = players_url.rsplit("/", 1)[0] + "/events"
+        try:
+            idle_cpu, fanout = asyncio.run(run(url, json_path, process, args.subscribers, args.changes,
+                                               args.idle_seconds))
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    latencies = [latency for latency, _ in fanout]
+    print(f"URL:                 {url}")
+    print(f"Abonnenten:          {args.subscribers}")
+    if idle_cpu is not None:
+        print(f"CPU im Leerlauf:     {idle_cpu / args.idle_seconds * 1000:.1f} ms/s")
+    print(f"Zugestellt:          {', '.join(str(count) for _, count in fanout)}")
+    print(f"Fan-out p50 / max:   {percentile(latencies, 0.5) * 1000:.1f} ms / {max(latencies, default=float('nan')) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark: alte readline/sleep(0.1)-Schleife vs. ereignisgesteuertes Tail aus parser_core.
+
+Misst Aufwachvorgänge und CPU-Zeit im Leerlauf sowie den Durchsatz (Zeilen/s) beim
+Abarbeiten einer vorbereiteten Logdatei. Die Engine-Variante ist follow_file mit dem
+Tick-Intervall des Betriebs (10 s); im Leerlauf weckt sie also nur der Tick.
+
+Aufruf:  python3 benchmarks/bench_tail.py [--idle-seconds 20] [--lines 500000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parser_core.tail import FileFollower, follow_file
+
+SAMPLE_LINE = "[I 12:34:56,789] [server] Remote player added. Player handle: 12345(1)\n"
+
+
+def legacy_tail(filepath, stop_event, stats, start_at_end=True, expected_lines=None):
+    """Nachbau der bisherigen tail_log_file-Schleife."""
+    with open(filepath, "r") as f:
+        if start_at_end:
+            f.seek(0, os.SEEK_END)
+        while not stop_event.is_set():
+            line = f.readline()
+            if not line:
+                time.sleep(0.1)
+                stats["wakeups"] += 1
+                continue
+            stats["lines"] += 1
+            if expected_lines and stats["lines"] >= expected_lines:
+                return
+
+
+class _Stop(Exception):
+    """Beendet follow_file aus einem Callback heraus."""
+
+
+def engine_tail(filepath, stop_event, stats, start_at_end=True, expected_lines=None):
+    """Produktive Tail-Schleife (follow_file mit Tick-Intervall und blockierendem Warten, ohne Parser-Logik).
+
+    Jedes Warten endet mit einem Tick; gezählt wird es als Aufwachvorgang. Zum Beenden weckt
+    `stop_event` die Schleife über einen zusätzlichen FD, dieser letzte Tick zählt nicht.
+    """
+    wake_read, wake_write = os.pipe()
+
+    def on_lines(lines):
+        stats["lines"] += len(lines)
+        if expected_lines and stats["lines"] >= expected_lines:
+            raise _Stop
+
+    def on_tick():
+        if stop_event.is_set():
+            raise _Stop
+        stats["wakeups"] += 1
+
+    def stop():
+        stop_event.wait()
+        os.write(wake_write, b"\0")
+
+    waker = threading.Thread(target=stop, daemon=True)
+    waker.start()
+    try:
+        follow_file(filepath, on_lines, on_tick=on_tick, extra_fds=(wake_read,),
+                    follower=FileFollower(filepath, start_at_end=start_at_end))
+    except _Stop:
+        pass
+    finally:
+        stop_event.set()
+        waker.join()
+        os.close(wake_read)
+        os.close(wake_write)
+
+
+def measure_idle(tail_func, filepath, seconds):
+    stop_event = threading.Event()
+    stats = {"lines": 0, "wakeups": 0, "cpu": 0.0}
+
+    def runner():
+        start_cpu = time.thread_time()
+        tail_func(filepath, stop_event, stats)
+        stats["cpu"] = time.thread_time() - start_cpu
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    time.sleep(seconds)
+    stop_event.set()
+    thread.join()
+    return stats
+
+
+def measure_throughput(tail_func, filepath, line_count):
+    stop_event = threading.Event()
+    stats = {"lines": 0, "wakeups": 0}
+    start = time.perf_counter()
+    tail_func(filepath, stop_event, stats, start_at_end=False, expected_lines=line_count)
+    elapsed = time.perf_counter() - start
+    return line_count / elapsed if elapsed else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle-seconds", type=float, default=20.0)
+    parser.add_argument("--lines", type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        idle_path = os.path.join(tmp, "idle.log")
+        open(idle_path, "w").close()
+        data_path = os.path.join(tmp, "data.log")
+        with open(data_path, "w") as f:
+            f.write(SAMPLE_LINE * args.lines)
+
+        print(f"{'Variante':<10} {'Wakeups/s':>10} {'CPU-ms/s':>10} {'Zeilen/s':>14}")
+        for name, func in (("legacy", legacy_tail), ("engine", engine_tail)):
+            idle = measure_idle(func, idle_path, args.idle_seconds)
+            rate = measure_throughput(func, data_path, args.lines)
+            print(f"{name:<10} {idle['wakeups'] / args.idle_seconds:>10.1f} "
+                  f"{idle['cpu'] * 1000 / args.idle_seconds:>10.2f} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
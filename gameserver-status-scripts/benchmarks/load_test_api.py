@@ -0,0 +1,149 @@
+"""Lasttest für die /players-Endpunkte der Flask-API unter gunicorn.
+
+Startet gunicorn für ein flask_api-Verzeichnis (oder nutzt mit --url einen laufenden
+Server), schickt von `--clients` Threads aus für `--seconds` Sekunden Anfragen und
+meldet Anfragen/s sowie p50/p99-Latenz.
+
+Vorher/Nachher-Vergleich, z.B. gegen den Stand vor einer Änderung:
+
+    git worktree add /tmp/api-alt <commit>
+    python3 benchmarks/load_test_api.py --app-dir /tmp/api-alt/gameserver-status-scripts/flask_api
+    python3 benchmarks/load_test_api.py --app-dir flask_api
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSTANCE = "bench"
+
+
+def write_players(path, count):
+    players = [{"id": i, "name": f"Player{i}", "permissions": ["CanEditBase"], "role": "Community",
+                "last_seen": 1700000000.0} for i in range(count)]
+    with open(path, "w") as f:
+        json.dump(players, f)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(app_dir, tmp, json_path, workers, worker_args=()):
+    """Kopiert die API in ein Temp-Verzeichnis, setzt eine Test-config.ini und startet gunicorn.
+
+    `worker_args` werden zusätzlich übergeben, z.B. ["-k", "gevent"].
+    """
+    return start_server(app_dir, tmp, json_path, lambda port: [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers), *worker_args,
+        "--bind", f"127.0.0.1:{port}", "app:app"])
+
+
+def start_server(app_dir, tmp, json_path, command):
+    """Wie start_gunicorn, aber mit beliebigem Server; `command(port)` liefert die Befehlszeile."""
+    target = os.path.join(tmp, "flask_api")
+    shutil.copytree(app_dir, target, ignore=shutil.ignore_patterns("venv", "__pycache__"), dirs_exist_ok=True)
+    with open(os.path.join(target, "config.ini"), "w") as f:
+        f.write(f"[main]\nenabled_instances = {INSTANCE}\n\n")
+        f.write(f"[{INSTANCE}]\nmodule = enshrouded\napi_endpoint = {INSTANCE}\njson_path = {json_path}\n")
+    port = free_port()
+    process = subprocess.Popen(command(port), cwd=target, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/api/{INSTANCE}/players"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Server ist nicht gestartet: {' '.join(command(port))}")
+
+
+def run_load(url, clients, seconds):
+    parsed = urllib.parse.urlsplit(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def worker():
+        local = []
+        local_errors = 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+                conn.request("GET", parsed.path)
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                if response.status != 200:
+                    local_errors += 1
+                    continue
+            except OSError:
+                local_errors += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.path.join(BASE_DIR, "flask_api"))
+    parser.add_argument("--url", help="Vorhandenen Server testen statt gunicorn zu starten")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--players", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        url = args.url
+        if not url:
+            json_path = os.path.join(tmp, "players.json")
+            write_players(json_path, args.players)
+            process, url = start_gunicorn(args.app_dir, tmp, json_path, args.workers)
+        try:
+            latencies, errors = run_load(url, args.clients, args.seconds)
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    print(f"URL:          {url}")
+    print(f"Anfragen/s:   {len(latencies) / args.seconds:,.0f}")
+    print(f"p50 / p99:    {percentile(latencies, 0.5) * 1000:.2f} ms / {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"Fehler:       {errors}")
+
+
+if __name__ == "__main__":
+    main()
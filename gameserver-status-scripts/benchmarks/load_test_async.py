@@ -0,0 +1,166 @@
+"""Lasttest mit vielen gleichzeitigen Verbindungen: gunicorn sync vs. gunicorn gevent vs. ASGI (uvicorn).
+
+Ein asyncio-Lastgenerator (nur Standardbibliothek) hält `--connections` Verbindungen
+gleichzeitig offen und schickt auf jeder für `--seconds` Sekunden eine /players-Anfrage
+nach der anderen (HTTP/1.1 Keep-Alive, sofern der Server die Verbindung nicht schließt).
+Zusätzlich können `--slow-clients` Verbindungen geöffnet werden, die ihre Anfrage nie
+zu Ende senden – wie langsame Mobilclients. Gemeldet werden Anfragen/s, p50/p99-Latenz
+und Fehler (inkl. Zeitüberschreitungen nach `--timeout` Sekunden) pro Modus:
+
+    sync     gunicorn --workers N (Standard-Worker, eine Anfrage pro Prozess)
+    gevent   gunicorn --workers N --worker-class gevent --worker-connections 1000 (wie der systemd-Dienst)
+    async    uvicorn asgi:application --workers N (modules/async_api.py)
+
+Der Lastgenerator läuft in einem Prozess auf demselben Rechner; bei wenigen Kernen
+begrenzt er den Durchsatz mit. Alles läuft lokal auf 127.0.0.1.
+
+Aufruf:  python3 benchmarks/load_test_async.py [--connections 1000] [--modes sync,gevent,async]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_test_api import BASE_DIR, percentile, start_server, write_players
+
+MODES = {
+    "sync": lambda workers: lambda port: [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "app:app"],
+    "gevent": lambda workers: lambda port: [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers), "--worker-class", "gevent",
+        "--worker-connections", "1000", "--bind", f"127.0.0.1:{port}", "app:app"],
+    "async": lambda workers: lambda port: [
+        sys.executable, "-m", "uvicorn", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "--no-access-log", "asgi:application"],
+}
+
+
+async def read_response(reader):
+    """Liest eine HTTP/1.1-Antwort; gibt (Status, Verbindung bleibt offen) zurück."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Verbindung geschlossen")
+    version, status = status_line.split(b" ", 2)[:2]
+    length = None
+    keep_alive = version == b"HTTP/1.1"
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection":
+            keep_alive = value.strip().lower() == b"keep-alive"
+        elif name == b"transfer-encoding":
+            raise ValueError("chunked wird nicht unterstützt")
+    if length is None:
+        await reader.read()
+        keep_alive = False
+    else:
+        await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def client(host, port, request, stop_at, timeout, latencies, errors):
+    loop = asyncio.get_running_loop()
+    reader = writer = None
+    while loop.time() < stop_at:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors[f"HTTP {status}"] = errors.get(f"HTTP {status}", 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def slow_client(host, port, path, stop_at):
+    """Sendet nur den Anfang einer Anfrage und hält die Verbindung bis zum Ende offen."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n".encode())
+        while asyncio.get_running_loop().time() < stop_at:
+            await asyncio.sleep(1)
+            writer.write(b"X-Slow: 1\r\n")
+        writer.close()
+    except OSError:
+        pass
+
+
+async def run_load(url, connections, seconds, timeout, slow_clients=0):
+    parsed = urllib.parse.urlsplit(url)
+    host, port, path = parsed.hostname, parsed.port, parsed.path
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n\r\n".encode()
+    latencies = []
+    errors = {}
+    stop_at = asyncio.get_running_loop().time() + seconds
+    slow = [asyncio.ensure_future(slow_client(host, port, path, stop_at)) for _ in range(slow_clients)]
+    await asyncio.sleep(0.5 if slow_clients else 0)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, request, stop_at, timeout, latencies, errors)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*slow)
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.path.join(BASE_DIR, "flask_api"))
+    parser.add_argument("--modes", default="sync,gevent,async")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--slow-clients", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--players", type=int, default=50)
+    args = parser.parse_args()
+
+    # Jede Verbindung braucht auf beiden Seiten einen Dateideskriptor.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = 2 * (args.connections + args.slow_clients) + 256
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    print(f"{args.connections} Verbindungen, {args.slow_clients} langsame Clients, {args.workers} Worker, "
+          f"{args.seconds:.0f} s pro Modus")
+    print(f"{'Modus':<8} {'Anfragen/s':>11} {'p50 ms':>9} {'p99 ms':>9}  Fehler")
+    for mode in args.modes.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "players.json")
+            write_players(json_path, args.players)
+            process, url = start_server(args.app_dir, tmp, json_path, MODES[mode](args.workers))
+            try:
+                latencies, errors, elapsed = asyncio.run(
+                    run_load(url, args.connections, args.seconds, args.timeout, args.slow_clients))
+            finally:
+                process.terminate()
+                process.wait()
+        error_text = ", ".join(f"{name}: {count}" for name, count in sorted(errors.items())) or "-"
+        print(f"{mode:<8} {len(latencies) / elapsed:>11,.0f} {percentile(latencies, 0.5) * 1000:>9.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>9.1f}  {error_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Erzeugt synthetische Enshrouded- und Valheim-Serverlogs für Benchmarks."""
+import random
+
+ENSHROUDED_NOISE = [
+    "[I {ts}] [server] Saving world...",
+    "[I {ts}] [server] World saved in 312 ms",
+    "[I {ts}] [network] Ping statistics: min 12 ms, avg 34 ms, max 80 ms",
+    "[W {ts}] [physics] Object 0x7f3a12 fell out of world, resetting",
+    "[I {ts}] [ai] Spawned 4 enemies in region 12/7",
+]
+
+VALHEIM_NOISE = [
+    "{date}: Saving 12345 zdos",
+    "{date}: World saved ( 150.123ms )",
+    "{date}: Connections 3 ZDOS:45123  sent:12 recv:40",
+    "{date}: Placed locations in zone 3,-7",
+    "{date}: Destroying abandoned non persistent zdo 1234:5678 owner 0",
+]
+
+
+def _enshrouded_ts(second):
+    return f"{second // 3600 % 24:02d}:{second // 60 % 60:02d}:{second % 60:02d},000"
+
+
+def _valheim_date(second):
+    return f"02/14/2024 {second // 3600 % 24:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+
+
+def enshrouded_lines(count, players=20, noise_ratio=0.98, seed=1):
+    """Liefert `count` Enshrouded-Logzeilen mit Login/Logout-Zyklen zwischen Rauschzeilen."""
+    rng = random.Random(seed)
+    online = {}
+    next_handle = 1
+    produced = 0
+    second = 0
+    while produced < count:
+        second += 1
+        ts = _enshrouded_ts(second)
+        if rng.random() < noise_ratio:
+            yield rng.choice(ENSHROUDED_NOISE).format(ts=ts)
+            produced += 1
+            continue
+        name = f"Player{rng.randrange(players)}"
+        if name in online:
+            handle = online.pop(name)
+            event = [f"[I {ts}] [server] Remove Player '{name}'",
+                     f"[I {ts}] [network] Removed peer #{handle}"]
+        else:
+            handle = next_handle
+            next_handle += 1
+            online[name] = handle
+            event = [f"[I {ts}] [server] Remote player added. Player handle: {handle}(1)",
+                     f"[I {ts}] [server] Player '{name}' logged in with Permissions:",
+                     f"[I {ts}]  - CanAccessInventories",
+                     f"[I {ts}]  - CanEditBase"]
+        for line in event[:count - produced]:
+            yield line
+            produced += 1
+
+
+def valheim_lines(count, players=20, noise_ratio=0.98, seed=1):
+    """Liefert `count` Valheim-Logzeilen mit Connect/Login/Disconnect-Zyklen zwischen Rauschzeilen."""
+    rng = random.Random(seed)
+    online = set()
+    produced = 0
+    second = 0
+    while produced < count:
+        second += 1
+        date = _valheim_date(second)
+        if rng.random() < noise_ratio:
+            yield rng.choice(VALHEIM_NOISE).format(date=date)
+            produced += 1
+            continue
+        index = rng.randrange(players)
+        name = f"Viking{index}"
+        steam_id = str(76561198000000000 + index)
+        if name in online:
+            online.discard(name)
+            event = [f"{date}: Closing socket {steam_id}"]
+        else:
+            online.add(name)
+            event = [f"{date}: Got connection SteamID {steam_id}",
+                     f"{date}: Got character ZDOID from {name} : -123456:1"]
+        for line in event[:count - produced]:
+            yield line
+            produced += 1
+
+
+class Scenario:
+    """Synthetisches Log mit bekanntem Endzustand für Regressionsläufe (bench_regression.py).
+
+    Wie enshrouded_lines/valheim_lines, aber Ereignisse werden nie abgeschnitten, und
+    `storms` Mal (gleichmäßig verteilt, der letzte am Ende) fallen alle angemeldeten
+    Spieler gleichzeitig aus und verbinden sich sofort neu (Reconnect-Sturm): erst alle Verbindungen, dann alle Logins in derselben
+    Reihenfolge, dazu Verbindungen ohne Login. Bei Enshrouded kommt für die Hälfte der
+    Spieler das Ende der alten Session erst nach dem neuen Login an; bei Valheim meldet
+    jeder Spieler danach einen erneuten Spawn.
+
+    Die Iteration liefert (Logsekunde, Zeile). Danach enthält `expected` die angemeldeten
+    Spieler als {Name: Handle bzw. SteamID} und `second` die letzte Logsekunde.
+
+    :param game: 'enshrouded' oder 'valheim'.
+    :param count: Mindestanzahl der Zeilen.
+    """
+
+    def __init__(self, game, count, players=20, noise_ratio=0.98, seed=1, storms=0):
+        if game not in ("enshrouded", "valheim"):
+            raise ValueError(f"Unbekanntes Spiel: {game}")
+        self.game = game
+        self.count = count
+        self.players = players
+        self.noise_ratio = noise_ratio
+        self.seed = seed
+        self.storms = storms
+        self.expected = {}
+        self.second = 0
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        self.expected = {}
+        self.second = 0
+        self.next_handle = 1
+        # Der letzte Sturm schließt das Log ab; seine Paarungen prägen den Endzustand.
+        storm_at = [self.count * (index + 1) // self.storms for index in range(self.storms)]
+        produced = 0
+        while produced < self.count or storm_at:
+            self.second += 1
+            if storm_at and produced >= storm_at[0]:
+                storm_at.pop(0)
+                event = self._storm(rng)
+            elif rng.random() < self.noise_ratio:
+                event = [self._noise(rng)]
+            else:
+                event = self._toggle(rng.randrange(self.players))
+            for second, line in event:
+                self.second = max(self.second, second)
+                yield second, line
+            produced += len(event)
+
+    def _noise(self, rng):
+        if self.game == "enshrouded":
+            return self.second, rng.choice(ENSHROUDED_NOISE).format(ts=_enshrouded_ts(self.second))
+        return self.second, rng.choice(VALHEIM_NOISE).format(date=_valheim_date(self.second))
+
+    def _toggle(self, index):
+        """Meldet Spieler `index` an oder ab (je nachdem, ob er gerade angemeldet ist)."""
+        if self.game == "enshrouded":
+            name = f"Player{index}"
+            if name in self.expected:
+                return self._enshrouded_leave(name, self.second)
+            return self._enshrouded_join([name], self.second)
+        name = f"Viking{index}"
+        if name in self.expected:
+            return self._valheim_leave(name, self.second)
+        return self._valheim_join([name], self.second)
+
+    def _enshrouded_join(self, names, second):
+        """Alle Sessions zuerst, dann Login und Berechtigungen in derselben Reihenfolge."""
+        ts = _enshrouded_ts(second)
+        lines = []
+        for name in names:
+            self.expected[name] = self.next_handle
+            lines.append((second, f"[I {ts}] [server] Remote player added. Player handle: {self.next_handle}(1)"))
+            self.next_handle += 1
+        for name in names:
+            lines += [(second, f"[I {ts}] [server] Player '{name}' logged in with Permissions:"),
+                      (second, f"[I {ts}]  - CanAccessInventories"),
+                      (second, f"[I {ts}]  - CanEditBase")]
+        return lines
+
+    def _enshrouded_leave(self, name, second):
+        ts = _enshrouded_ts(second)
+        handle = self.expected.pop(name)
+        return [(second, f"[I {ts}] [server] Remove Player '{name}'"),
+                (second, f"[I {ts}] [network] Removed peer #{handle}")]
+
+    def _valheim_join(self, names, second):
+        date = _valheim_date(second)
+        lines = []
+        for name in names:
+            self.expected[name] = str(76561198000000000 + int(name[6:]))
+            lines.append((second, f"{date}: Got connection SteamID {self.expected[name]}"))
+        lines += [(second, f"{date}: Got character ZDOID from {name} : -123456:1") for name in names]
+        return lines
+
+    def _valheim_leave(self, name, second):
+        return [(second, f"{_valheim_date(second)}: Closing socket {self.expected.pop(name)}")]
+
+    def _storm(self, rng):
+        """Reconnect-Sturm über zwei Logsekunden; danach 121 s Pause, damit verwaiste Verbindungen verfallen."""
+        names = sorted(self.expected)
+        second = self.second
+        lines = []
+        if self.game == "enshrouded":
+            late = names[len(names) // 2:]
+            old_handles = {name: self.expected[name] for name in late}
+            ts = _enshrouded_ts(second)
+            lines += [(second, f"[I {ts}] [network] Removed peer #{self.expected.pop(name)}")
+                      for name in names[:len(names) // 2]]
+            lines += self._enshrouded_join(names, second + 1)
+            ts = _enshrouded_ts(second + 1)
+            lines += [(second + 1, f"[I {ts}] [network] Disconnecting peer #{old_handles[name]}") for name in late]
+            for _ in range(max(1, len(names) // 10)):
+                lines.append((second + 1, f"[I {ts}] [server] Remote player added. Player handle: {self.next_handle}(1)"))
+                self.next_handle += 1
+        else:
+            lines += [(second, f"{_valheim_date(second)}: Closing socket {self.expected.pop(name)}") for name in names]
+            lines += self._valheim_join(names, second + 1)
+            date = _valheim_date(second + 1)
+            lines += [(second + 1, f"{date}: Got character ZDOID from {name} : -123456:1") for name in names]
+            lines += [(second + 1, f"{date}: Got connection SteamID {76561199000000000 + rng.randrange(10 ** 6)}")
+                      for _ in range(max(1, len(names) // 10))]
+        self.second = second + 122
+        return lines
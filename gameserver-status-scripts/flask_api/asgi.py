@@ -0,0 +1,5 @@
+"""Einstiegspunkt für den async-Modus: `uvicorn asgi:application` (siehe README)."""
+from app import app
+from modules.async_api import AsyncGamesApi
+
+application = AsyncGamesApi(app)
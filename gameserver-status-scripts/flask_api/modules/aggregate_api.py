@@ -0,0 +1,127 @@
+import json
+import threading
+
+from flask import jsonify, request
+
+from modules.player_cache import CachedSnapshot, render_players, snapshot_response
+
+# Anzahl der Filterkombinationen, deren fertige Antworten pro Worker vorgehalten werden.
+MAX_CACHED_RESPONSES = 64
+
+
+def split_filter(value):
+    """'a, b,,c' -> ('a', 'b', 'c'); None oder leer -> None (kein Filter)."""
+    if not value:
+        return None
+    items = tuple(sorted({item.strip() for item in value.split(',') if item.strip()}))
+    return items or None
+
+
+class AggregateCache:
+    """Fasst die PlayerCaches aller Instanzen zu /api/all/players und /api/all/summary zusammen.
+
+    Die Antworten werden pro Filterkombination (Art, Instanzen, Rollen) als fertiger
+    CachedSnapshot (Bytes, gzip, ETag) vorgehalten. Gültig bleibt ein Eintrag, solange jede
+    beteiligte Instanz noch denselben Snapshot liefert; ändert sich eine davon, wird nur
+    diese Kombination beim nächsten Abruf neu zusammengesetzt. Die Instanz-Snapshots selbst
+    kommen aus den bestehenden PlayerCaches, es wird also keine Datei zusätzlich gelesen.
+    """
+
+    def __init__(self, instances, max_age=0):
+        """
+        :param instances: Liste von (Endpunkt, Modul, PlayerCache) in der Reihenfolge der Konfiguration.
+        :param max_age: Wert für 'Cache-Control: max-age' der Antworten.
+        """
+        self.instances = list(instances)
+        self.max_age = max_age
+        self.by_name = {name: (name, module, cache) for name, module, cache in self.instances}
+        self.entries = {}  # (Art, Instanzen, Rollen) -> (Quell-Snapshots, CachedSnapshot)
+        self.lock = threading.Lock()
+
+    def select(self, names):
+        """Gewählte Instanzen (alle bei None) oder ValueError mit den unbekannten Namen."""
+        if names is None:
+            return self.instances
+        unknown = [name for name in names if name not in self.by_name]
+        if unknown:
+            raise ValueError(', '.join(unknown))
+        return [instance for instance in self.instances if instance[0] in names]
+
+    def get(self, kind, names=None, roles=None):
+        """Gibt den CachedSnapshot für 'players' oder 'summary' mit den angegebenen Filtern zurück."""
+        selected = self.select(names)
+        sources = tuple(cache.get() for _, _, cache in selected)
+        key = (kind, names, roles)
+        entry = self.entries.get(key)
+        if entry is not None and len(entry[0]) == len(sources) and all(
+                old is new for old, new in zip(entry[0], sources)):
+            return entry[1]
+        with self.lock:
+            previous = None if entry is None else entry[1]
+            if kind == 'players':
+                body = self._players(selected, sources, roles)
+            else:
+                body = render_players(self._summary(selected, sources, roles))
+            mtimes = [snapshot.mtime for snapshot in sources]
+            mtime = max(mtimes) if mtimes and None not in mtimes else None
+            snapshot = CachedSnapshot(body, None, mtime, previous=previous,
+                                      source_version=max((s.version for s in sources), default=0))
+            if len(self.entries) >= MAX_CACHED_RESPONSES and key not in self.entries:
+                self.entries.clear()
+            self.entries[key] = (sources, snapshot)
+            return snapshot
+
+    @staticmethod
+    def _filtered(players, roles):
+        if roles is None:
+            return [player for player in players if isinstance(player, dict)]
+        return [player for player in players if isinstance(player, dict) and player.get('role') in roles]
+
+    def _players(self, selected, sources, roles):
+        """Setzt die Antwort aus den bereits serialisierten Spielerlisten der Instanzen zusammen.
+
+        Ohne Rollenfilter wird `body` jeder Instanz unverändert übernommen; nur die gefilterten
+        Listen werden neu serialisiert.
+        """
+        parts = []
+        total = 0
+        for (name, module, _), snapshot in zip(selected, sources):
+            if roles is None and isinstance(snapshot.players, list):
+                count = sum(1 for player in snapshot.players if isinstance(player, dict))
+                players_body = snapshot.body
+            else:
+                players = self._filtered(snapshot.players, roles)
+                count = len(players)
+                players_body = render_players(players)
+            total += count
+            header = json.dumps({"instance": name, "game": module, "version": snapshot.version,
+                                 "player_count": count}, ensure_ascii=False)
+            parts.append(header[:-1].encode('utf-8') + b', "players": ' + players_body + b'}')
+        return b'{"player_count": %d, "instances": [' % total + b', '.join(parts) + b']}'
+
+    def _summary(self, selected, sources, roles):
+        instances = []
+        total_roles = {}
+        total = 0
+        for (name, module, _), snapshot in zip(selected, sources):
+            role_counts = {}
+            players = self._filtered(snapshot.players, roles)
+            for player in players:
+                role = player.get('role') or 'Unbekannt'
+                role_counts[role] = role_counts.get(role, 0) + 1
+                total_roles[role] = total_roles.get(role, 0) + 1
+            total += len(players)
+            instances.append({"instance": name, "game": module, "version": snapshot.version,
+                              "player_count": len(players), "roles": role_counts})
+        return {"player_count": total, "roles": total_roles, "instances": instances}
+
+
+def aggregate_response(aggregate, kind):
+    """Antwort für /api/all/players bzw. /api/all/summary mit den Filtern ?instances=a,b&role=Admin."""
+    try:
+        snapshot = aggregate.get(kind, split_filter(request.args.get('instances')), split_filter(request.args.get('role')))
+    except ValueError as e:
+        response = jsonify({"error": f"Unbekannte Instanz(en): {e}"})
+        response.status_code = 400
+        return response
+    return snapshot_response(snapshot, aggregate.max_age)
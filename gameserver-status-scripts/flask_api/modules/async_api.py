@@ -0,0 +1,304 @@
+import asyncio
+import json
+import sys
+import time
+import urllib.parse
+
+from asgiref.wsgi import WsgiToAsgi
+
+from modules.aggregate_api import split_filter
+from modules.change_notifier import NOTIFIER
+from modules.live_updates import LONG_POLL_DEFAULT_SECONDS, LONG_POLL_MAX_SECONDS, SSE_HEARTBEAT_SECONDS, change_event
+from modules.player_cache import accepts_gzip, not_modified, snapshot_headers
+
+JSON_TYPE = 'application/json; charset=utf-8'
+
+
+def _number(query, name, default, convert=float):
+    try:
+        return convert(query.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class AsyncGamesApi:
+    """ASGI-Anwendung für den async-Modus (asgi.py, z.B. unter uvicorn).
+
+    Die häufigen Lese-Endpunkte (/api/<instanz>/players inkl. Long-Poll, /api/<instanz>/events
+    und /api/all/...) werden direkt auf der Event-Loop beantwortet: Eine Anfrage liest nur
+    den fertigen CachedSnapshot aus dem Speicher, es gibt keinen Systemaufruf und keinen
+    Thread pro Verbindung. Alle PlayerCaches des Prozesses werden von einem Hintergrund-Task
+    aktualisiert, der das Lesen und Serialisieren der Dateien in einem Thread erledigt
+    (alle `refresh_interval` Sekunden und sofort bei jeder inotify-Meldung).
+
+    Alle übrigen Pfade (/stats, /history, /metrics, Instanzen mit eigenem Modul) beantwortet
+    die Flask-Anwendung über asgiref in einem Thread.
+    """
+
+    def __init__(self, flask_app, refresh_interval=None):
+        """
+        :param flask_app: Die Flask-Anwendung aus app.py (mit `extensions['games_api']`).
+        :param refresh_interval: Sekunden zwischen zwei Prüfungen aller Dateien
+                                 (Standard: kleinstes `cache_revalidate_seconds` der Instanzen).
+        """
+        shared = flask_app.extensions['games_api']
+        self.registry = shared['registry']
+        self.metrics = shared['metrics']
+        if refresh_interval is None:
+            refresh_interval = min((instance.revalidate_interval for instance in self.registry.state.instances.values()),
+                                   default=1.0)
+        self.refresh_interval = max(refresh_interval, 0.05)
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.loop = None
+        self.starting = None
+        self.refresher = None
+        self.changed = {}  # PlayerCache -> asyncio.Event, wird bei jeder Änderung ersetzt
+        self.seen = {}     # PlayerCache -> zuletzt gemeldeter Snapshot
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        await self._start()
+        if scope['method'] in ('GET', 'HEAD'):
+            handler = self._route(scope['path'])
+            if handler is not None:
+                await handler(scope, receive, send)
+                return
+        await self.wsgi(scope, receive, send)
+
+    # --- Start, Hintergrund-Aktualisierung ---
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.refresher is not None:
+                    self.refresher.cancel()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _start(self):
+        """Wartet, bis alle Dateien einmal eingelesen sind und der Hintergrund-Task läuft (einmal pro Prozess)."""
+        if self.starting is None:
+            self.loop = asyncio.get_running_loop()
+            self.starting = self.loop.create_task(self._startup())
+        if not self.starting.done():
+            await asyncio.shield(self.starting)
+
+    async def _startup(self):
+        caches = await asyncio.to_thread(self._refresh_all)
+        NOTIFIER.ensure_started()
+        for cache in caches:
+            self.seen[cache] = cache.snapshot
+        self.refresher = self.loop.create_task(self._refresh_loop())
+
+    def _refresh_all(self):
+        """Läuft im Thread: prüft config.ini und alle Caches, schreibt die Worker-Datei der Metriken.
+
+        Gibt die Caches der aktuellen Instanzen zurück. Neue Instanzen werden hier eingelesen,
+        bevor ihr Cache in den Hintergrund-Modus wechselt.
+        """
+        caches = [instance.player_cache for instance in self.registry.current().instances.values()]
+        for cache in caches:
+            cache.refresh()
+            if not cache.background:
+                cache.listeners.append(self._notify_threadsafe)
+                cache.background = True
+        if self.metrics is not None and self.metrics.metrics_dir:
+            self.metrics.write_worker_file()
+        return caches
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                caches = await asyncio.to_thread(self._refresh_all)
+            except Exception as e:
+                print(f"FEHLER beim Aktualisieren der Spielerdaten: {e}", file=sys.stderr)
+                continue
+            # Auch Änderungen, die ein anderer Thread ohne Benachrichtigung übernommen hat.
+            for cache in caches:
+                self._wake(cache)
+            # Caches entfernter Instanzen vergessen
+            for cache in set(self.seen) - set(caches):
+                del self.seen[cache]
+                self.changed.pop(cache, None)
+
+    def _notify_threadsafe(self, cache):
+        """Listener des PlayerCache; wird aus dem Thread des ChangeNotifier bzw. des Refreshers aufgerufen."""
+        self.loop.call_soon_threadsafe(self._wake, cache)
+
+    def _wake(self, cache):
+        if cache.snapshot is self.seen.get(cache):
+            return
+        self.seen[cache] = cache.snapshot
+        event = self.changed.pop(cache, None)
+        if event is not None:
+            event.set()
+
+    async def _wait_for_change(self, cache, version, timeout):
+        """Wie PlayerCache.wait_for_change, aber ohne Thread: neuer Snapshot oder None nach `timeout`."""
+        deadline = self.loop.time() + timeout
+        while cache.get().version == version:
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self.changed.setdefault(cache, asyncio.Event()).wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return cache.get()
+
+    # --- Endpunkte ---
+
+    def _route(self, path):
+        parts = path.split('/')
+        if len(parts) != 4 or parts[0] or parts[1] != 'api':
+            return None
+        _, _, name, endpoint = parts
+        state = self.registry.state
+        if name == 'all' and endpoint in ('players', 'summary'):
+            aggregate = state.aggregate()
+            if aggregate is not None:
+                return lambda scope, receive, send: self._aggregate(scope, send, aggregate, endpoint)
+        instance = state.instances.get(name)
+        if instance is None or instance.custom_module is not None:
+            return None
+        if endpoint == 'players':
+            return lambda scope, receive, send: self._players(scope, send, instance)
+        if endpoint == 'events':
+            return lambda scope, receive, send: self._events(scope, receive, send, instance)
+        return None
+
+    async def _players(self, scope, send, instance):
+        started = time.perf_counter()
+        query = _query(scope)
+        cache, max_age, blueprint = instance.player_cache, instance.max_age, instance.blueprint_name
+        snapshot = cache.get()
+        if 'wait' in query:
+            version = _number(query, 'wait', None, int)
+            if version == snapshot.version:
+                timeout = min(max(_number(query, 'timeout', LONG_POLL_DEFAULT_SECONDS), 0.0), LONG_POLL_MAX_SECONDS)
+                snapshot = await self._wait_for_change(cache, version, timeout)
+                if snapshot is None:
+                    await _respond(send, scope, 304, {'X-Players-Version': str(version), 'Cache-Control': 'no-cache'})
+                    self._observe(blueprint, 'get_players', 304, started)
+                    return
+            max_age = 0
+        status = await _respond_snapshot(send, scope, snapshot, max_age)
+        self._observe(blueprint, 'get_players', status, started)
+
+    async def _events(self, scope, receive, send, instance):
+        started = time.perf_counter()
+        cache, blueprint = instance.player_cache, instance.blueprint_name
+        headers = _headers(scope)
+        query = _query(scope)
+        last_version = _number(query, 'since', None, int)
+        if 'last-event-id' in headers:
+            try:
+                last_version = int(headers['last-event-id'])
+            except ValueError:
+                pass
+        await send({'type': 'http.response.start', 'status': 200, 'headers': _encode({
+            'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})})
+        self._observe(blueprint, 'get_events', 200, started)
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await _until_disconnect(receive, self._event_stream(send, cache, last_version))
+
+    async def _event_stream(self, send, cache, last_version):
+        snapshot = cache.get()
+        first = b"retry: 3000\n\n"
+        if snapshot.version != last_version:
+            first += snapshot.snapshot_event
+        await send({'type': 'http.response.body', 'body': first, 'more_body': True})
+        version = snapshot.version
+        while True:
+            snapshot = await self._wait_for_change(cache, version, SSE_HEARTBEAT_SECONDS)
+            if snapshot is None:
+                await send({'type': 'http.response.body', 'body': b": keepalive\n\n", 'more_body': True})
+                continue
+            event = change_event(snapshot, version)
+            if event is not None:
+                await send({'type': 'http.response.body', 'body': event, 'more_body': True})
+            version = snapshot.version
+
+    async def _aggregate(self, scope, send, aggregate, kind):
+        started = time.perf_counter()
+        query = _query(scope)
+        try:
+            snapshot = aggregate.get(kind, split_filter(query.get('instances')), split_filter(query.get('role')))
+        except ValueError as e:
+            # Wie jsonify in aggregate_response
+            body = json.dumps({"error": f"Unbekannte Instanz(en): {e}"}, separators=(",", ":")) + "\n"
+            status = await _respond(send, scope, 400, {'Content-Type': 'application/json'}, body.encode('utf-8'))
+        else:
+            status = await _respond_snapshot(send, scope, snapshot, aggregate.max_age)
+        self._observe('aggregate_api', f'get_{kind}', status, started)
+
+    def _observe(self, blueprint, endpoint, status, started):
+        if self.metrics is not None:
+            self.metrics.observe(blueprint, endpoint, status, time.perf_counter() - started)
+
+
+def _query(scope):
+    """Query-Parameter wie request.args.get: bei Wiederholung gilt der erste Wert."""
+    query = {}
+    for name, value in urllib.parse.parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True):
+        query.setdefault(name, value)
+    return query
+
+
+def _headers(scope):
+    return {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+
+def _encode(headers):
+    return [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+
+
+async def _respond(send, scope, status, headers, body=b''):
+    if status != 304:
+        headers['Content-Length'] = str(len(body))
+    await send({'type': 'http.response.start', 'status': status, 'headers': _encode(headers)})
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+    return status
+
+
+async def _respond_snapshot(send, scope, snapshot, max_age):
+    """Wie player_cache.snapshot_response: 304, gzip-Variante oder die fertigen Bytes."""
+    request_headers = _headers(scope)
+    use_gzip = accepts_gzip(request_headers.get('accept-encoding', ''))
+    headers = snapshot_headers(snapshot, use_gzip, max_age)
+    if not_modified(snapshot, request_headers.get('if-none-match'), request_headers.get('if-modified-since')):
+        return await _respond(send, scope, 304, headers)
+    headers['Content-Type'] = JSON_TYPE
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        return await _respond(send, scope, 200, headers, snapshot.gzip_body)
+    return await _respond(send, scope, 200, headers, snapshot.body)
+
+
+async def _until_disconnect(receive, coroutine):
+    """Führt `coroutine` aus, bricht aber ab, sobald der Client die Verbindung schließt (dann None)."""
+    task = asyncio.ensure_future(coroutine)
+    disconnect = asyncio.ensure_future(_disconnected(receive))
+    try:
+        await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for pending in (task, disconnect):
+            if not pending.done():
+                pending.cancel()
+    return task.result() if task.done() and not task.cancelled() else None
+
+
+async def _disconnected(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
@@ -0,0 +1,141 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+# --- inotify-Konstanten (siehe <sys/inotify.h>) ---
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+# Die Parser ersetzen die JSON-Datei atomar per rename, daher reicht IN_MOVED_TO im Normalfall.
+_DIR_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def _load_libc():
+    """Lädt die libc mit den inotify-Funktionen oder gibt None zurück."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class ChangeNotifier:
+    """Ein Hintergrund-Thread pro Worker-Prozess, der die JSON-Dateien aller Instanzen beobachtet.
+
+    Per inotify auf die Verzeichnisse der JSON-Dateien wird jede Änderung sofort an den
+    zuständigen PlayerCache gemeldet, der dann wartende Long-Poll- und SSE-Clients weckt.
+    Ohne inotify (oder wenn ein Verzeichnis fehlt) werden die Dateien stattdessen alle
+    `poll_interval` Sekunden per os.stat geprüft. Unter gevent wird der Thread zum Greenlet;
+    gewartet wird deshalb ausschließlich über select.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.caches = {}  # Verzeichnis -> {Dateiname (bytes) -> [PlayerCache, ...]}
+        self.lock = threading.Lock()
+        self.pid = None
+        self.fd = -1
+
+    def register(self, cache):
+        """Nimmt einen Cache auf; läuft der Thread schon, wird ein neues Verzeichnis sofort beobachtet."""
+        path = os.path.abspath(cache.json_path)
+        directory = os.path.dirname(path)
+        with self.lock:
+            new_directory = directory not in self.caches
+            by_name = self.caches.setdefault(directory, {})
+            by_name.setdefault(os.fsencode(os.path.basename(path)), []).append(cache)
+            if new_directory and self.fd >= 0 and self.pid == os.getpid():
+                if _libc.inotify_add_watch(self.fd, os.fsencode(directory), _DIR_EVENTS) < 0:
+                    err = ctypes.get_errno()
+                    print(f"WARNUNG: inotify für '{directory}' nicht möglich ({os.strerror(err)}); "
+                          f"Änderungen werden erst bei der nächsten Anfrage erkannt.", file=sys.stderr)
+
+    def unregister(self, cache):
+        """Entfernt einen Cache wieder (z.B. wenn seine Instanz aus der config.ini entfernt wurde)."""
+        path = os.path.abspath(cache.json_path)
+        with self.lock:
+            caches = self.caches.get(os.path.dirname(path), {}).get(os.fsencode(os.path.basename(path)), [])
+            if cache in caches:
+                caches.remove(cache)
+
+    def ensure_started(self):
+        """Startet den Thread im aktuellen Prozess (nach einem fork von gunicorn erneut)."""
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.fd = self._open_inotify()
+            thread = threading.Thread(target=self._run, name="player-change-notifier", daemon=True)
+            thread.start()
+
+    def _open_inotify(self):
+        """Legt eine inotify-Instanz mit allen Verzeichnissen an oder gibt -1 zurück (Polling)."""
+        if _libc is None:
+            return -1
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return -1
+        for directory in self.caches:
+            if _libc.inotify_add_watch(fd, os.fsencode(directory), _DIR_EVENTS) < 0:
+                err = ctypes.get_errno()
+                print(f"WARNUNG: inotify für '{directory}' nicht möglich ({os.strerror(err)}), "
+                      f"nutze Polling.", file=sys.stderr)
+                os.close(fd)
+                return -1
+        return fd
+
+    def _all_caches(self):
+        with self.lock:
+            return [cache for by_name in self.caches.values() for caches in by_name.values() for cache in caches]
+
+    def _run(self):
+        if self.fd < 0:
+            while True:
+                select.select([], [], [], self.poll_interval)
+                for cache in self._all_caches():
+                    cache.refresh()
+        while True:
+            select.select([self.fd], [], [], None)
+            for cache in self._changed_caches():
+                cache.refresh()
+
+    def _changed_caches(self):
+        """Liest alle anstehenden Events und gibt die betroffenen Caches zurück."""
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _wd, _mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                names.add(data[offset:offset + name_len].rstrip(b"\0"))
+                offset += name_len
+        changed = []
+        with self.lock:
+            for by_name in self.caches.values():
+                for name in names & by_name.keys():
+                    changed.extend(by_name[name])
+        return changed
+
+
+# Gemeinsamer Notifier aller Instanzen eines Worker-Prozesses.
+NOTIFIER = ChangeNotifier()
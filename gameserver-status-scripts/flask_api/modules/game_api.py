@@ -0,0 +1,79 @@
+from flask import Blueprint, abort, g
+
+from modules.aggregate_api import aggregate_response
+from modules.live_updates import events_response, players_response
+from modules.session_history import history_response, stats_response
+
+def create_blueprint(registry):
+    """
+    Erstellt den Blueprint mit den Endpunkten aller Instanzen unter /api/<instanz>/...
+
+    Die Endpunkte sind für alle Spiele gleich, da die Parser dasselbe JSON-Format schreiben.
+    Es gibt nur eine Route pro Endpunkt; die Instanz wird bei jeder Anfrage in der
+    InstanceRegistry nachgeschlagen. Neue Instanzen vergrößern die URL-Map daher nicht
+    und werden nach einer Änderung der config.ini ohne Neustart erreichbar.
+    /api/all/players und /api/all/summary fassen alle Instanzen zusammen.
+
+    :param registry: Die InstanceRegistry der Anwendung.
+    :return: Ein konfigurierter Flask Blueprint.
+    """
+    # Der url_prefix enthält die Instanz als Variable, z.B. /api/enshrouded-public
+    game_bp = Blueprint('game_api', __name__, url_prefix='/api/<instance>')
+
+    def lookup(instance):
+        entry = registry.get(instance)
+        if entry is None:
+            abort(404)
+        # Metriken weiter pro Instanz (modules/metrics.py)
+        g.metrics_blueprint = entry.blueprint_name
+        return entry
+
+    def aggregate(instance, kind):
+        """Antwort für /api/all/<kind> oder None, wenn die Anfrage keine Sammel-Anfrage ist."""
+        if instance != 'all':
+            return None
+        aggregate_cache = registry.current().aggregate()
+        if aggregate_cache is None:
+            return None
+        g.metrics_blueprint = 'aggregate_api'
+        return aggregate_response(aggregate_cache, kind)
+
+    @game_bp.route('/players')
+    def get_players(instance):
+        """Spielerliste einer Instanz (mit ?wait=<version> als Long-Poll); /api/all/players für alle Instanzen."""
+        response = aggregate(instance, 'players')
+        if response is not None:
+            return response
+        entry = lookup(instance)
+        return players_response(entry.player_cache, entry.max_age)
+
+    @game_bp.route('/summary')
+    def get_summary(instance):
+        """Spieleranzahl pro Instanz und Rolle (nur /api/all/summary, ?instances=a,b&role=Admin)."""
+        response = aggregate(instance, 'summary')
+        if response is None:
+            abort(404)
+        return response
+
+    @game_bp.route('/events')
+    def get_events(instance):
+        """Server-Sent Events: meldet Beitritte, Abgänge und Änderungen, sobald der Parser sie schreibt."""
+        return events_response(lookup(instance).player_cache)
+
+    @game_bp.route('/stats')
+    def get_stats(instance):
+        """Spielzeit pro Spieler, Session-Anzahl und Spitzenwert gleichzeitiger Spieler (?days=30)."""
+        history_reader = lookup(instance).history_reader
+        if history_reader is None:
+            abort(404)
+        return stats_response(history_reader)
+
+    @game_bp.route('/history')
+    def get_history(instance):
+        """Stündlicher Verlauf (?hours=168) oder die Sessions eines Spielers (?player=<Name>)."""
+        history_reader = lookup(instance).history_reader
+        if history_reader is None:
+            abort(404)
+        return history_response(history_reader)
+
+    return game_bp
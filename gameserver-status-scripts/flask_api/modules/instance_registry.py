@@ -0,0 +1,256 @@
+import configparser
+import importlib
+import os
+import signal
+import sys
+import threading
+import time
+
+from modules.aggregate_api import AggregateCache
+from modules.player_cache import PlayerCache
+from modules.session_history import HistoryReader
+
+
+class Instance:
+    """Eine aktivierte Instanz aus der config.ini.
+
+    PlayerCache und HistoryReader entstehen erst beim ersten Zugriff, und zwar in jedem
+    Prozess neu: Mit `gunicorn --preload` liest der Master nur die Konfiguration, die Worker
+    erben sie per fork und legen Caches, Locks und den ChangeNotifier erst danach an (unter
+    gevent also nach dem Monkey-Patching).
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, section, module_key, api_endpoint, json_path, revalidate_interval=1.0, max_age=0,
+                 shm_path=None, history_path=None, custom_module=None):
+        self.section = section
+        self.module_key = module_key
+        self.api_endpoint = api_endpoint
+        self.json_path = json_path
+        self.revalidate_interval = revalidate_interval
+        self.max_age = max_age
+        self.shm_path = shm_path
+        self.history_path = history_path
+        # Optionales Modul 'modules/<module>_api.py' mit zusätzlichen Endpunkten
+        self.custom_module = custom_module
+        # Label für /metrics, wie früher der Name des Blueprints pro Instanz
+        self.blueprint_name = f'{module_key}_api_{api_endpoint}'
+        self.settings = (section, module_key, json_path, revalidate_interval, max_age, shm_path, history_path)
+        self._pid = None
+        self._player_cache = None
+        self._history_reader = None
+
+    def _own(self):
+        """Verwirft Objekte, die vor einem fork in einem anderen Prozess angelegt wurden."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._player_cache = self._history_reader = None
+
+    @property
+    def player_cache(self):
+        self._own()
+        if self._player_cache is None:
+            with self._lock:
+                if self._player_cache is None:
+                    self._player_cache = PlayerCache(self.json_path, self.revalidate_interval, shm_path=self.shm_path)
+        return self._player_cache
+
+    @property
+    def history_reader(self):
+        """HistoryReader für /stats und /history oder None ohne `history_db_path`."""
+        if not self.history_path:
+            return None
+        self._own()
+        if self._history_reader is None:
+            self._history_reader = HistoryReader(self.history_path)
+        return self._history_reader
+
+    def close(self):
+        """Meldet den Cache beim ChangeNotifier ab, nachdem die Instanz entfernt oder geändert wurde."""
+        if self._pid == os.getpid() and self._player_cache is not None:
+            self._player_cache.notifier.unregister(self._player_cache)
+
+
+class RegistryState:
+    """Ein vollständiger Stand der Konfiguration; wird bei einer Änderung als Ganzes ersetzt."""
+
+    def __init__(self, instances, mtime=None):
+        """:param instances: {api_endpoint: Instance} in der Reihenfolge von `enabled_instances`."""
+        self.instances = instances
+        self.mtime = mtime
+        self._pid = None
+        self._aggregate = None
+
+    def aggregate(self):
+        """AggregateCache für /api/all (pro Prozess); None ohne Instanzen oder bei einer Instanz 'all'."""
+        if not self.instances or 'all' in self.instances:
+            return None
+        if self._pid != os.getpid():
+            self._aggregate = AggregateCache([(instance.api_endpoint, instance.module_key, instance.player_cache)
+                                              for instance in self.instances.values()])
+            self._pid = os.getpid()
+        return self._aggregate
+
+
+class InstanceRegistry:
+    """Die aktivierten Instanzen der config.ini für die gemeinsame Route /api/<instanz>/...
+
+    `current()` prüft höchstens alle `config_check_seconds` Sekunden ([main], Standard 2)
+    die Änderungszeit der config.ini. Hat sie sich geändert oder hat der Prozess SIGHUP
+    erhalten, wird die Datei neu gelesen und der neue Stand mit einer einzigen Zuweisung
+    übernommen; laufende Anfragen arbeiten mit dem alten Stand zu Ende. Unveränderte
+    Instanzen behalten ihren Cache samt Versionsnummer, wartende Clients bleiben verbunden.
+    Ist die neue Konfiguration fehlerhaft, bleibt der bisherige Stand aktiv.
+    """
+
+    def __init__(self, config_path, check_interval=2.0, clock=time.monotonic):
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.state = RegistryState({})
+        self.mtime = None  # zuletzt gelesene Änderungszeit, auch wenn das Laden fehlschlug
+        self.next_check = float("-inf")
+        self.reload_requested = False
+        self.modules = {}  # 'module'-Schlüssel -> eigenes Modul oder None
+        self.lock = threading.Lock()
+
+    def current(self):
+        """Gibt den aktuellen RegistryState zurück und lädt die config.ini bei Bedarf neu."""
+        if self.reload_requested or self.clock() >= self.next_check:
+            self.check()
+        return self.state
+
+    def get(self, api_endpoint):
+        """Die Instanz zum Endpunkt oder None."""
+        return self.current().instances.get(api_endpoint)
+
+    def check(self):
+        """Lädt die config.ini neu, wenn sich ihre Änderungszeit geändert hat oder SIGHUP kam."""
+        self.next_check = self.clock() + self.check_interval
+        requested, self.reload_requested = self.reload_requested, False
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime and not requested:
+            return False
+        # Lädt bereits ein anderer Thread, gilt dessen Ergebnis.
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            return self.load()
+        finally:
+            # Mit dem Intervall aus der neuen Konfiguration
+            self.next_check = self.clock() + self.check_interval
+            self.lock.release()
+
+    def install_sighup(self):
+        """SIGHUP lädt die config.ini neu (nur im Haupt-Thread und wenn SIGHUP noch nicht belegt ist)."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        if signal.getsignal(signal.SIGHUP) != signal.SIG_DFL:
+            return False
+        signal.signal(signal.SIGHUP, self._request_reload)
+        return True
+
+    def _request_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def load(self):
+        """Liest die config.ini und ersetzt den Stand; gibt False zurück, wenn sie nicht verwendbar ist."""
+        first_load = self.mtime is None and not self.state.instances
+        try:
+            self.mtime = os.stat(self.config_path).st_mtime_ns
+        except FileNotFoundError:
+            self.mtime = None
+            print(f"FEHLER: Konfigurationsdatei '{self.config_path}' nicht gefunden.", file=sys.stderr)
+            return False
+
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config_path)
+            # Lese die Liste der zu aktivierenden Sektionen (z.B. 'enshrouded-public', 'valheim-community')
+            enabled_instances_str = config.get('main', 'enabled_instances')
+        except (configparser.NoSectionError, configparser.NoOptionError):
+            print("FEHLER: 'enabled_instances' in Sektion [main] der config.ini nicht gefunden.", file=sys.stderr)
+            return False
+        except configparser.Error as e:
+            print(f"FEHLER: config.ini kann nicht gelesen werden ({e}). Bisherige Instanzen bleiben aktiv.",
+                  file=sys.stderr)
+            return False
+        enabled_instances = [name.strip() for name in enabled_instances_str.split(',') if name.strip()]
+        self.check_interval = config.getfloat('main', 'config_check_seconds', fallback=self.check_interval)
+        if first_load:
+            print(f"Zu aktivierende Instanzen: {', '.join(enabled_instances)}")
+
+        previous = self.state.instances
+        instances = {}
+        for instance_name in enabled_instances:
+            instance = self._build_instance(config, instance_name)
+            if instance is None:
+                continue
+            if instance.api_endpoint in instances:
+                print(f"WARNUNG: Endpunkt '{instance.api_endpoint}' von Instanz '{instance_name}' ist bereits vergeben. "
+                      f"Überspringe.")
+                continue
+            old = previous.get(instance.api_endpoint)
+            if old is not None and old.settings == instance.settings:
+                instance = old
+            elif instance.custom_module is not None and not first_load:
+                print(f"WARNUNG: Die zusätzlichen Endpunkte von '{instance.custom_module.__name__}' für Instanz "
+                      f"'{instance_name}' werden erst nach einem Neustart registriert.")
+            if instance.api_endpoint == 'all':
+                print(f"WARNUNG: Instanz '{instance_name}' verwendet den Endpunkt 'all'; /api/all ist nicht verfügbar.")
+            instances[instance.api_endpoint] = instance
+            if first_load:
+                print(f"-> Instanz '{instance_name}' ({instance.module_key}) erfolgreich geladen. "
+                      f"Endpunkt: /api/{instance.api_endpoint}/players")
+
+        # Atomarer Wechsel: Anfragen sehen entweder den alten oder den neuen Stand.
+        self.state = RegistryState(instances, self.mtime)
+        for api_endpoint, old in previous.items():
+            if instances.get(api_endpoint) is not old:
+                old.close()
+        if not first_load:
+            added = [name for name in instances if name not in previous]
+            removed = [name for name in previous if name not in instances]
+            changed = [name for name in instances if name in previous and instances[name] is not previous[name]]
+            print(f"Konfiguration neu geladen: {len(instances)} Instanz(en); neu: {', '.join(added) or '-'}, "
+                  f"entfernt: {', '.join(removed) or '-'}, geändert: {', '.join(changed) or '-'}")
+        return True
+
+    def _build_instance(self, config, instance_name):
+        """Instance aus einer Sektion der config.ini oder None (mit Warnung)."""
+        module_name = None
+        try:
+            # Hole die Konfiguration für diese spezifische Instanz
+            instance_config = config[instance_name]
+            # Der 'module'-Schlüssel nennt das Spiel (z.B. 'enshrouded'); er bestimmt das Metrik-Label
+            # und optional ein eigenes Modul 'modules/<module>_api.py' für zusätzliche Endpunkte.
+            module_key = instance_config['module']
+            module_name = f"modules.{module_key}_api"
+            return Instance(instance_name, module_key, instance_config['api_endpoint'], instance_config['json_path'],
+                            float(instance_config.get('cache_revalidate_seconds', 1.0)),
+                            int(instance_config.get('cache_max_age', 0)),
+                            instance_config.get('shm_path') or None,
+                            instance_config.get('history_db_path') or None,
+                            self._custom_module(module_key, module_name))
+        except ImportError as e:
+            print(f"WARNUNG: Modul '{module_name}' für Instanz '{instance_name}' konnte nicht geladen werden ({e}). Überspringe.")
+        except KeyError as e:
+            print(f"WARNUNG: Fehlender Schlüssel '{e}' in der Konfigurations-Sektion '[{instance_name}]'. Überspringe.")
+        except ValueError as e:
+            print(f"WARNUNG: Ungültiger Wert in der Konfigurations-Sektion '[{instance_name}]' ({e}). Überspringe.")
+        return None
+
+    def _custom_module(self, module_key, module_name):
+        """Importiert 'modules/<module>_api.py' einmal pro Spiel; None, wenn es kein eigenes Modul gibt."""
+        if module_key not in self.modules:
+            try:
+                self.modules[module_key] = importlib.import_module(module_name)
+            except ModuleNotFoundError as e:
+                if e.name != module_name:
+                    raise
+                self.modules[module_key] = None
+        return self.modules[module_key]
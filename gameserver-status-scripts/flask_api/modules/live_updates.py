@@ -0,0 +1,79 @@
+from flask import Response, request, stream_with_context
+
+from modules.player_cache import snapshot_response
+
+# Kommentarzeile alle n Sekunden, damit Proxys untätige SSE-Verbindungen nicht schließen.
+SSE_HEARTBEAT_SECONDS = 15.0
+LONG_POLL_DEFAULT_SECONDS = 25.0
+LONG_POLL_MAX_SECONDS = 60.0
+
+
+def _query_number(name, default, convert=float):
+    try:
+        return convert(request.args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def players_response(player_cache, max_age=0):
+    """Antwort für /players; mit `?wait=<version>` als Long-Poll.
+
+    Stimmt `wait` mit der aktuellen Version überein, wird bis zu `timeout` Sekunden
+    (Standard 25, höchstens 60) auf eine Änderung gewartet. Läuft die Zeit ab, kommt
+    ein leeres 304 zurück und der Client fragt mit derselben Version erneut an.
+    """
+    snapshot = player_cache.get()
+    if 'wait' not in request.args:
+        return snapshot_response(snapshot, max_age)
+
+    version = _query_number('wait', None, int)
+    if version == snapshot.version:
+        timeout = min(max(_query_number('timeout', LONG_POLL_DEFAULT_SECONDS), 0.0), LONG_POLL_MAX_SECONDS)
+        changed = player_cache.wait_for_change(version, timeout)
+        if changed is None:
+            return Response(status=304, headers={'X-Players-Version': str(version),
+                                                 'Cache-Control': 'no-cache'})
+        snapshot = changed
+    return snapshot_response(snapshot, 0)
+
+
+def change_event(snapshot, version):
+    """SSE-Event für den Wechsel von `version` zu `snapshot`; None, wenn sich die Liste nicht geändert hat."""
+    if snapshot.previous_version != version:
+        # Zwischenstände verpasst: vollständige Liste statt Delta senden.
+        return snapshot.snapshot_event
+    return snapshot.delta_event
+
+
+def _event_stream(player_cache, last_version):
+    yield b"retry: 3000\n\n"
+    snapshot = player_cache.get()
+    if snapshot.version != last_version:
+        yield snapshot.snapshot_event
+    version = snapshot.version
+    while True:
+        snapshot = player_cache.wait_for_change(version, SSE_HEARTBEAT_SECONDS)
+        if snapshot is None:
+            yield b": keepalive\n\n"
+            continue
+        event = change_event(snapshot, version)
+        if event is not None:
+            yield event
+        version = snapshot.version
+
+
+def events_response(player_cache):
+    """SSE-Stream für /events: zuerst ein 'snapshot'-Event, danach 'delta'-Events bei jeder Änderung.
+
+    Ein Client, der sich mit `Last-Event-ID` neu verbindet, bekommt die vollständige Liste
+    nur, wenn sich seitdem etwas geändert hat.
+    """
+    last_version = _query_number('since', None, int)
+    if 'Last-Event-ID' in request.headers:
+        try:
+            last_version = int(request.headers['Last-Event-ID'])
+        except ValueError:
+            pass
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(_event_stream(player_cache, last_version)),
+                    headers=headers, mimetype='text/event-stream')
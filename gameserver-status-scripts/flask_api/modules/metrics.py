@@ -0,0 +1,128 @@
+import bisect
+import glob
+import json
+import os
+import time
+
+from flask import Response, g, request
+
+# Obergrenzen (Sekunden) der Latenz-Buckets; Long-Polls warten bis zu 60 Sekunden.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class ApiMetrics:
+    """Anfragezähler und Latenz-Histogramme pro Blueprint und Endpunkt für /metrics.
+
+    Jeder Gunicorn-Worker zählt im eigenen Speicher. Mit `metrics_dir` schreibt jeder Worker
+    seinen Stand höchstens einmal pro `write_interval` Sekunden (und bei jedem Abruf von
+    /metrics) als Datei `<pid>.json` in dieses Verzeichnis; /metrics summiert alle Dateien,
+    sodass jeder Worker die Zahlen des ganzen Dienstes liefert. Ohne `metrics_dir` gelten
+    die Zahlen nur für den antwortenden Worker.
+    """
+
+    def __init__(self, metrics_dir=None, write_interval=1.0, clock=time.monotonic):
+        self.metrics_dir = metrics_dir
+        self.write_interval = write_interval
+        self.clock = clock
+        self.last_write = float("-inf")
+        self.requests = {}   # (Blueprint, Endpunkt, Status) -> Anzahl
+        self.latency = {}    # (Blueprint, Endpunkt) -> [Bucket-Zähler..., Summe, Anzahl]
+
+    def install(self, app):
+        """Registriert die Messung für alle Anfragen und den Endpunkt /metrics."""
+        app.before_request(self._start_timer)
+        app.after_request(self._record)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_response)
+
+    def _start_timer(self):
+        g.metrics_started = time.perf_counter()
+
+    def _record(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+        # Bei /events und Long-Polls ist das die Zeit bis zum Beginn der Antwort. Die gemeinsame
+        # Route aller Instanzen (modules/game_api.py) setzt den Namen der Instanz in g.metrics_blueprint.
+        self.observe(g.pop('metrics_blueprint', None) or request.blueprint or '', (request.endpoint or 'unbekannt').rsplit('.', 1)[-1],
+                     response.status_code, time.perf_counter() - started)
+        if self.metrics_dir and self.clock() - self.last_write >= self.write_interval:
+            self.write_worker_file()
+        return response
+
+    def observe(self, blueprint, endpoint, status, seconds):
+        key = (blueprint, endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((blueprint, endpoint))
+        if histogram is None:
+            histogram = self.latency[(blueprint, endpoint)] = [0] * (len(LATENCY_BUCKETS) + 3)
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+    def _state(self):
+        return {
+            "requests": [[*key, count] for key, count in self.requests.items()],
+            "latency": [[*key, values] for key, values in self.latency.items()],
+        }
+
+    def write_worker_file(self):
+        self.last_write = self.clock()
+        path = os.path.join(self.metrics_dir, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._state(), f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _merged_state(self):
+        """Summe über alle Worker-Dateien (bzw. nur dieser Worker ohne `metrics_dir`)."""
+        if not self.metrics_dir:
+            return self.requests, self.latency
+        self.write_worker_file()
+        requests = {}
+        latency = {}
+        for path in glob.glob(os.path.join(self.metrics_dir, "*.json")):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for blueprint, endpoint, status, count in state.get("requests", []):
+                key = (blueprint, endpoint, status)
+                requests[key] = requests.get(key, 0) + count
+            for blueprint, endpoint, values in state.get("latency", []):
+                merged = latency.get((blueprint, endpoint))
+                if merged is None:
+                    latency[(blueprint, endpoint)] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        merged[index] += value
+        return requests, latency
+
+    def render(self):
+        requests, latency = self._merged_state()
+        lines = ["# HELP gameserver_api_requests_total Beantwortete Anfragen.",
+                 "# TYPE gameserver_api_requests_total counter"]
+        for (blueprint, endpoint, status), count in sorted(requests.items()):
+            lines.append(f'gameserver_api_requests_total{{blueprint="{_escape(blueprint)}",endpoint="{_escape(endpoint)}",'
+                         f'status="{status}"}} {count}')
+        lines.append("# HELP gameserver_api_request_duration_seconds Zeit bis zur Antwort.")
+        lines.append("# TYPE gameserver_api_request_duration_seconds histogram")
+        for (blueprint, endpoint), values in sorted(latency.items()):
+            labels = f'blueprint="{_escape(blueprint)}",endpoint="{_escape(endpoint)}"'
+            total = 0
+            for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], values):
+                total += count
+                lines.append(f'gameserver_api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"gameserver_api_request_duration_seconds_sum{{{labels}}} {values[-2]}")
+            lines.append(f"gameserver_api_request_duration_seconds_count{{{labels}}} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def metrics_response(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,268 @@
+from email.utils import formatdate, parsedate_to_datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import Response, request
+
+from modules.change_notifier import NOTIFIER
+from modules.shm_snapshot import ShmSnapshotReader
+
+
+class CachedSnapshot:
+    """Eine bereits serialisierte /players-Antwort samt Validatoren, gzip-Variante und SSE-Events.
+
+    `version` steigt mit jedem neuen Snapshot streng monoton. Basis ist `source_version` (mtime
+    der Datei bzw. Version des Shared-Memory-Snapshots, jeweils in Mikrosekunden), damit alle
+    gunicorn-Worker dieselbe Nummer vergeben und sie in JavaScript exakt darstellbar bleibt.
+    `delta_event` enthält die Änderungen gegenüber dem Snapshot `previous_version` und ist
+    None, wenn sich die Spielerliste nicht verändert hat.
+    """
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag", "mtime", "last_modified", "stat_key",
+                 "players", "version", "previous_version", "snapshot_event", "delta_event")
+
+    def __init__(self, body, stat_key, mtime=None, players=(), previous=None, source_version=0):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        # Starke ETags; die komprimierte Darstellung braucht einen eigenen Wert.
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.mtime = None if mtime is None else int(mtime)
+        self.last_modified = None if mtime is None else formatdate(mtime, usegmt=True)
+        self.stat_key = stat_key
+        self.players = players
+
+        previous_version = 0 if previous is None else previous.version
+        self.version = max(previous_version + 1, source_version)
+        self.previous_version = previous_version
+        self.snapshot_event = _sse_event('snapshot', self.version, {"version": self.version, "players": players})
+        delta = _delta(() if previous is None else previous.players, players)
+        self.delta_event = None if delta is None else _sse_event(
+            'delta', self.version, dict(delta, version=self.version, previous_version=previous_version))
+
+
+def render_players(player_data):
+    """Serialisiert Spielerdaten (oder eine Zusammenfassung) als JSON-Antwortkörper."""
+    return json.dumps(player_data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _sse_event(event, version, data):
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return f"event: {event}\nid: {version}\ndata: {payload}\n\n".encode('utf-8')
+
+
+def _delta(old_players, new_players):
+    """Vergleicht zwei Spielerlisten anhand des Namens; None, wenn nichts geändert wurde."""
+    old_by_name = {p.get('name'): p for p in old_players if isinstance(p, dict)}
+    new_by_name = {p.get('name'): p for p in new_players if isinstance(p, dict)}
+    joined = [p for name, p in new_by_name.items() if name not in old_by_name]
+    left = [name for name in old_by_name if name not in new_by_name]
+    updated = [p for name, p in new_by_name.items() if name in old_by_name and old_by_name[name] != p]
+    if not (joined or left or updated):
+        return None
+    return {"joined": joined, "left": left, "updated": updated}
+
+
+EMPTY_SNAPSHOT = CachedSnapshot(render_players([]), None)
+
+
+class PlayerCache:
+    """Cache für die Spielerdaten einer Instanz.
+
+    Die Antwort wird nur neu erzeugt, wenn sich (mtime_ns, Größe, Inode) der Datei geändert
+    haben. Geprüft wird höchstens alle `revalidate_interval` Sekunden; dazwischen liefert
+    der Cache die fertigen Bytes ohne Systemaufruf aus.
+
+    Mit `shm_path` liest der Cache stattdessen den vom Parser per mmap veröffentlichten
+    Snapshot: Jede Anfrage vergleicht nur die Versionsnummer im Header, die Daten werden
+    erst bei einer neuen Version kopiert und geparst. Fehlt die Datei, dient die JSON-Datei
+    als Fallback.
+
+    Zusätzlich meldet der ChangeNotifier jede Änderung der Datei sofort über `refresh()`;
+    Long-Poll- und SSE-Clients warten in `wait_for_change()` auf der Condition des Caches.
+
+    Im ASGI-Modus (modules/async_api.py) ist `background` gesetzt: `get()` prüft dann nichts
+    mehr selbst, sondern ein Hintergrund-Task ruft regelmäßig `refresh()` auf und wird
+    über `listeners` benachrichtigt.
+    """
+
+    def __init__(self, json_path, revalidate_interval=1.0, clock=time.monotonic, notifier=NOTIFIER, shm_path=None):
+        self.json_path = json_path
+        self.revalidate_interval = revalidate_interval
+        self.clock = clock
+        self.snapshot = EMPTY_SNAPSHOT
+        self.next_check = float("-inf")
+        self.shm_path = shm_path
+        self.shm_reader = None
+        self.shm_inode = None
+        self.shm_version = None
+        self.condition = threading.Condition()
+        # Im ASGI-Modus prüft ein Hintergrund-Task; Anfragen lesen dann nur noch `snapshot`.
+        self.background = False
+        self.listeners = []
+        self.notifier = notifier
+        notifier.register(self)
+
+    def get(self):
+        """Gibt den aktuellen CachedSnapshot zurück."""
+        if self.background:
+            return self.snapshot
+        return self._check()
+
+    def _check(self):
+        """Prüft Datei bzw. Shared-Memory-Version (höchstens alle `revalidate_interval` Sekunden)."""
+        now = self.clock()
+        if now >= self.next_check:
+            with self.condition:
+                self.next_check = now + self.revalidate_interval
+                if self.shm_path:
+                    self._open_shm()
+                if self.shm_reader is None:
+                    self._revalidate_file()
+        shm_reader = self.shm_reader
+        if shm_reader is not None and shm_reader.version() != self.shm_version:
+            self._load_shm(shm_reader)
+        return self.snapshot
+
+    def refresh(self):
+        """Prüft die Datei sofort und weckt wartende Clients, falls ein neuer Snapshot entstand.
+
+        `listeners` werden danach mit dem Cache aufgerufen (aus dem Thread des Aufrufers).
+        """
+        with self.condition:
+            previous = self.snapshot
+            self.next_check = float("-inf")
+            changed = self._check() is not previous
+            if changed:
+                self.condition.notify_all()
+        if changed:
+            for listener in self.listeners:
+                listener(self)
+
+    def wait_for_change(self, version, timeout):
+        """Wartet höchstens `timeout` Sekunden auf einen Snapshot mit anderer Version.
+
+        Gibt den neuen Snapshot zurück oder None, wenn sich bis dahin nichts geändert hat.
+        """
+        self.notifier.ensure_started()
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                snapshot = self.get()
+                if snapshot.version != version:
+                    return snapshot
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def _open_shm(self):
+        """Öffnet die Snapshot-Datei (erneut), wenn sie neu angelegt wurde; ohne Datei gilt der JSON-Fallback."""
+        try:
+            inode = os.stat(self.shm_path).st_ino
+        except FileNotFoundError:
+            self.shm_reader = None
+            return
+        if self.shm_reader is not None and inode == self.shm_inode:
+            return
+        try:
+            self.shm_reader = ShmSnapshotReader(self.shm_path)
+        except (OSError, ValueError):
+            self.shm_reader = None
+            return
+        self.shm_inode = inode
+        self.shm_version = None
+
+    def _load_shm(self, shm_reader):
+        with self.condition:
+            result = shm_reader.read()
+            if result is None or result[0] == self.shm_version:
+                return
+            version, content = result
+            self.shm_version = version
+            self.snapshot = self._build(content, ('shm', version), version / 1_000_000, version)
+
+    def _revalidate_file(self):
+        try:
+            st = os.stat(self.json_path)
+        except FileNotFoundError:
+            if self.snapshot.stat_key is not None:
+                self.snapshot = CachedSnapshot(EMPTY_SNAPSHOT.body, None, previous=self.snapshot)
+            return
+        stat_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stat_key != self.snapshot.stat_key:
+            self.snapshot = self._load(stat_key, st.st_mtime, st.st_mtime_ns // 1000)
+
+    def _load(self, stat_key, mtime, source_version):
+        """Liest und serialisiert die JSON-Datei neu."""
+        try:
+            with open(self.json_path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = b''
+        return self._build(content, stat_key, mtime, source_version)
+
+    def _build(self, content, stat_key, mtime, source_version):
+        """Parst die JSON-Daten und erzeugt den Snapshot. Bei Fehlern wird eine leere Liste ausgeliefert."""
+        try:
+            player_data = [] if not content.strip() else json.loads(content)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            player_data = None
+        if player_data is None:
+            # Kennung nicht übernehmen, damit beim nächsten Prüfen erneut gelesen wird.
+            if self.snapshot.stat_key is None and not self.snapshot.players:
+                return self.snapshot
+            return CachedSnapshot(EMPTY_SNAPSHOT.body, None, previous=self.snapshot)
+        return CachedSnapshot(render_players(player_data), stat_key, mtime, player_data, self.snapshot, source_version)
+
+
+def accepts_gzip(accept_encoding):
+    """True, wenn der Accept-Encoding-Header gzip (oder *) nicht mit q=0 ausschließt."""
+    for token in accept_encoding.split(','):
+        coding, _, params = token.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def not_modified(snapshot, if_none_match, if_modified_since):
+    """Prüft If-None-Match (Vorrang) bzw. If-Modified-Since gegen den Snapshot."""
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or snapshot.etag in tags or snapshot.gzip_etag in tags
+    if if_modified_since and snapshot.mtime is not None:
+        try:
+            return snapshot.mtime <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def snapshot_headers(snapshot, use_gzip, max_age=0):
+    """Antwort-Header für einen Snapshot (ohne Content-Encoding und Content-Type)."""
+    headers = {
+        'ETag': snapshot.gzip_etag if use_gzip else snapshot.etag,
+        'Cache-Control': f'public, max-age={max_age}' if max_age > 0 else 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'X-Players-Version': str(snapshot.version),
+    }
+    if snapshot.last_modified:
+        headers['Last-Modified'] = snapshot.last_modified
+    return headers
+
+
+def snapshot_response(snapshot, max_age=0):
+    """Baut die HTTP-Antwort für einen Snapshot inkl. 304-Behandlung und gzip-Variante."""
+    use_gzip = accepts_gzip(request.headers.get('Accept-Encoding', ''))
+    headers = snapshot_headers(snapshot, use_gzip, max_age)
+    if not_modified(snapshot, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+        return Response(status=304, headers=headers)
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        return Response(snapshot.gzip_body, headers=headers, mimetype='application/json; charset=utf-8')
+    return Response(snapshot.body, headers=headers, mimetype='application/json; charset=utf-8')
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+
+from flask import jsonify, request
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+MAX_STATS_DAYS = 366
+MAX_HISTORY_HOURS = 24 * 92
+MAX_PLAYER_SESSIONS = 500
+
+# Spielzeit pro Spieler aus dem Tages-Rollup (abgeschlossene Sessions, Tag des Logins) plus
+# die noch offenen Sessions über den partiellen Index `sessions_open`.
+PLAYER_STATS_QUERY = """
+SELECT player, sum(sessions), sum(playtime), max(last_logout)
+FROM (
+    SELECT player, sessions, playtime, last_logout FROM player_daily WHERE day >= :since_day
+    UNION ALL
+    SELECT player, 1, :now - max(login, :since_day), :now FROM sessions WHERE logout IS NULL
+)
+GROUP BY player
+"""
+
+
+class HistoryReader:
+    """Liest die Session-Historie des Parsers (parser_core/history.py) nur lesend aus SQLite.
+
+    Verbindungen werden in einem kleinen Pool wiederverwendet (auch unter gevent, wo
+    threading.local pro Greenlet gälte). Ergebnisse werden `cache_seconds` lang pro
+    Parameterkombination zwischengespeichert, da sich die Rollups ohnehin nur beim Flush
+    des Parsers ändern.
+    """
+
+    def __init__(self, path, cache_seconds=10.0, clock=time.monotonic):
+        self.path = path
+        self.cache_seconds = cache_seconds
+        self.clock = clock
+        self.idle = []
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def _release(self, conn):
+        with self.lock:
+            self.idle.append(conn)
+
+    def _cached(self, key, compute):
+        now = self.clock()
+        entry = self.cache.get(key)
+        if entry is not None and now - entry[0] < self.cache_seconds:
+            return entry[1]
+        conn = self._acquire()
+        try:
+            result = compute(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._release(conn)
+        if len(self.cache) > 256:
+            self.cache.clear()
+        self.cache[key] = (now, result)
+        return result
+
+    def stats(self, days=30, top=50):
+        """Kennzahlen der letzten `days` Tage: Sessions, Spielzeit pro Spieler, Spitzenwert gleichzeitiger Spieler."""
+        return self._cached(("stats", days, top), lambda conn: self._stats(conn, days, top))
+
+    def history(self, hours=168, player=None, limit=100):
+        """Stündliche Verläufe (Spitzenwert, Logins) oder die letzten Sessions eines Spielers."""
+        if player is not None:
+            return self._cached(("player", player, hours, limit), lambda conn: self._player_history(conn, player, hours, limit))
+        return self._cached(("hours", hours), lambda conn: self._hourly_history(conn, hours))
+
+    def _stats(self, conn, days, top):
+        now = time.time()
+        # Ganze (UTC-)Tage: der heutige und die `days - 1` davor.
+        since = (int(now // SECONDS_PER_DAY) - days + 1) * SECONDS_PER_DAY
+        players = []
+        for player, sessions, playtime, last_seen in conn.execute(PLAYER_STATS_QUERY, {"now": now, "since_day": since}):
+            players.append({"name": player, "sessions": sessions, "playtime_seconds": round(playtime),
+                            "last_seen": round(last_seen)})
+        players.sort(key=lambda entry: entry["playtime_seconds"], reverse=True)
+        peak = conn.execute("SELECT hour, peak FROM hourly WHERE hour >= ? ORDER BY peak DESC, hour DESC LIMIT 1",
+                            (since,)).fetchone()
+        online = conn.execute("SELECT count(*) FROM sessions WHERE logout IS NULL").fetchone()[0]
+        return {
+            "days": days,
+            "since": since,
+            "sessions": sum(entry["sessions"] for entry in players),
+            "unique_players": len(players),
+            "playtime_seconds": sum(entry["playtime_seconds"] for entry in players),
+            "peak_concurrent": {"players": peak[1], "hour": peak[0]} if peak else {"players": 0, "hour": None},
+            "online": online,
+            "players": players[:top],
+        }
+
+    def _hourly_history(self, conn, hours):
+        current = int(time.time() // SECONDS_PER_HOUR) * SECONDS_PER_HOUR
+        first = current - (hours - 1) * SECONDS_PER_HOUR
+        rows = {hour: (peak, logins) for hour, peak, logins in
+                conn.execute("SELECT hour, peak, logins FROM hourly WHERE hour >= ? ORDER BY hour", (first,))}
+        series = []
+        for hour in range(first, current + 1, SECONDS_PER_HOUR):
+            peak, logins = rows.get(hour, (0, 0))
+            series.append({"hour": hour, "peak": peak, "logins": logins})
+        return {"hours": series}
+
+    def _player_history(self, conn, player, hours, limit):
+        since = time.time() - hours * SECONDS_PER_HOUR
+        sessions = [{"login": round(login), "logout": None if logout is None else round(logout)} for login, logout in
+                    conn.execute("SELECT login, logout FROM sessions WHERE player = ? AND login >= ? ORDER BY login DESC LIMIT ?",
+                                 (player, since, limit))]
+        totals = conn.execute("SELECT sessions, playtime, first_login, last_logout FROM player_totals WHERE player = ?",
+                              (player,)).fetchone()
+        return {
+            "player": player,
+            "sessions": sessions,
+            "totals": None if totals is None else {"sessions": totals[0], "playtime_seconds": round(totals[1]),
+                                                   "first_login": round(totals[2]), "last_logout": round(totals[3])},
+        }
+
+
+def _query_int(name, default, maximum):
+    try:
+        value = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return min(max(value, 1), maximum)
+
+
+def _unavailable(error):
+    response = jsonify({"error": f"Historie nicht verfügbar: {error}"})
+    response.status_code = 503
+    return response
+
+
+def stats_response(reader):
+    """Antwort für /stats (`?days=30&top=50`, ganze Kalendertage in UTC)."""
+    try:
+        result = reader.stats(_query_int('days', 30, MAX_STATS_DAYS), _query_int('top', 50, 1000))
+    except sqlite3.Error as e:
+        return _unavailable(e)
+    return jsonify(result)
+
+
+def history_response(reader):
+    """Antwort für /history (`?hours=168`, mit `&player=<Name>` die Sessions eines Spielers)."""
+    try:
+        result = reader.history(_query_int('hours', 168, MAX_HISTORY_HOURS), request.args.get('player'),
+                                _query_int('limit', 100, MAX_PLAYER_SESSIONS))
+    except sqlite3.Error as e:
+        return _unavailable(e)
+    return jsonify(result)
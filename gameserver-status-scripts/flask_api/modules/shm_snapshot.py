@@ -0,0 +1,64 @@
+import mmap
+import os
+import struct
+
+# Layout wie in parser_core/shm_snapshot.py (der Parser ist der einzige Schreiber):
+#   0 magic (8 Bytes) | 8 seq (u64) | 16 version (u64) | 24 length (u64) | 32 capacity (u64) | 64 Daten
+MAGIC = b"GSSNAP01"
+HEADER_SIZE = 64
+_SEQ = struct.Struct("<Q")
+_FIELDS = struct.Struct("<QQ")
+_SEQ_OFFSET = 8
+_FIELDS_OFFSET = 16
+MAX_RETRIES = 100
+
+
+class ShmSnapshotReader:
+    """Liest den vom Parser veröffentlichten Snapshot direkt aus dem gemeinsamen Speicher.
+
+    `version()` liest nur acht Bytes aus dem Mapping und kommt ohne Systemaufruf aus; kopiert
+    werden die JSON-Daten erst, wenn sich die Version geändert hat (`read()`).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self.map = mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        if len(self.map) < HEADER_SIZE or self.map[:8] != MAGIC:
+            self.map.close()
+            raise ValueError(f"'{path}' ist keine Snapshot-Datei")
+
+    def version(self):
+        """Aktuelle Version laut Header (kann während eines Schreibvorgangs schon die neue sein)."""
+        return _FIELDS.unpack_from(self.map, _FIELDS_OFFSET)[0]
+
+    def read(self):
+        """Gibt (version, bytes) eines konsistenten Stands zurück oder None, wenn der Schreiber zu oft dazwischenkam."""
+        for _ in range(MAX_RETRIES):
+            seq = _SEQ.unpack_from(self.map, _SEQ_OFFSET)[0]
+            if seq & 1:
+                continue
+            version, length = _FIELDS.unpack_from(self.map, _FIELDS_OFFSET)
+            if HEADER_SIZE + length > len(self.map):
+                self._remap()
+                continue
+            data = self.map[HEADER_SIZE:HEADER_SIZE + length]
+            if _SEQ.unpack_from(self.map, _SEQ_OFFSET)[0] == seq:
+                return version, data
+        return None
+
+    def _remap(self):
+        """Der Parser hat die Datei vergrößert: neu mappen.
+
+        Das alte Mapping wird nicht explizit geschlossen, damit parallele `version()`-Aufrufe
+        anderer Threads nicht auf ein geschlossenes Mapping treffen.
+        """
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            new_map = mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self.map = new_map
@@ -0,0 +1,182 @@
+import asyncio
+import configparser
+import logging
+import os
+import signal
+import sys
+
+# Gemeinsame Parser-Bausteine liegen in 'parser_core' (im Repository eine Ebene höher,
+# im Deployment alternativ direkt neben diesem Skript).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parser_core.aio import follow_docker_async, follow_file_async
+from parser_core.checkpoint import restore_checkpoint
+from parser_core.cli import is_placeholder, setup_logging
+from parser_core.fanout import MatchPool
+from parser_core.games import GAME_PARSERS
+from parser_core.metrics import start_metrics_server
+from parser_core.replay import replay_log
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+# --- Globale Datenstrukturen ---
+CONFIG = {}
+
+
+def load_and_validate_config(config_path='config.ini'):
+    """Lädt die Konfiguration und gibt die gültigen Instanz-Sektionen zurück."""
+    global CONFIG
+    parser = configparser.ConfigParser()
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Konfigurationsdatei '{config_path}' nicht gefunden.")
+
+    parser.read(config_path)
+    CONFIG = {section: dict(parser.items(section)) for section in parser.sections()}
+    logger.info("Konfiguration erfolgreich geladen.")
+
+    enabled_instances_str = CONFIG.get('main', {}).get('enabled_instances', '')
+    enabled_instances = [name.strip() for name in enabled_instances_str.split(',') if name.strip()]
+    if not enabled_instances:
+        raise ValueError("Konfigurationsfehler: 'enabled_instances' in Sektion [main] ist leer oder fehlt.")
+
+    instances = {}
+    for instance_name in enabled_instances:
+        settings = CONFIG.get(instance_name)
+        if settings is None:
+            logger.warning(f"Sektion '[{instance_name}]' nicht gefunden. Überspringe.")
+            continue
+        game = settings.get('game')
+        mode = settings.get('mode')
+        if game not in GAME_PARSERS:
+            logger.warning(f"Unbekanntes Spiel '{game}' in Sektion '[{instance_name}]'. Mögliche Werte: {', '.join(GAME_PARSERS)}. Überspringe.")
+            continue
+        if mode == 'native' and is_placeholder(settings.get('log_path', '')):
+            logger.warning(f"'log_path' in Sektion '[{instance_name}]' ist nicht gesetzt oder ein Platzhalter. Überspringe.")
+            continue
+        if mode == 'docker' and is_placeholder(settings.get('container_name', '')):
+            logger.warning(f"'container_name' in Sektion '[{instance_name}]' ist nicht gesetzt oder ein Platzhalter. Überspringe.")
+            continue
+        if mode not in ('native', 'docker'):
+            logger.warning(f"Unbekannter Modus '{mode}' in Sektion '[{instance_name}]'. Muss 'native' oder 'docker' sein. Überspringe.")
+            continue
+        if is_placeholder(settings.get('output_json_path', '')):
+            logger.warning(f"'output_json_path' in Sektion '[{instance_name}]' ist nicht gesetzt. Überspringe.")
+            continue
+        instances[instance_name] = settings
+
+    if not instances:
+        raise ValueError("Konfigurationsfehler: Keine gültige Instanz in 'enabled_instances'.")
+    logger.info(f"Aktive Instanzen: {', '.join(instances)}")
+    return instances
+
+
+async def run_instance(game_parser, settings, start_position=None, pool=None):
+    """Betreibt eine Instanz; Fehler werden protokolliert und die Instanz neu gestartet."""
+    while True:
+        try:
+            # Die Position aus Checkpoint oder Replay gilt nur für den ersten Start.
+            position, start_position = start_position, None
+            if settings['mode'] == 'native':
+                await follow_file_async(game_parser, settings['log_path'], start_position=position, pool=pool)
+            else:
+                await follow_docker_async(game_parser, settings['container_name'], settings.get('docker_socket'),
+                                          pool=pool, start_position=position)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            game_parser.logger.critical(f"Kritischer Fehler, Neustart in 10s: {e}", exc_info=True)
+            await asyncio.sleep(10)
+
+
+def replay_instance(game_parser, settings):
+    """Liest das vorhandene Log einer nativen Instanz ein; gibt die Startposition fürs Live-Tail zurück."""
+    if settings['mode'] != 'native':
+        game_parser.logger.warning("--replay wird nur im 'native'-Modus unterstützt und ignoriert.")
+        return None
+    try:
+        return replay_log(game_parser, settings['log_path'])
+    except OSError as e:
+        game_parser.logger.error(f"Replay fehlgeschlagen, starte ohne: {e}")
+        return None
+
+
+async def run_daemon(instances, replay=False):
+    """Startet alle Instanzen als Coroutinen in einem Event-Loop und wartet auf SIGTERM/SIGINT.
+
+    Instanzen mit `checkpoint_path` setzen am gesicherten Stand fort; ohne Checkpoint werden
+    mit `replay` die Logs vor dem Start der Coroutinen nacheinander eingelesen. Mit
+    `match_workers` in [main] übernehmen so viele Worker-Prozesse das Matching (siehe MatchPool).
+    """
+    match_workers = int(CONFIG['main'].get('match_workers', 0))
+    pool = None
+    if match_workers > 0:
+        # Vor Signal-Handlern und Threads, da die Worker per fork entstehen.
+        pool = MatchPool(match_workers)
+        await pool.start()
+        logger.info(f"{match_workers} Match-Worker gestartet.")
+
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    parsers = []
+    tasks = []
+    for instance_name, settings in instances.items():
+        try:
+            game_parser = GAME_PARSERS[settings['game']](settings, instance_name)
+            start_position = restore_checkpoint(game_parser, settings.get('log_path') if settings['mode'] == 'native' else None)
+            game_parser.start()
+        except (KeyError, ValueError) as e:
+            logger.error(f"Instanz '{instance_name}' konnte nicht gestartet werden: {e}")
+            continue
+        if replay and start_position is None:
+            start_position = replay_instance(game_parser, settings)
+        if pool is not None:
+            pool.register(game_parser)
+        parsers.append(game_parser)
+        tasks.append(asyncio.create_task(run_instance(game_parser, settings, start_position, pool), name=instance_name))
+        game_parser.logger.info(f"{game_parser.game_name}-Parser gestartet ({settings['mode']}).")
+
+    if CONFIG['main'].get('metrics_listen'):
+        start_metrics_server(CONFIG['main']['metrics_listen'], parsers)
+
+    await stop_event.wait()
+    logger.info("Beende Parser-Daemon...")
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if pool is not None:
+        await pool.close()
+    for game_parser in parsers:
+        game_parser.shutdown()
+
+
+# --- Hauptausführung ---
+if __name__ == "__main__":
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    CONFIG_PATH = arguments[0] if arguments else 'config.ini'
+    REPLAY = '--replay' in sys.argv[1:]
+    EXAMPLE_CONFIG_PATH = 'config.ini.example'
+
+    if not os.path.exists(CONFIG_PATH):
+        print(f"FEHLER: Konfigurationsdatei '{CONFIG_PATH}' nicht gefunden.", file=sys.stderr)
+        if os.path.exists(EXAMPLE_CONFIG_PATH):
+            print(f"-> Bitte kopieren Sie '{EXAMPLE_CONFIG_PATH}' nach '{CONFIG_PATH}' und passen Sie die Werte an.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        instances = load_and_validate_config(CONFIG_PATH)
+
+        setup_logging(CONFIG['main'].get('log_file_path'))
+
+        logger.info(f"Starte Parser-Daemon mit {len(instances)} Instanz(en)...")
+        asyncio.run(run_daemon(instances, REPLAY))
+        logger.info("Parser-Daemon beendet.")
+
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.critical(f"Kritischer Startfehler aufgrund der Konfiguration: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.critical("Ein unerwarteter, kritischer Fehler ist aufgetreten:", exc_info=True)
+        sys.exit(1)
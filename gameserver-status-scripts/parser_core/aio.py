@@ -0,0 +1,177 @@
+import asyncio
+
+from parser_core.docker_source import DockerLogError, DockerLogSource
+from parser_core.runner import engine_socket, log_docker_stderr
+from parser_core.tail import DEFAULT_CHUNK_SIZE, FileFollower, create_watcher
+
+# Obergrenze für ein einzelnes Warten, damit Timer auch ohne Events zuverlässig laufen.
+MAX_WAIT_SECONDS = 10.0
+
+
+def _wait_timeout(parser):
+    timeout = parser.next_timer_timeout()
+    return MAX_WAIT_SECONDS if timeout is None else min(MAX_WAIT_SECONDS, timeout)
+
+
+async def _wait(awaitable, timeout):
+    """Wie asyncio.wait_for, verliert aber kein cancel().
+
+    Unter Python 3.11 verschluckt wait_for die Abbruchanforderung, wenn das Warten in derselben
+    Loop-Runde endet; der Follower liefe dann beim Beenden des Daemons einfach weiter.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait((task,), timeout=timeout)
+    finally:
+        if not task.done():
+            task.cancel()
+    if not done:
+        raise asyncio.TimeoutError
+    return task.result()
+
+
+def _watch_parser_files(loop, parser):
+    """Reagiert im Event-Loop sofort auf Änderungen an Admin-Liste/Rollenregeln (siehe GameParser.watched_fileno).
+
+    `run_timers()` liest die Events und plant das entprellte Neuladen; damit es pünktlich
+    läuft, auch wenn der Follower noch mit einem längeren Timeout wartet, wird `run_timers()`
+    zum nächsten Timer erneut angestoßen. Gibt den FD zurück (oder None).
+    """
+    fd = parser.watched_fileno()
+    if fd is None:
+        return None
+
+    def on_event():
+        parser.run_timers()
+        timeout = parser.next_timer_timeout()
+        if timeout is not None and timeout < MAX_WAIT_SECONDS:
+            loop.call_later(timeout, parser.run_timers)
+    loop.add_reader(fd, on_event)
+    return fd
+
+
+async def follow_file_async(parser, filepath, poll_interval=1.0, start_position=None, pool=None):
+    """Coroutine-Variante von tail_log_file: wartet per inotify-FD im Event-Loop statt blockierend.
+
+    Mit `pool` (MatchPool) gehen die gelesenen Blöcke ungeteilt an den Worker-Prozess der Instanz.
+    """
+    loop = asyncio.get_running_loop()
+    follower = parser.log_follower = FileFollower(filepath, log=parser.logger, start_position=start_position)
+    watcher = create_watcher(filepath, poll_interval)
+    wakeup = asyncio.Event()
+    fd = watcher.fileno()
+    if fd is not None:
+        # Events sofort lesen: bliebe der FD lesbar, während der Follower auf einen
+        # Match-Worker wartet, liefe der Event-Loop im Kreis.
+        loop.add_reader(fd, lambda: watcher.drain() and wakeup.set())
+    watched_fd = _watch_parser_files(loop, parser)
+    try:
+        if not follower.open():
+            parser.logger.error(f"Logdatei nicht gefunden: {filepath}. Warte auf Erstellung...")
+        while True:
+            if pool is None:
+                lines = follower.read_lines()
+                if lines:
+                    parser.process_log_lines(lines)
+            else:
+                block = follower.read_block()
+                if block is not None:
+                    await pool.process(parser, block)
+            if follower.has_pending():
+                # Anderen Instanzen zwischen zwei Batches Rechenzeit geben.
+                await asyncio.sleep(0)
+                continue
+            timeout = _wait_timeout(parser)
+            if fd is None:
+                await asyncio.sleep(min(timeout, poll_interval))
+            else:
+                try:
+                    await _wait(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+            parser.run_timers()
+    finally:
+        if fd is not None:
+            loop.remove_reader(fd)
+        if watched_fd is not None:
+            loop.remove_reader(watched_fd)
+        watcher.close()
+        follower.close()
+
+
+async def _drain_stderr_async(parser, stream):
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            return
+        log_docker_stderr(parser, raw.decode("utf-8", errors="replace"))
+
+
+async def follow_docker_async(parser, container_name, docker_socket=None, chunk_size=DEFAULT_CHUNK_SIZE, pool=None,
+                              start_position=None):
+    """Coroutine-Variante von tail_docker_logs: liest den Log-Stream blockweise im Event-Loop.
+
+    Die Zeitstempel werden im Hauptprozess abgetrennt; mit `pool` übernimmt ein Worker das Matching.
+    """
+    parser.logger.info(f"Überwache Docker-Logs für Container: {container_name}")
+    source = parser.docker_source = DockerLogSource(container_name, engine_socket(parser, docker_socket))
+    if start_position is not None:
+        source.resume(*start_position)
+    loop = asyncio.get_running_loop()
+    watched_fd = _watch_parser_files(loop, parser)
+    try:
+        while True:
+            source.restart()
+            process = writer = stderr_task = None
+            try:
+                if source.socket_path:
+                    reader, writer = await asyncio.open_unix_connection(source.socket_path)
+                    writer.write(source.api_request())
+                    await writer.drain()
+                else:
+                    process = await asyncio.create_subprocess_exec(
+                        *source.cli_command(), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+                    reader = process.stdout
+                    stderr_task = asyncio.create_task(_drain_stderr_async(parser, process.stderr))
+                via = "Engine API" if source.socket_path else "docker logs -f"
+                parser.logger.info(f"{via} für '{container_name}' gestartet (ab {source.last_timestamp or 'jetzt'}).")
+            except Exception as e:
+                parser.logger.error(f"Konnte Docker-Logs nicht starten: {e}", exc_info=True)
+                await asyncio.sleep(10)
+                continue
+
+            try:
+                while True:
+                    try:
+                        data = await _wait(reader.read(chunk_size), _wait_timeout(parser))
+                    except asyncio.TimeoutError:
+                        parser.run_timers()
+                        continue
+                    if not data:
+                        break
+                    lines = source.feed(data)
+                    if lines and pool is not None:
+                        await pool.process(parser, "\n".join(lines), source.line_timestamps)
+                    elif lines:
+                        parser.process_log_lines(lines, source.line_timestamps)
+                    else:
+                        parser.run_timers()
+            except DockerLogError as e:
+                parser.logger.error(f"Docker Engine API: {e}")
+                await asyncio.sleep(9)
+            finally:
+                if writer is not None:
+                    writer.close()
+                if process is not None:
+                    if process.returncode is None:
+                        process.kill()
+                    await process.wait()
+                if stderr_task is not None:
+                    await stderr_task
+            parser.logger.warning(f"Docker-Logstream beendet (bisher {source.lines_skipped} doppelte Zeilen übersprungen). "
+                                  f"Versuche Neustart...")
+            await asyncio.sleep(1)
+    finally:
+        if watched_fd is not None:
+            loop.remove_reader(watched_fd)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from parser_core.replay import find_log_files, iter_text_blocks
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+# Zeilen pro Batch beim Nachlesen rotierter Dateien.
+CATCH_UP_BATCH_LINES = 10000
+
+
+class CheckpointWriter:
+    """Sichert den Zustand eines Parsers periodisch, damit ein Neustart genau dort fortsetzt.
+
+    Ein Checkpoint enthält Sessions, wartende Verbindungen und aktive Spieler sowie die
+    Leseposition hinter der zuletzt verarbeiteten Zeile: Inode und Byte-Offset der Logdatei
+    bzw. Docker-Zeitstempel und Anzahl der Zeilen mit diesem Zeitstempel. Gespeichert wird
+    kompaktes JSON, nur bei geändertem Inhalt, als temporäre Datei mit fsync und `os.replace`;
+    nach einem Absturz oder Stromausfall liegt also immer ein vollständiger Stand vor.
+
+    :param path: Zieldatei.
+    :param source: Funktion, die den Checkpoint als Dict liefert (None: noch keine Position).
+    :param interval: Abstand der periodischen Sicherungen in Sekunden.
+    """
+
+    def __init__(self, path, source, interval=5.0):
+        self.path = path
+        self.source = source
+        self.interval = interval
+        self.last_hash = None
+        self.writes_performed = 0
+
+    def save(self):
+        """Schreibt den aktuellen Stand, falls er sich seit der letzten Sicherung geändert hat."""
+        try:
+            data = self.source()
+            if data is None:
+                return False
+            # Der Zeitpunkt der Sicherung ändert sich immer; verglichen werden nur Position und Zustand.
+            content = {key: value for key, value in data.items() if key != "saved"}
+            digest = hashlib.blake2b(json.dumps(content, separators=(",", ":")).encode("utf-8"), digest_size=16).digest()
+            if digest == self.last_hash:
+                return False
+            payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            _fsync_directory(self.path)
+            self.last_hash = digest
+            self.writes_performed += 1
+            return True
+        except Exception as e:
+            logger.error(f"Checkpoint konnte nicht geschrieben werden: {e}", exc_info=True)
+            return False
+
+    def load(self):
+        """Liest den letzten Checkpoint; None, wenn keiner existiert oder er unlesbar ist."""
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Checkpoint {self.path} ist unlesbar und wird ignoriert: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"Checkpoint {self.path} hat ein unbekanntes Format und wird ignoriert.")
+            return None
+        return data
+
+
+def _fsync_directory(path):
+    """Macht das Umbenennen dauerhaft (ohne fsync des Verzeichnisses kann es nach einem Stromausfall fehlen)."""
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def restore_checkpoint(parser, log_path=None):
+    """Stellt den Zustand aus dem Checkpoint des Parsers wieder her (vor parser.start() aufrufen).
+
+    Gibt die Startposition für das Tail zurück: im 'native' Modus (`log_path` gesetzt)
+    (Inode, Offset) für tail_log_file/follow_file_async, im 'docker' Modus (Zeitstempel,
+    Anzahl) für tail_docker_logs/follow_docker_async. None, wenn kein passender Checkpoint
+    vorliegt; dann startet der Parser wie bisher leer (oder per Replay).
+
+    Wurde die Logdatei seit dem Checkpoint rotiert, werden der Rest der alten Datei und
+    neuere Archive sofort nachgelesen, und das Tail beginnt am Anfang der aktuellen Datei.
+    """
+    if parser.checkpoint is None:
+        return None
+    data = parser.checkpoint.load()
+    if data is None:
+        return None
+    position = data.get("position") or {}
+    if data.get("game") != parser.game_name:
+        parser.logger.warning(f"Checkpoint gehört zu '{data.get('game')}', nicht zu {parser.game_name}; wird ignoriert.")
+        return None
+    if ("inode" in position) != (log_path is not None):
+        parser.logger.warning("Checkpoint stammt aus einem anderen Modus (native/docker) und wird ignoriert.")
+        return None
+
+    started = time.perf_counter()
+    try:
+        if log_path is None:
+            start_position = (position["docker_timestamp"], int(position["docker_count"]))
+        else:
+            inode, offset = int(position["inode"]), int(position["offset"])
+        parser.restore_state(data)
+    except (KeyError, TypeError, ValueError) as e:
+        parser.logger.warning(f"Checkpoint {parser.checkpoint.path} ist unvollständig und wird ignoriert: {e!r}")
+        return None
+    if log_path is None:
+        where = f"Docker-Zeitstempel {start_position[0]}"
+    else:
+        start_position = _file_start_position(parser, log_path, inode, offset)
+        where = f"Inode {start_position[0]}, Offset {start_position[1]}" if start_position[0] else "Anfang der Logdatei"
+    parser.logger.info(f"Checkpoint vom {time.strftime('%d.%m.%Y %H:%M:%S', time.localtime(data['saved']))} "
+                       f"wiederhergestellt: {len(parser.store.active_players)} Spieler online, "
+                       f"fortgesetzt ab {where} ({(time.perf_counter() - started) * 1000:.1f} ms).")
+    return start_position
+
+
+def _file_start_position(parser, log_path, inode, offset):
+    """Startposition im 'native' Modus; liest nach einer Rotation die verpassten Zeilen der Archive nach."""
+    try:
+        current_inode = os.stat(log_path).st_ino
+    except FileNotFoundError:
+        current_inode = None
+    if current_inode == inode:
+        return inode, offset
+
+    files = [path for path in find_log_files(log_path) if path != log_path]
+    for index, path in enumerate(files):
+        if not path.endswith(".gz") and os.stat(path).st_ino == inode:
+            break
+    else:
+        parser.logger.warning("Logdatei des Checkpoints nicht mehr vorhanden (rotiert und komprimiert/gelöscht); "
+                              "Zeilen bis zur Rotation fehlen.")
+        return current_inode, 0
+
+    lines_read = 0
+    for number, path in enumerate(files[index:]):
+        for text, _ in iter_text_blocks(path, start=offset if number == 0 else 0):
+            lines = text.split("\n")
+            for batch_start in range(0, len(lines), CATCH_UP_BATCH_LINES):
+                parser.process_log_lines(lines[batch_start:batch_start + CATCH_UP_BATCH_LINES])
+            lines_read += len(lines)
+    parser.logger.info(f"Logdatei seit dem Checkpoint rotiert: {lines_read} Zeile(n) aus {len(files) - index} "
+                       f"Archiv(en) nachgelesen.")
+    # Ohne aktuelle Datei (None) liest das Tail sie vollständig, sobald sie angelegt wird.
+    return current_inode, 0
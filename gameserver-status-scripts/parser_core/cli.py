@@ -0,0 +1,125 @@
+import configparser
+import logging
+import os
+import sys
+
+from parser_core.checkpoint import restore_checkpoint
+from parser_core.games import GAME_DEFINITIONS
+from parser_core.metrics import start_metrics_server
+from parser_core.replay import replay_log
+from parser_core.runner import tail_docker_logs, tail_log_file
+
+# --- Logger initialisieren ---
+# Die Konfiguration des Loggers erfolgt in main(), nachdem die Konfig geladen wurde.
+logger = logging.getLogger(__name__)
+
+
+def is_placeholder(value):
+    return not value or '<' in value or '>' in value
+
+
+def load_and_validate_config(config_path='config.ini'):
+    """Lädt und validiert die Konfiguration eines Einzel-Parsers; gibt {Sektion: {Schlüssel: Wert}} zurück."""
+    parser = configparser.ConfigParser()
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Konfigurationsdatei '{config_path}' nicht gefunden.")
+
+    parser.read(config_path)
+    config = {section: dict(parser.items(section)) for section in parser.sections()}
+    logger.info("Konfiguration erfolgreich geladen.")
+
+    # Validierung der Konfiguration
+    mode = config.get('main', {}).get('mode')
+    if mode == 'native':
+        if is_placeholder(config.get('native', {}).get('log_path', '')):
+            raise ValueError("Konfigurationsfehler: 'log_path' in Sektion [native] ist nicht gesetzt oder ein Platzhalter.")
+    elif mode == 'docker':
+        if is_placeholder(config.get('docker', {}).get('container_name', '')):
+            raise ValueError("Konfigurationsfehler: 'container_name' in Sektion [docker] ist nicht gesetzt oder ein Platzhalter.")
+    else:
+        raise ValueError(f"Konfigurationsfehler: Unbekannter Modus '{mode}' in Sektion [main]. Muss 'native' oder 'docker' sein.")
+
+    logger.info(f"Skript läuft im '{mode}'-Modus.")
+    return config
+
+
+def setup_logging(log_handler_path):
+    """Handler am Root-Logger, damit auch die Meldungen aus parser_core erscheinen."""
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO) # Für Debugging auf logging.DEBUG umstellen
+    root_logger.addHandler(logging.StreamHandler()) # Immer an die Konsole loggen
+    if not log_handler_path:
+        return
+    try:
+        file_handler = logging.FileHandler(log_handler_path)
+        file_handler.setFormatter(log_formatter)
+        root_logger.addHandler(file_handler)
+    except PermissionError:
+        logger.error(f"Keine Schreibrechte für {log_handler_path}. Bitte Berechtigungen prüfen.")
+
+
+def main(game, config_path='config.ini', example_config_path='config.ini.example', replay=None):
+    """Betreibt einen Einzel-Parser für `game` (Name aus GAME_DEFINITIONS) mit der Konfiguration `config_path`.
+
+    :param replay: Vorhandenes Log vor dem Live-Tail einlesen (Standard: '--replay' in sys.argv).
+    """
+    if replay is None:
+        replay = '--replay' in sys.argv[1:]
+    definition = GAME_DEFINITIONS[game]
+
+    # Prüfen, ob eine Konfigurationsdatei existiert, bevor das Logging eingerichtet wird.
+    if not os.path.exists(config_path):
+        print(f"FEHLER: Konfigurationsdatei '{config_path}' nicht gefunden.", file=sys.stderr)
+        if os.path.exists(example_config_path):
+            print(f"-> Bitte kopieren Sie '{example_config_path}' nach '{config_path}' und passen Sie die Werte an.", file=sys.stderr)
+        sys.exit(1)
+
+    game_parser = None
+    try:
+        config = load_and_validate_config(config_path)
+        setup_logging(config['main']['log_file_path'])
+
+        logger.info(f"Starte {definition.display_name} Log-Parser...")
+        game_parser = definition.parser_class(config['main'])
+        mode = config['main']['mode']
+        # Mit checkpoint_path setzt der Parser mit dem gesicherten Zustand genau hinter der zuletzt
+        # verarbeiteten Zeile fort (vor start(), damit nie eine leere Spielerliste geschrieben wird).
+        start_position = restore_checkpoint(game_parser, config['native']['log_path'] if mode == 'native' else None)
+        game_parser.start()
+        if config['main'].get('metrics_listen'):
+            start_metrics_server(config['main']['metrics_listen'], [game_parser])
+
+        # Je nach Modus die passende Funktion starten
+        if mode == 'native':
+            # Mit --replay wird ohne Checkpoint zuerst das vorhandene Log (inkl. Archive) eingelesen,
+            # damit bereits verbundene Spieler nach einem Neustart sofort wieder erscheinen.
+            if replay and start_position is None:
+                start_position = replay_log(game_parser, config['native']['log_path'])
+            tail_log_file(game_parser, config['native']['log_path'], start_position)
+        elif mode == 'docker':
+            if replay:
+                logger.warning("--replay wird nur im 'native'-Modus unterstützt und ignoriert.")
+            tail_docker_logs(game_parser, config['docker']['container_name'], config['docker'].get('docker_socket'),
+                             start_position)
+
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.critical(f"Kritischer Startfehler aufgrund der Konfiguration: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        if game_parser:
+            game_parser.shutdown()
+        logger.info("Skript durch Benutzer beendet.")
+    except Exception as e:
+        logger.critical("Ein unerwarteter, kritischer Fehler ist aufgetreten:", exc_info=True)
+        sys.exit(1)
+
+
+# --- Hauptausführung ---
+# Für Spiele ohne eigenes Skript: python3 -m parser_core.cli <spiel> [config.ini] [--replay]
+if __name__ == "__main__":
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not arguments or arguments[0] not in GAME_DEFINITIONS:
+        print(f"Aufruf: python3 -m parser_core.cli <{'|'.join(GAME_DEFINITIONS)}> [config.ini] [--replay]", file=sys.stderr)
+        sys.exit(2)
+    main(arguments[0], arguments[1] if len(arguments) > 1 else 'config.ini')
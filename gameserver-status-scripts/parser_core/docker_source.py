@@ -0,0 +1,202 @@
+import calendar
+import functools
+import time
+
+from parser_core.tail import LineSplitter
+
+# Header eines Frames im Multiplex-Format der Docker Engine API: Stream-Typ, 3 Nullbytes, Länge (u32 BE).
+FRAME_HEADER_SIZE = 8
+# Start ohne Wiederaufnahmepunkt: wie bisher nur die Zeilen der letzten Sekunde.
+INITIAL_SINCE_SECONDS = 1
+
+
+class DockerLogError(Exception):
+    """Die Docker Engine API hat die Log-Anfrage abgelehnt (z.B. Container nicht gefunden)."""
+
+
+def _timestamp_key(timestamp):
+    """Vergleichsschlüssel für RFC3339Nano-Zeitstempel (Docker kürzt Nullen am Ende der Nachkommastellen)."""
+    seconds, _, fraction = timestamp.rstrip("Z").partition(".")
+    return seconds, fraction.ljust(9, "0")[:9]
+
+
+@functools.lru_cache(maxsize=256)
+def _utc_second(prefix):
+    """Unix-Zeit für 'YYYY-MM-DDTHH:MM:SS' (UTC) ohne strptime; läuft nur einmal pro Logsekunde."""
+    if len(prefix) != 19 or prefix[4] != "-" or prefix[10] != "T":
+        raise ValueError(f"Ungültiger Zeitstempel: {prefix!r}")
+    return calendar.timegm((int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+                            int(prefix[11:13]), int(prefix[14:16]), int(prefix[17:19]), 0, 0, 0))
+
+
+def _timestamp_to_unix(timestamp):
+    """Wandelt einen UTC-Zeitstempel ('2024-05-01T12:00:00.5Z') in 'sekunden.nanosekunden' für die Engine API."""
+    seconds, fraction = _timestamp_key(timestamp)
+    return f"{_utc_second(seconds)}.{fraction}"
+
+
+def docker_time(timestamp):
+    """Unix-Zeit (float) eines Docker-Zeitstempels ('2024-05-01T12:00:00.123456789Z') oder None."""
+    if not timestamp.endswith("Z"):
+        return None
+    try:
+        seconds = _utc_second(timestamp[:19])
+        fraction = timestamp[19:-1]  # '.123456789' oder leer
+        return seconds + float(fraction) if fraction else float(seconds)
+    except ValueError:
+        return None
+
+
+class FrameDemuxer:
+    """Zerlegt den Multiplex-Stream der Engine API in (Stream-Typ, Nutzdaten).
+
+    Container mit TTY liefern einen Rohdatenstrom ohne Frames. Das wird am ersten Byte
+    erkannt: Mit `timestamps=1` beginnt Rohtext immer mit einer Ziffer, ein Frame mit 0, 1 oder 2.
+    """
+
+    def __init__(self):
+        self.buffer = b""
+        self.raw = None
+
+    def feed(self, data):
+        if self.raw is None:
+            if not data:
+                return []
+            self.raw = data[0] not in (0, 1, 2)
+        if self.raw:
+            return [(1, data)] if data else []
+        self.buffer += data
+        frames = []
+        offset = 0
+        while len(self.buffer) - offset >= FRAME_HEADER_SIZE:
+            size = int.from_bytes(self.buffer[offset + 4:offset + 8], "big")
+            end = offset + FRAME_HEADER_SIZE + size
+            if end > len(self.buffer):
+                break
+            frames.append((self.buffer[offset], self.buffer[offset + FRAME_HEADER_SIZE:end]))
+            offset = end
+        self.buffer = self.buffer[offset:]
+        return frames
+
+
+class DockerLogSource:
+    """Liest `docker logs -f --timestamps` (CLI oder Engine API) verlustfrei über Neustarts hinweg.
+
+    Die Zeitstempel werden von den Zeilen abgetrennt und der zuletzt verarbeitete gemerkt.
+    Nach einem Abbruch wird mit `--since <letzter Zeitstempel>` fortgesetzt; da Docker
+    Zeilen mit genau diesem Zeitstempel erneut liefert, werden so viele davon übersprungen,
+    wie schon verarbeitet wurden. `feed()` ist die Schnittstelle von LineSplitter, die Klasse
+    kann also direkt an follow_pipe übergeben werden. Die Zeitstempel der zuletzt gelieferten
+    Zeilen stehen in `line_timestamps` (None bei Zeilen ohne Zeitstempel); der Parser nutzt
+    sie als Ereigniszeit.
+
+    :param container_name: Name oder ID des Containers.
+    :param socket_path: Pfad zum Docker-Socket für die Engine API oder None für die CLI.
+    """
+
+    def __init__(self, container_name, socket_path=None):
+        self.container_name = container_name
+        self.socket_path = socket_path
+        self.last_timestamp = None
+        self.last_key = None
+        self.count_at_last = 0
+        self.skip_at_last = 0
+        self.lines_skipped = 0
+        self.restarts = 0
+        self.line_timestamps = []
+        self._reset_stream()
+
+    def _reset_stream(self):
+        self.header_buffer = b"" if self.socket_path else None
+        self.demuxer = FrameDemuxer()
+        self.splitters = {}
+
+    def restart(self):
+        """Vor jedem (Neu-)Start des Streams aufrufen."""
+        if self.last_key is not None:
+            self.restarts += 1
+        self.skip_at_last = self.count_at_last
+        self._reset_stream()
+
+    def resume(self, timestamp, count):
+        """Setzt nach einem Neustart des Parsers hinter `count` Zeilen mit dem Zeitstempel `timestamp` fort (Checkpoint)."""
+        self.last_timestamp = timestamp
+        self.last_key = _timestamp_key(timestamp)
+        self.count_at_last = count
+
+    def cli_command(self):
+        since = self.last_timestamp or f"{INITIAL_SINCE_SECONDS}s"
+        return ["docker", "logs", "--timestamps", "--since", since, "-f", self.container_name]
+
+    def api_request(self):
+        if self.last_timestamp:
+            since = _timestamp_to_unix(self.last_timestamp)
+        else:
+            since = str(int(time.time()) - INITIAL_SINCE_SECONDS)
+        # HTTP/1.0, damit der Stream ohne Chunked-Encoding kommt und direkt per os.read gelesen werden kann.
+        return (f"GET /containers/{self.container_name}/logs?follow=1&stdout=1&stderr=0&timestamps=1&since={since} HTTP/1.0\r\n"
+                f"Host: docker\r\n\r\n").encode("ascii")
+
+    def feed(self, data):
+        """Nimmt rohe Bytes entgegen und gibt die neuen, noch nicht verarbeiteten Logzeilen zurück."""
+        if self.header_buffer is not None:
+            data = self._consume_http_header(data)
+            if data is None:
+                return []
+        lines = []
+        if self.socket_path:
+            for stream, payload in self.demuxer.feed(data):
+                splitter = self.splitters.get(stream)
+                if splitter is None:
+                    splitter = self.splitters[stream] = LineSplitter()
+                lines.extend(splitter.feed(payload))
+        else:
+            splitter = self.splitters.get(1)
+            if splitter is None:
+                splitter = self.splitters[1] = LineSplitter()
+            lines = splitter.feed(data)
+        return self._strip_timestamps(lines)
+
+    def _consume_http_header(self, data):
+        """Puffert bis zum Ende des HTTP-Headers; gibt den Rest oder None (Header unvollständig) zurück."""
+        self.header_buffer += data
+        head, separator, rest = self.header_buffer.partition(b"\r\n\r\n")
+        if not separator:
+            return None
+        self.header_buffer = None
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        parts = status_line.split(" ", 2)
+        if len(parts) < 2 or parts[1] != "200":
+            raise DockerLogError(f"{status_line}: {rest.decode('utf-8', errors='replace').strip()}")
+        return rest
+
+    def _strip_timestamps(self, lines):
+        result = []
+        timestamps = self.line_timestamps = []
+        for line in lines:
+            timestamp, separator, message = line.partition(" ")
+            if not separator or not timestamp[:1].isdigit() or "T" not in timestamp:
+                result.append(line)
+                timestamps.append(None)
+                continue
+            key = _timestamp_key(timestamp)
+            if self.last_key is not None:
+                if key < self.last_key:
+                    self.lines_skipped += 1
+                    continue
+                if key == self.last_key:
+                    if self.skip_at_last > 0:
+                        self.skip_at_last -= 1
+                        self.lines_skipped += 1
+                        continue
+                    self.count_at_last += 1
+                else:
+                    self.count_at_last = 1
+                    self.skip_at_last = 0
+            else:
+                self.count_at_last = 1
+            self.last_key = key
+            self.last_timestamp = timestamp
+            result.append(message)
+            timestamps.append(timestamp)
+        return result
@@ -0,0 +1,374 @@
+import configparser
+import re
+import time
+
+from parser_core.game_parser import GameParser
+from parser_core.matcher import LineMatcher
+from parser_core.role_sources import IdList, RoleRules, RoleSources
+
+# Felder, die jede Spielerzeile in der JSON-Ausgabe hat; dazu kommt das Schlüsselfeld des Spiels.
+REQUIRED_PLAYER_FIELDS = ("name", "role", "last_seen")
+RULE_NAME_PATTERN = re.compile(r"[a-z][a-z0-9_]*$")
+# Editoren schreiben eine Datei oft in mehreren Schritten; erst nach dieser Ruhezeit neu laden.
+ROLE_RELOAD_DEBOUNCE_SECONDS = 0.5
+# Prüfintervall für Admin-Listen und Rollenregeln, falls inotify nicht verfügbar ist.
+ROLE_SOURCE_POLL_SECONDS = 10
+
+
+class Rule:
+    """Eine Logzeilen-Regel: Name, Regex mit benannten Gruppen, Literale für den Vorfilter, Aktion.
+
+    `examples` sind Logzeilen, die bei der Validierung genau dieser Regel zugeordnet werden
+    müssen; so fallen fehlende Literale oder ein falscher Vorrang schon beim Start auf.
+    """
+
+    def __init__(self, name, pattern, literals, action, examples=()):
+        self.name = name
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.literals = tuple(literals)
+        self.action = action
+        self.examples = tuple(examples)
+
+
+# --- Aktionen: Zustandsübergänge, die eine Regel auslösen kann ---
+
+class OpenSession:
+    """Öffnet eine noch unbenannte Session mit dem Schlüssel aus Gruppe `key`."""
+
+    def __init__(self, key, convert=str):
+        self.key = key
+        self.convert = convert
+        self.groups = (key,)
+
+    def bind(self, parser):
+        store, logger, label = parser.store, parser.logger, parser.definition.key_label
+        key_group, convert = self.key, self.convert
+
+        def handler(groups, timestamp):
+            key = convert(groups[key_group])
+            if store.open_session(key, timestamp):
+                logger.debug(f"Session gestartet ({label}: {key}).")
+        return handler
+
+
+class Login:
+    """Ordnet den Namen aus Gruppe `name` der ältesten unbenannten Session zu, die jünger als `window` Sekunden ist.
+
+    :param strip: Leerzeichen um den Namen entfernen.
+    :param touch_if_active: Ist der Spieler schon aktiv (z.B. erneuter Spawn), nur `last_seen` aktualisieren.
+    :param await_grants: Folgende Grant-Zeilen gehören zu diesem Spieler (z.B. Berechtigungen nach dem Login).
+    """
+
+    def __init__(self, name, window, strip=False, touch_if_active=False, await_grants=False):
+        self.name = name
+        self.window = window
+        self.strip = strip
+        self.touch_if_active = touch_if_active
+        self.await_grants = await_grants
+        self.groups = (name,)
+
+    def bind(self, parser):
+        store, logger, label = parser.store, parser.logger, parser.definition.key_label
+        name_group, window, strip = self.name, self.window, self.strip
+        touch_if_active, await_grants = self.touch_if_active, self.await_grants
+
+        def handler(groups, timestamp):
+            player_name = groups[name_group].strip() if strip else groups[name_group]
+            if touch_if_active and player_name in store.active_players:
+                parser.touch_player(store.active_players[player_name], timestamp)
+                return
+            key = store.claim_pending(timestamp, window)
+            if key is None:
+                logger.warning(f"Konnte keine passende Session ({label}) für Spieler '{player_name}' finden.")
+                return
+            player = parser.new_player(key, player_name, timestamp)
+            parser.activate_player(key, player_name, player, timestamp)
+            if await_grants:
+                store.set_awaiting_permissions(key)
+            logger.info(f"Spieler '{player_name}' ({label}: {key}, Rolle: {player['role']}) in aktive Spieler aufgenommen.")
+            parser.mark_players_changed()
+        return handler
+
+
+class Grant:
+    """Hängt den Wert aus Gruppe `value` an das Listenfeld `field` des zuletzt angemeldeten Spielers und berechnet die Rolle neu."""
+
+    def __init__(self, value, field="permissions"):
+        self.value = value
+        self.field = field
+        self.groups = (value,)
+
+    def bind(self, parser):
+        store, logger, role = parser.store, parser.logger, parser.definition.role
+        value_group, field = self.value, self.field
+
+        def handler(groups, timestamp):
+            player = store.awaiting_player()
+            if player:
+                player[field].append(groups[value_group])
+                player['role'] = role(player, parser.role_sources)
+                parser.touch_player(player, timestamp)
+                logger.debug(f"'{groups[value_group]}' für '{player['name']}' hinzugefügt. Neue Rolle: {player['role']}")
+                parser.mark_players_changed()
+        return handler
+
+
+class Logout:
+    """Meldet den Spieler mit dem Namen aus Gruppe `name` ab."""
+
+    def __init__(self, name):
+        self.name = name
+        self.groups = (name,)
+
+    def bind(self, parser):
+        logger, name_group = parser.logger, self.name
+
+        def handler(groups, timestamp):
+            player_name = groups[name_group]
+            if parser.remove_player(player_name, timestamp):
+                logger.info(f"Spieler '{player_name}' abgemeldet.")
+                parser.mark_players_changed()
+        return handler
+
+
+class CloseSession:
+    """Beendet die Session mit dem Schlüssel aus Gruppe `key` und meldet ihren Spieler ab."""
+
+    def __init__(self, key, convert=str):
+        self.key = key
+        self.convert = convert
+        self.groups = (key,)
+
+    def bind(self, parser):
+        logger, key_group, convert = parser.logger, self.key, self.convert
+
+        def handler(groups, timestamp):
+            player_name = parser.remove_session(convert(groups[key_group]), timestamp)
+            if player_name:
+                logger.info(f"Spieler '{player_name}' abgemeldet (Session beendet).")
+                parser.mark_players_changed()
+        return handler
+
+
+class GameDefinition:
+    """Deklarative Beschreibung eines Spiels für die gemeinsame Parser-Engine.
+
+    Ein Spiel besteht nur aus Regeln (Muster + Aktion), dem Aufbau der Spielerzeile in der
+    JSON-Ausgabe und einer Rollenfunktion `role(player, sources)`. Tailing, Zustand, Timer,
+    Snapshot, Historie und Metriken liefert GameParser für alle Spiele gemeinsam.
+
+    :param name: Kennung in der Konfiguration (z.B. 'valheim').
+    :param display_name: Name für Log-Meldungen (z.B. 'Valheim').
+    :param rules: Liste von Rule; die Reihenfolge bestimmt den Vorrang.
+    :param key_field: Feld der Spielerzeile mit dem Session-Schlüssel (z.B. 'steam_id').
+    :param key_label: Bezeichnung des Schlüssels in Log-Meldungen (z.B. 'SteamID').
+    :param player_fields: Felder der Spielerzeile in Ausgabereihenfolge.
+    :param role: Funktion (Spielerzeile, RoleSources) -> Rollenname.
+    :param defaults: Startwert-Fabriken für weitere Felder (z.B. {'permissions': list}).
+    :param parse_log_time: Funktion (Zeile) -> Zeit aus dem Präfix oder None (Ereigniszeit live und beim --replay).
+    :param log_time_of_day: True, wenn parse_log_time nur Sekunden seit Mitternacht liefert.
+    :param list_settings: Dict Name -> Einstellung mit dem Pfad einer ID-Liste (eine ID pro Zeile),
+                          z.B. {'admins': 'admin_list_path'}; in `role` als sources[Name]. Statt der
+                          Einstellung auch (Einstellung, Schalter): Die Liste wird nur geladen, wenn die
+                          Einstellung `Schalter` aktiviert ist (für Listen, die zusätzliche Rollen ergeben).
+    :param role_rules: Standardregeln (Rolle, Berechtigungen) für `sources.rules` (siehe RoleRules).
+    :param role_rules_setting: Einstellung mit dem Pfad einer Datei, die `role_rules` ersetzt.
+    """
+
+    def __init__(self, name, display_name, rules, key_field, key_label, player_fields, role, defaults=None,
+                 parse_log_time=None, log_time_of_day=False, list_settings=None, role_rules=None, role_rules_setting=None):
+        self.name = name
+        self.display_name = display_name
+        self.rules = list(rules)
+        self.key_field = key_field
+        self.key_label = key_label
+        self.player_fields = tuple(player_fields)
+        self.role = role
+        self.defaults = dict(defaults or {})
+        self.parse_log_time = parse_log_time
+        self.log_time_of_day = log_time_of_day
+        self.list_settings = dict(list_settings or {})
+        self.role_rules = role_rules
+        self.role_rules_setting = role_rules_setting
+        self._parser_class = None
+
+    def validate(self):
+        """Prüft die Definition; wirft ValueError mit allen gefundenen Fehlern."""
+        errors = []
+        names = [rule.name for rule in self.rules]
+        for name in sorted({name for name in names if names.count(name) > 1}):
+            errors.append(f"Regel '{name}' ist mehrfach definiert.")
+        for rule in self.rules:
+            if not RULE_NAME_PATTERN.match(rule.name):
+                errors.append(f"Regelname '{rule.name}' ist ungültig (erlaubt: a-z, 0-9, _).")
+            if not rule.literals or not all(rule.literals):
+                errors.append(f"Regel '{rule.name}' braucht mindestens ein nicht leeres Literal für den Vorfilter.")
+            missing = [group for group in rule.action.groups if group not in rule.pattern.groupindex]
+            if missing:
+                errors.append(f"Regel '{rule.name}': Gruppe(n) {', '.join(missing)} fehlen im Muster.")
+        if not any(isinstance(rule.action, Login) for rule in self.rules):
+            errors.append("Keine Login-Regel definiert.")
+        if any(isinstance(rule.action, Grant) for rule in self.rules) and not any(
+                isinstance(rule.action, Login) and rule.action.await_grants for rule in self.rules):
+            errors.append("Grant-Regeln brauchen eine Login-Regel mit await_grants=True.")
+        for field in REQUIRED_PLAYER_FIELDS + (self.key_field,):
+            if field not in self.player_fields:
+                errors.append(f"Feld '{field}' fehlt in player_fields.")
+        for field in self.player_fields:
+            if field not in REQUIRED_PLAYER_FIELDS + (self.key_field,) and not callable(self.defaults.get(field)):
+                errors.append(f"Feld '{field}' braucht eine Startwert-Fabrik in defaults.")
+        for rule in self.rules:
+            if isinstance(rule.action, Grant) and self.defaults.get(rule.action.field) is not list:
+                errors.append(f"Regel '{rule.name}': Feld '{rule.action.field}' muss mit defaults=list angelegt werden.")
+        if not callable(self.role):
+            errors.append("role muss eine Funktion (Spielerzeile, RoleSources) -> Rolle sein.")
+        for name, setting in self.list_settings.items():
+            if not isinstance(setting, str) and not (isinstance(setting, tuple) and len(setting) == 2
+                                                     and all(isinstance(part, str) for part in setting)):
+                errors.append(f"Liste '{name}': Einstellung muss ein Name oder (Einstellung, Schalter) sein.")
+        if self.role_rules_setting and not self.role_rules:
+            errors.append("role_rules_setting braucht Standardregeln in role_rules.")
+        for rule in self.role_rules or ():
+            if len(rule) != 2 or not isinstance(rule[0], str) or isinstance(rule[1], str):
+                errors.append(f"Rollenregel {rule!r} muss (Rolle, Berechtigungen) sein.")
+        if not errors:
+            matcher = LineMatcher([(rule.name, rule.pattern, rule.literals) for rule in self.rules])
+            for rule in self.rules:
+                for example in rule.examples:
+                    result = matcher.match(example)
+                    if result is None or result[0] != rule.name:
+                        errors.append(f"Beispielzeile für '{rule.name}' wird als "
+                                      f"'{result[0] if result else 'keine Regel'}' erkannt: {example!r}")
+        if errors:
+            raise ValueError(f"Spieldefinition '{self.name}' ist ungültig: " + " ".join(errors))
+
+    @property
+    def parser_class(self):
+        """GameParser-Unterklasse für dieses Spiel (einmal erzeugt, Muster und Matcher vorkompiliert)."""
+        if self._parser_class is None:
+            attributes = {
+                "definition": self,
+                "game_name": self.display_name,
+                "matcher": LineMatcher([(rule.name, rule.pattern, rule.literals) for rule in self.rules]),
+                "log_time_of_day": self.log_time_of_day,
+                "__module__": f"parser_core.games.{self.name}",
+                "__doc__": f"Parser für {self.display_name} (aus der Spieldefinition erzeugt).",
+            }
+            if self.parse_log_time is not None:
+                attributes["parse_log_time"] = staticmethod(self.parse_log_time)
+            self._parser_class = type(f"{self.display_name.replace(' ', '')}Parser", (DefinedGameParser,), attributes)
+        return self._parser_class
+
+
+def setting_enabled(settings, name):
+    """Ja/Nein-Einstellung wie bei configparser (true/false, yes/no, on/off, 1/0); Standard: aus."""
+    value = str(settings.get(name, "false")).strip().lower()
+    if value not in configparser.ConfigParser.BOOLEAN_STATES:
+        raise ValueError(f"Konfigurationsfehler: '{name}' muss true oder false sein, nicht '{value}'.")
+    return configparser.ConfigParser.BOOLEAN_STATES[value]
+
+
+class DefinedGameParser(GameParser):
+    """GameParser, dessen Handler aus den Aktionen einer GameDefinition gebunden werden."""
+
+    definition = None
+
+    def __init__(self, settings, instance_name=None, clock=time.monotonic):
+        super().__init__(settings, instance_name, clock)
+        definition = self.definition
+        lists = {name: IdList(self.list_path(setting), self.logger) for name, setting in definition.list_settings.items()}
+        rules = None
+        if definition.role_rules:
+            rules = RoleRules(settings.get(definition.role_rules_setting) if definition.role_rules_setting else None,
+                              definition.role_rules, self.logger)
+        self.role_sources = RoleSources(lists, rules, self.logger)
+        self.role_reload_pending = False
+
+    def list_path(self, setting):
+        """Pfad einer ID-Liste aus den Einstellungen; None, wenn nicht gesetzt oder ihr Schalter aus ist."""
+        if isinstance(setting, str):
+            return self.settings.get(setting)
+        setting, switch = setting
+        path = self.settings.get(setting)
+        if not setting_enabled(self.settings, switch):
+            if path:
+                self.logger.warning(f"{setting} wird ignoriert, solange {switch} nicht aktiviert ist.")
+            return None
+        return path
+
+    def build_handlers(self):
+        return {rule.name: rule.action.bind(self) for rule in self.definition.rules}
+
+    def start(self):
+        # Rollen aus Checkpoint oder Replay wurden ohne die Listen berechnet.
+        self.reload_role_sources(recompute_all=True)
+        super().start()
+        if self.role_sources.configured() and self.role_sources.watcher is None:
+            self.scheduler.call_every(ROLE_SOURCE_POLL_SECONDS, self.check_role_sources)
+
+    def shutdown(self):
+        super().shutdown()
+        self.role_sources.close()
+
+    def watched_fileno(self):
+        return self.role_sources.fileno()
+
+    def run_timers(self):
+        if self.role_sources.watcher is not None:
+            self.check_role_sources()
+        super().run_timers()
+
+    def check_role_sources(self):
+        """Plant nach einer Änderung an Admin-Listen oder Rollenregeln ein entprelltes Neuladen."""
+        if self.role_sources.changed() and not self.role_reload_pending:
+            self.role_reload_pending = True
+            self.scheduler.call_later(ROLE_RELOAD_DEBOUNCE_SECONDS, self.reload_role_sources)
+
+    def reload_role_sources(self, recompute_all=False):
+        """Lädt geänderte Listen/Regeln und berechnet die Rollen betroffener Spieler neu.
+
+        Bei geänderten ID-Listen sind das nur Spieler, deren Schlüssel hinzukam oder wegfiel;
+        bei geänderten Regeln oder einer Liste, die leer wird bzw. es nicht mehr ist, alle
+        (siehe RoleSources.reload). Geänderte Rollen ergeben einen einzigen Snapshot.
+        """
+        self.role_reload_pending = False
+        started = time.perf_counter()
+        changed_ids, affects_all = self.role_sources.reload()
+        players = self.store.active_players.values()
+        if not (recompute_all or affects_all):
+            if not changed_ids:
+                return
+            key_field = self.definition.key_field
+            players = [player for player in players if str(player[key_field]) in changed_ids]
+        changed = self.recompute_roles(players)
+        if changed or not recompute_all:
+            self.logger.info(f"Rollen neu berechnet: {changed} Spieler mit neuer Rolle "
+                             f"({(time.perf_counter() - started) * 1000:.1f} ms).")
+
+    def recompute_roles(self, players):
+        """Berechnet die Rollen der übergebenen Spieler neu; gibt die Anzahl der Änderungen zurück."""
+        role, sources = self.definition.role, self.role_sources
+        changed = 0
+        for player in players:
+            new_role = role(player, sources)
+            if new_role != player['role']:
+                player['role'] = new_role
+                changed += 1
+        if changed:
+            self.mark_players_changed()
+        return changed
+
+    def assign_role(self, player):
+        return self.definition.role(player, self.role_sources)
+
+    def new_player(self, key, player_name, timestamp):
+        """Baut die Spielerzeile für die JSON-Ausgabe in der Feldreihenfolge der Definition."""
+        definition = self.definition
+        player = dict.fromkeys(definition.player_fields)
+        player["name"] = player_name
+        player[definition.key_field] = key
+        player["last_seen"] = timestamp
+        for field, factory in definition.defaults.items():
+            player[field] = factory()
+        player["role"] = definition.role(player, self.role_sources)
+        return player
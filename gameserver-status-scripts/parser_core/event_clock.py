@@ -0,0 +1,80 @@
+import functools
+import time
+
+from parser_core.replay import DAY_ROLLOVER_TOLERANCE, SECONDS_PER_DAY
+
+
+class EventClock:
+    """Zeitachse der Ereignisse im Live-Betrieb.
+
+    Ereignisse erhalten die Zeit ihrer Logzeile (Docker-Zeitstempel oder Präfix des Spiels)
+    statt der Uhrzeit ihrer Verarbeitung. Zeitfenster wie „Login bis 60 s nach dem Connect"
+    bleiben so auch beim Aufholen eines Rückstands mit Zehntausenden Zeilen pro Sekunde
+    korrekt. `now()` schreibt die zuletzt gesehene Logzeit mit der monotonen Uhr fort:
+    Timeouts und Eviction messen auf derselben Zeitachse wie die Ereignisse und sind
+    unabhängig von Sprüngen der Systemuhr (NTP, manuelles Stellen).
+
+    Logs mit reiner Uhrzeit (Enshrouded) erhalten den Tag, an dem die Uhrzeit höchstens
+    DAY_ROLLOVER_TOLERANCE nach `now()` liegt; Tageswechsel und lange Pausen ohne
+    Logzeilen werden so erkannt.
+
+    :param time_of_day: True, wenn parse_log_time nur Sekunden seit Mitternacht liefert.
+    :param start: Startpunkt der Zeitachse (Standard: aktuelle Systemzeit).
+    """
+
+    def __init__(self, time_of_day=False, start=None, clock=time.monotonic):
+        self.time_of_day = time_of_day
+        self.clock = clock
+        self.last = time.time() if start is None else start
+        self.last_tick = clock()
+        self.days = []  # (Beginn, Ende, Datum) der zuletzt verwendeten lokalen Tage
+
+    def now(self):
+        """Aktuelle Zeit auf der Zeitachse der Ereignisse."""
+        return self.last + (self.clock() - self.last_tick)
+
+    def timestamp(self, value=None, absolute=None):
+        """Zeitstempel eines Ereignisses; die Zeitachse folgt ihm (auch rückwärts beim Aufholen).
+
+        :param value: Ergebnis von `parse_log_time` oder None (Zeile ohne Zeitangabe: `now()`).
+        :param absolute: Unix-Zeit aus dem Docker-Zeitstempel; hat Vorrang vor `value`.
+        """
+        tick = self.clock()
+        if absolute is not None:
+            value = absolute
+        elif value is None:
+            return self.last + (tick - self.last_tick)
+        elif self.time_of_day:
+            value = self._on_day(value, self.last + (tick - self.last_tick))
+        self.last = value
+        self.last_tick = tick
+        return value
+
+    def _on_day(self, seconds, now):
+        """Sekunden seit Mitternacht -> spätester Zeitpunkt, der höchstens DAY_ROLLOVER_TOLERANCE nach `now` liegt."""
+        latest = now + DAY_ROLLOVER_TOLERANCE
+        timestamp = self._local_time(latest, seconds)
+        if timestamp > latest:
+            timestamp = self._local_time(latest - SECONDS_PER_DAY, seconds)
+        return timestamp
+
+    def _local_time(self, moment, seconds):
+        """Unix-Zeit der Uhrzeit `seconds` am lokalen Tag von `moment` (Sommerzeit wird berücksichtigt)."""
+        for start, end, date in self.days:
+            if start <= moment < end:
+                break
+        else:
+            local = time.localtime(moment)
+            date = (local.tm_year, local.tm_mon, local.tm_mday)
+            start = time.mktime(date + (0, 0, 0, 0, 0, -1))
+            end = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+            # Heute und gestern genügen; beim Aufholen über Mitternacht wird beides gebraucht.
+            self.days = [(start, end, date)] + self.days[:1]
+        hour = int(seconds // 3600)
+        return _hour_start(date, hour) + seconds - hour * 3600
+
+
+@functools.lru_cache(maxsize=64)
+def _hour_start(date, hour):
+    """Unix-Zeit des Stundenbeginns (lokale Zeit); mktime läuft so nur einmal pro Logstunde."""
+    return time.mktime(date + (hour, 0, 0, 0, 0, -1))
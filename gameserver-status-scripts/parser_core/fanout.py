@@ -0,0 +1,218 @@
+import asyncio
+import collections
+import inspect
+import logging
+import multiprocessing
+import pickle
+import signal
+import socket
+import struct
+import time
+
+from parser_core.replay import candidate_starts
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+# Länge einer Nachricht (u32 BE) vor den pickle-Daten
+HEADER = struct.Struct("!I")
+
+
+def _send_message(sock, message):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _read_message(stream):
+    """Liest eine Nachricht aus einem Datei-Objekt; None bei EOF."""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    return pickle.loads(stream.read(HEADER.unpack(header)[0]))
+
+
+def match_block(matcher, parse_log_time, text):
+    """Vorfilter und Regex über einen Textblock; gibt (Ereignisse, Zeilen, Zeit der letzten Zeile) zurück.
+
+    Der Vorfilter ist replay.candidate_starts, Zeilen ohne Literal werden gar nicht erst
+    zerlegt. Ein Ereignis ist (Zeilennummer im Block, Regelname, Gruppen, Ergebnis von parse_log_time).
+    """
+    events = []
+    index = 0
+    previous = 0
+    for start in candidate_starts(text, matcher.literals):
+        index += text.count("\n", previous, start)
+        previous = start
+        end = text.find("\n", start)
+        line = text[start:] if end < 0 else text[start:end]
+        result = matcher.match(line)
+        if result is not None:
+            events.append((index, result[0], result[1], parse_log_time(line) if parse_log_time else None))
+    last_line = text[text.rfind("\n") + 1:]
+    last_time = parse_log_time(last_line) if parse_log_time else None
+    return events, text.count("\n") + 1, last_time
+
+
+def _match_worker(sock, inherited):
+    """Hauptschleife eines Worker-Prozesses: Blöcke empfangen, matchen, Ereignisse zurücksenden."""
+    # Signale (auch SIGTERM an die ganze cgroup) gehen an den Hauptprozess; der Worker endet,
+    # sobald dieser den Socket schließt oder selbst beendet wird.
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    for other in inherited:
+        other.close()
+    stream = sock.makefile("rb")
+    instances = {}
+    while True:
+        message = _read_message(stream)
+        if message is None:
+            return
+        slot, payload = message
+        if isinstance(payload, tuple):
+            # Anmeldung einer Instanz: (LineMatcher, parse_log_time oder None)
+            instances[slot] = payload
+            continue
+        started = time.perf_counter()
+        matcher, parse_log_time = instances[slot]
+        text = payload.decode("utf-8", errors="replace") if isinstance(payload, bytes) else payload
+        events, lines, last_time = match_block(matcher, parse_log_time, text)
+        _send_message(sock, (events, lines, last_time, time.perf_counter() - started))
+
+
+class _WorkerChannel:
+    """Verbindung des Owners zu einem Worker; Antworten kommen in Sendereihenfolge zurück."""
+
+    def __init__(self, index, process, sock):
+        self.index = index
+        self.process = process
+        self.sock = sock
+        self.pending = collections.deque()
+        self.reader = self.writer = self.task = None
+        self.failed = None
+        self.closing = False
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(sock=self.sock)
+        self.task = asyncio.create_task(self._receive(), name=f"match-worker-{self.index}")
+
+    def send(self, message):
+        data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+        self.writer.write(HEADER.pack(len(data)) + data)
+
+    async def request(self, message):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.send(message)
+        await self.writer.drain()
+        return await future
+
+    async def _receive(self):
+        try:
+            while True:
+                header = await self.reader.readexactly(HEADER.size)
+                data = await self.reader.readexactly(HEADER.unpack(header)[0])
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result(pickle.loads(data))
+        except (asyncio.IncompleteReadError, OSError) as e:
+            self.failed = e
+        if not self.closing:
+            logger.error(f"Match-Worker {self.index} (PID {self.process.pid}) beendet; "
+                         f"seine Instanzen werden im Hauptprozess verarbeitet.")
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(f"Match-Worker {self.index} beendet"))
+
+    async def close(self):
+        self.closing = True
+        if self.writer is not None:
+            self.writer.close()
+        if self.task is not None:
+            await self.task
+
+
+class MatchPool:
+    """Verteilt das Matching mehrerer Instanzen auf Worker-Prozesse (`match_workers` im Daemon).
+
+    Die Follower des Daemons lesen weiterhin im Event-Loop, reichen aber nur rohe Blöcke
+    vollständiger Zeilen weiter. Jede Instanz ist fest einem Worker zugeordnet (reihum in
+    Konfigurationsreihenfolge); der Worker dekodiert den Block, wendet Vorfilter und Regex
+    an und schickt kompakte Ereignis-Tupel zurück. Zustandsübergänge, Timer und Snapshots
+    bleiben im Hauptprozess: `process()` wartet auf die Antwort und wendet die Ereignisse
+    mit GameParser.apply_matches in Logreihenfolge an. Da ein Follower erst nach der
+    Antwort weiterliest, bleibt die Reihenfolge pro Instanz erhalten, während die Worker
+    die Blöcke verschiedener Instanzen parallel matchen.
+
+    Die Worker entstehen per fork (Linux), damit auch zur Laufzeit registrierte Spiele
+    bekannt sind; der Pool muss daher vor Threads und Signal-Handlern angelegt werden.
+    Fällt ein Worker aus, verarbeitet der Hauptprozess dessen Instanzen wieder selbst.
+
+    :param workers: Anzahl der Worker-Prozesse.
+    """
+
+    def __init__(self, workers):
+        context = multiprocessing.get_context("fork")
+        self.channels = []
+        owner_sockets = []
+        for index in range(workers):
+            owner_sock, worker_sock = socket.socketpair()
+            # Der Worker schließt alle geerbten Owner-Enden, sonst sähe er nie ein EOF.
+            process = context.Process(target=_match_worker, args=(worker_sock, owner_sockets + [owner_sock]),
+                                      name=f"match-worker-{index}", daemon=True)
+            process.start()
+            worker_sock.close()
+            owner_sockets.append(owner_sock)
+            self.channels.append(_WorkerChannel(index, process, owner_sock))
+        self.slots = {}  # id(Parser) -> (Kanal, Slot) oder None (im Hauptprozess)
+
+    async def start(self):
+        for channel in self.channels:
+            await channel.connect()
+
+    def register(self, parser):
+        """Ordnet eine Instanz reihum einem Worker zu; ohne übertragbare Regeln bleibt sie im Hauptprozess."""
+        slot = len(self.slots)
+        channel = self.channels[slot % len(self.channels)]
+        try:
+            channel.send((slot, (parser.matcher, _static_parse_log_time(parser))))
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            parser.logger.warning(f"Regeln können nicht an einen Match-Worker übergeben werden ({e}); "
+                                  f"Matching im Hauptprozess.")
+            self.slots[id(parser)] = None
+            return
+        self.slots[id(parser)] = (channel, slot)
+        parser.logger.info(f"Matching in Worker-Prozess {channel.index} (PID {channel.process.pid}).")
+
+    async def process(self, parser, payload, docker_timestamps=None):
+        """Matcht einen Block (bytes oder str, Zeilen ohne letzten Umbruch) im Worker und wendet die Ereignisse an."""
+        assignment = self.slots.get(id(parser))
+        if assignment is not None and assignment[0].failed is None:
+            channel, slot = assignment
+            try:
+                reply = await channel.request((slot, payload))
+            except ConnectionError:
+                pass
+            else:
+                parser.apply_matches(*reply, docker_timestamps=docker_timestamps)
+                return
+        text = payload.decode("utf-8", errors="replace") if isinstance(payload, bytes) else payload
+        parser.process_log_lines(text.split("\n"), docker_timestamps)
+
+    async def close(self):
+        """Schließt die Verbindungen; die Worker beenden sich am EOF."""
+        for channel in self.channels:
+            await channel.close()
+        for channel in self.channels:
+            channel.process.join(timeout=5)
+            if channel.process.is_alive():
+                # SIGTERM ignoriert der Worker (siehe _match_worker).
+                channel.process.kill()
+                channel.process.join()
+
+
+def _static_parse_log_time(parser):
+    """parse_log_time als Funktion ohne Instanz (aus der Spieldefinition) oder None."""
+    attribute = inspect.getattr_static(type(parser), "parse_log_time")
+    return attribute.__func__ if isinstance(attribute, staticmethod) else None
@@ -0,0 +1,299 @@
+import logging
+import time
+
+from parser_core.checkpoint import CHECKPOINT_VERSION, CheckpointWriter
+from parser_core.docker_source import docker_time
+from parser_core.event_clock import EventClock
+from parser_core.history import SessionHistory
+from parser_core.metrics import ParserMetrics
+from parser_core.player_state import PlayerStore
+from parser_core.snapshot import SnapshotWriter
+from parser_core.timers import ExpiryTracker, Scheduler
+
+
+class InstanceLoggerAdapter(logging.LoggerAdapter):
+    """Stellt Meldungen den Instanznamen voran, wenn mehrere Server in einem Prozess laufen."""
+
+    def process(self, msg, kwargs):
+        instance = self.extra.get("instance")
+        return (f"[{instance}] {msg}" if instance else msg), kwargs
+
+
+class GameParser:
+    """Zustand, Timer und JSON-Ausgabe einer einzelnen Serverinstanz.
+
+    Spiele werden in der Regel deklarativ beschrieben (parser_core/engine.py, GameDefinition).
+    Alternativ setzen Unterklassen `matcher` (LineMatcher mit den Regeln des Spiels) und
+    implementieren für jede Regel einen Handler `on_<regel>(groups, timestamp)`. Alle Daten
+    hängen an der Instanz, sodass mehrere Server isoliert in einem Prozess laufen können.
+
+    `timestamp` ist die Zeit aus der Logzeile (siehe EventClock), nicht die der Verarbeitung;
+    Timeouts und Eviction rechnen mit `clock.now()` auf derselben Zeitachse.
+
+    :param settings: Flaches Dict der Instanz-Einstellungen (output_json_path,
+                     player_timeout_seconds, json_flush_interval_seconds,
+                     snapshot_shm_path, history_db_path, pending_session_ttl_seconds,
+                     max_pending_sessions, checkpoint_path, ...).
+    :param instance_name: Optionaler Name für Log-Meldungen (Multi-Instanz-Betrieb).
+    :param clock: Monotone Uhr für Timer, Snapshot-Intervall und EventClock (in Benchmarks ersetzbar).
+    """
+
+    game_name = "Game"
+    matcher = None
+    # True, wenn die Logzeilen nur eine Uhrzeit ohne Datum tragen (siehe ReplayClock).
+    log_time_of_day = False
+
+    def __init__(self, settings, instance_name=None, clock=time.monotonic):
+        self.settings = settings
+        self.instance_name = instance_name
+        self.logger = InstanceLoggerAdapter(logging.getLogger(type(self).__module__), {"instance": instance_name})
+        self.replay_clock = None
+        self.clock = EventClock(self.log_time_of_day, clock=clock)
+        # Von den Tail-Funktionen gesetzt, damit /metrics Lag und Neustarts auslesen kann.
+        self.log_follower = None
+        self.docker_source = None
+        self.line_queue = None
+        # Leseposition hinter dem zuletzt verarbeiteten Batch (für Checkpoints).
+        self.position = None
+        self.store = PlayerStore(float(settings.get('pending_session_ttl_seconds', 120.0)),
+                                 int(settings.get('max_pending_sessions', 1000)))
+        self.handlers = self.build_handlers()
+        self.metrics = ParserMetrics(self.handlers)
+        self.scheduler = Scheduler(clock)
+        self.liveness = ExpiryTracker(int(settings.get('player_timeout_seconds', 0)))
+        self.snapshot_writer = SnapshotWriter(settings['output_json_path'], self.snapshot_data,
+                                              float(settings.get('json_flush_interval_seconds', 1.0)), clock,
+                                              shm_path=settings.get('snapshot_shm_path') or None)
+        history_path = settings.get('history_db_path')
+        self.history = SessionHistory(history_path, float(settings.get('history_flush_interval_seconds', 5.0))) if history_path else None
+        checkpoint_path = settings.get('checkpoint_path')
+        self.checkpoint = CheckpointWriter(checkpoint_path, self.checkpoint_data,
+                                           float(settings.get('checkpoint_interval_seconds', 5.0))) if checkpoint_path else None
+
+    def build_handlers(self):
+        """Regelname -> Handler(groups, timestamp); hier die Methoden `on_<regel>`."""
+        if self.matcher is None:
+            return {}
+        return {name: getattr(self, f"on_{name}") for name in self.matcher.names}
+
+    def start(self):
+        """Schreibt den (leeren) Anfangszustand und plant die periodischen Aufgaben."""
+        self.snapshot_writer.flush()
+        self.scheduler.call_every(10, self.expire_inactive_players)
+        self.scheduler.call_every(10, self.evict_pending_sessions)
+        if self.history is not None:
+            self.scheduler.call_every(60, lambda: self.history.tick(self.clock.now()))
+        if self.checkpoint is not None:
+            self.scheduler.call_every(self.checkpoint.interval, self.checkpoint.save)
+
+    def shutdown(self):
+        """Schreibt noch ausstehende Änderungen."""
+        if self.checkpoint is not None:
+            self.checkpoint.save()
+        if self.snapshot_writer.dirty:
+            self.snapshot_writer.flush()
+        self.snapshot_writer.close()
+        if self.history is not None:
+            self.history.close()
+
+    def snapshot_data(self):
+        return list(self.store.active_players.values())
+
+    def read_position(self):
+        """Aktuelle Leseposition des Tails hinter der letzten vollständigen Zeile (oder None)."""
+        follower = self.log_follower
+        if follower is not None and follower.inode is not None:
+            return {"inode": follower.inode, "offset": follower.offset - len(follower.splitter.partial)}
+        source = self.docker_source
+        if source is not None and source.last_timestamp:
+            return {"docker_timestamp": source.last_timestamp, "docker_count": source.count_at_last}
+        return None
+
+    def checkpoint_data(self):
+        """Inhalt eines Checkpoints (siehe CheckpointWriter); None, solange keine Leseposition bekannt ist.
+
+        Die Position stammt aus dem zuletzt vollständig verarbeiteten Batch. Ein gelesener, aber
+        (z.B. beim Beenden während des Wartens auf einen Match-Worker) nicht mehr verarbeiteter
+        Block wird so beim nächsten Start erneut gelesen. Mit einer LineQueue ist der Follower
+        der Verarbeitung voraus; dann zählt allein die Position des verarbeiteten Batches.
+        """
+        position = self.position
+        if position is None and self.line_queue is None:
+            position = self.read_position()
+        if position is None:
+            return None
+        return {"version": CHECKPOINT_VERSION, "game": self.game_name, "saved": time.time(),
+                "position": position, "store": self.store.to_state()}
+
+    def restore_state(self, data):
+        """Übernimmt Spielerzustand und Position aus einem Checkpoint (siehe restore_checkpoint)."""
+        self.store.restore(data["store"])
+        self.position = data["position"]
+        for name, player in self.store.active_players.items():
+            self.liveness.touch(name, player.get('last_seen', self.clock.now()))
+        if self.history is not None:
+            self.history.reconcile(self.store.active_players, self.clock.now())
+        self.mark_players_changed()
+
+    def mark_players_changed(self):
+        """Merkt die Spielerdaten zum Schreiben vor. Der SnapshotWriter fasst Änderungen zusammen."""
+        self.snapshot_writer.mark_dirty()
+
+    def touch_player(self, player, timestamp):
+        """Vermerkt, dass eine Logzeile den Spieler erwähnt hat."""
+        player['last_seen'] = timestamp
+        self.liveness.touch(player['name'], timestamp)
+
+    def activate_player(self, key, player_name, player_data, timestamp):
+        """Nimmt einen Spieler in die aktiven Spieler auf (ein erneuter Login setzt die Session fort)."""
+        rejoined = player_name in self.store.active_players
+        self.store.activate(key, player_name, player_data)
+        self.liveness.touch(player_name, timestamp)
+        if not rejoined and self.recording_history():
+            self.history.login(player_name, timestamp)
+
+    def remove_player(self, player_name, timestamp):
+        """Entfernt einen aktiven Spieler und seine Timeout-Überwachung."""
+        self.liveness.forget(player_name)
+        removed = self.store.remove_player(player_name)
+        if removed and self.recording_history():
+            self.history.logout(player_name, timestamp)
+        return removed
+
+    def remove_session(self, key, timestamp):
+        """Entfernt eine Session; gibt den Namen eines dabei abgemeldeten Spielers zurück."""
+        player_name = self.store.remove_session(key)
+        if player_name:
+            self.liveness.forget(player_name)
+            if self.recording_history():
+                self.history.logout(player_name, timestamp)
+        return player_name
+
+    def recording_history(self):
+        """Beim Replay werden keine Sessions geschrieben; sie stehen bereits in der Historie."""
+        return self.history is not None and self.replay_clock is None
+
+    def process_log_line(self, line, docker_timestamp=None):
+        """Verarbeitet eine einzelne Logzeile: Literal-Vorfilter, Regex der Regel, Handler aus der Tabelle."""
+        result = self.matcher.match(line)
+        if result is not None:
+            name, groups = result
+            self.metrics.events[name] += 1
+            self.handlers[name](groups, self.event_time(line, docker_timestamp))
+
+    def parse_log_time(self, line):
+        """Zeit aus dem Präfix einer Logzeile (Unix-Zeit bzw. Sekunden seit Mitternacht) oder None."""
+        return None
+
+    def event_time(self, line, docker_timestamp=None):
+        """Zeitstempel eines Ereignisses: Docker-Zeitstempel der Zeile, sonst Präfix des Spiels.
+
+        Zeilen ohne Zeitangabe erhalten die fortgeschriebene Zeit der letzten Zeile. Beim
+        Replay rechnet die ReplayClock die Zeit aus dem Log um.
+        """
+        if self.replay_clock is not None:
+            return self.replay_clock.timestamp(self.parse_log_time(line))
+        absolute = None if docker_timestamp is None else docker_time(docker_timestamp)
+        return self.clock.timestamp(self.parse_log_time(line) if absolute is None else None, absolute)
+
+    def begin_replay(self, clock):
+        self.replay_clock = clock
+
+    def finish_replay(self, anchor):
+        """Beendet das Replay: Zeitstempel ausrichten, abgelaufene Spieler und Sessions entfernen, Snapshot schreiben."""
+        shift = self.replay_clock.align_to(anchor)
+        if shift:
+            self.store.shift_timestamps(shift)
+            self.liveness.shift(shift)
+        self.replay_clock = None
+        if self.history is not None:
+            self.history.reconcile(self.store.active_players, self.clock.now())
+        self.expire_inactive_players()
+        self.evict_pending_sessions()
+        self.snapshot_writer.flush()
+
+    def process_log_lines(self, lines, docker_timestamps=None, position=None):
+        """Verarbeitet einen Batch neuer Logzeilen (optional mit ihren Docker-Zeitstempeln).
+
+        Nach dem Batch folgt die Zeitachse der letzten Zeile, auch wenn sie kein Ereignis
+        war; beim Aufholen laufen Timeouts so im Takt des Logs statt der Systemuhr.
+        `position` ist die Leseposition hinter dem Batch, wenn ein Lese-Thread bereits weiter
+        ist (siehe LineQueue); sonst gilt die aktuelle des Followers.
+        """
+        started = time.perf_counter()
+        if docker_timestamps is None:
+            for line in lines:
+                self.process_log_line(line)
+        else:
+            for line, docker_timestamp in zip(lines, docker_timestamps):
+                self.process_log_line(line, docker_timestamp)
+        if lines:
+            self.event_time(lines[-1], docker_timestamps[-1] if docker_timestamps else None)
+        if self.checkpoint is not None:
+            self.position = position if position is not None else self.read_position()
+        self.metrics.observe_batch(len(lines), time.perf_counter() - started)
+        self.run_timers()
+
+    def apply_matches(self, events, line_count, last_log_time, match_seconds, docker_timestamps=None):
+        """Wie process_log_lines, aber mit bereits in einem Worker-Prozess erkannten Ereignissen (siehe MatchPool).
+
+        :param events: Liste von (Zeilennummer, Regelname, Gruppen, Ergebnis von parse_log_time).
+        :param last_log_time: parse_log_time der letzten Zeile des Blocks.
+        :param match_seconds: Rechenzeit des Workers; zählt zur Verarbeitungszeit des Batches.
+        """
+        started = time.perf_counter()
+        handlers, counts, clock = self.handlers, self.metrics.events, self.clock
+        for index, name, groups, log_time in events:
+            counts[name] += 1
+            docker_timestamp = docker_timestamps[index] if docker_timestamps else None
+            absolute = None if docker_timestamp is None else docker_time(docker_timestamp)
+            handlers[name](groups, clock.timestamp(log_time, absolute))
+        absolute = docker_time(docker_timestamps[-1]) if docker_timestamps and docker_timestamps[-1] else None
+        clock.timestamp(last_log_time, absolute)
+        if self.checkpoint is not None:
+            self.position = self.read_position()
+        self.metrics.observe_batch(line_count, match_seconds + time.perf_counter() - started)
+        self.run_timers()
+
+    def expire_inactive_players(self):
+        """Entfernt Spieler, die seit player_timeout_seconds in keiner Logzeile mehr vorkamen."""
+        now = self.clock.now()
+        expired = []
+        for name in self.liveness.pop_expired(now):
+            player = self.store.active_players.get(name)
+            if player is not None and self.remove_player(name, player.get('last_seen', now)):
+                expired.append(name)
+        for name in expired:
+            self.logger.info(f"Spieler '{name}' aufgrund von Timeout entfernt.")
+        if expired:
+            self.mark_players_changed()
+
+    def evict_pending_sessions(self):
+        """Verwirft Verbindungen, die nie einen Login abgeschlossen haben (beim Replay gilt die Logzeit)."""
+        if self.replay_clock is not None:
+            return
+        evicted = self.store.evict_stale(self.clock.now())
+        if evicted:
+            self.logger.debug(f"{evicted} unbenannte Session(s) nach {self.store.pending_ttl:.0f}s verworfen.")
+
+    def run_timers(self):
+        """Führt fällige Timer aus und schreibt ggf. den verzögerten Snapshot."""
+        self.scheduler.run_due()
+        self.snapshot_writer.flush_if_due()
+        if self.history is not None:
+            self.history.flush_if_due()
+
+    def next_timer_timeout(self):
+        """Sekunden bis zum nächsten Timer oder Snapshot (None, wenn nichts ansteht)."""
+        timeouts = [self.scheduler.seconds_until_next(), self.snapshot_writer.seconds_until_flush()]
+        if self.history is not None:
+            timeouts.append(self.history.seconds_until_flush())
+        timeouts = [t for t in timeouts if t is not None]
+        return min(timeouts) if timeouts else None
+
+    def watched_fileno(self):
+        """FD, der bei Änderungen an weiteren Dateien der Instanz lesbar wird (z.B. Admin-Liste), oder None.
+
+        Die Tail-Schleifen beenden ihr Warten, sobald er lesbar ist, und rufen `run_timers()` auf.
+        """
+        return None
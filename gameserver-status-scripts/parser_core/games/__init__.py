@@ -0,0 +1,20 @@
+from parser_core.games.enshrouded import ENSHROUDED
+from parser_core.games.valheim import VALHEIM
+
+# Spielname (wie in der Konfiguration) -> GameDefinition. Ein neues Spiel braucht nur ein
+# Modul mit seiner Definition und einen Eintrag hier; Daemon und Einzel-Parser nutzen es sofort.
+GAME_DEFINITIONS = {}
+
+
+def register_game(definition):
+    """Prüft eine Spieldefinition und nimmt sie auf (ValueError bei Fehlern, schon beim Import)."""
+    definition.validate()
+    GAME_DEFINITIONS[definition.name] = definition
+    return definition
+
+
+for _definition in (ENSHROUDED, VALHEIM):
+    register_game(_definition)
+
+# Spielname -> Parser-Klasse (aus den Definitionen erzeugt, Matcher vorkompiliert)
+GAME_PARSERS = {name: definition.parser_class for name, definition in GAME_DEFINITIONS.items()}
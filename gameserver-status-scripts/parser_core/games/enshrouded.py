@@ -0,0 +1,77 @@
+import functools
+import re
+
+from parser_core.engine import CloseSession, GameDefinition, Grant, Login, Logout, OpenSession, Rule
+
+# --- Regex-Muster ---
+PLAYER_SESSION_START_PATTERN = re.compile(r"Remote player added\. Player handle: (?P<handle>\d+)\(\d+\)")
+PLAYER_NAME_LOGIN_PATTERN = re.compile(r"Player '(?P<name>[^']+)' logged in with Permissions:")
+PERMISSION_PATTERN = re.compile(r"\[[A-Z] \d{2}:\d{2}:\d{2},\d{3}\]\s+- (?P<permission>Can[A-Za-z]+)$")
+PLAYER_LOGOUT_PATTERN = re.compile(r"Remove Player '(?P<name>[^']+)'")
+PEER_DISCONNECT_PATTERN = re.compile(r"(?:Disconnecting|Removed) peer #(?P<handle>\d+)")
+# Präfix '[I 12:34:56,' ohne Millisekunden; es ist für alle Zeilen derselben Logsekunde gleich.
+LOG_TIME_PATTERN = re.compile(r"\[[A-Z] (\d{2}):(\d{2}):(\d{2}),")
+
+# Regeln in Vorrang-Reihenfolge: Muster, Literale für den Vorfilter, Zustandsübergang, Beispielzeilen.
+LOG_RULES = [
+    Rule("session_start", PLAYER_SESSION_START_PATTERN, ("Remote player added",), OpenSession("handle", int),
+         examples=["[I 12:00:01,000] [server] Remote player added. Player handle: 7(1)"]),
+    Rule("name_login", PLAYER_NAME_LOGIN_PATTERN, ("logged in with Permissions",), Login("name", 30, await_grants=True),
+         examples=["[I 12:00:01,000] [server] Player 'Alice' logged in with Permissions:"]),
+    Rule("permission", PERMISSION_PATTERN, ("- Can",), Grant("permission", "permissions"),
+         examples=["[I 12:00:01,000]  - CanEditBase"]),
+    Rule("logout", PLAYER_LOGOUT_PATTERN, ("Remove Player",), Logout("name"),
+         examples=["[I 12:30:00,000] [server] Remove Player 'Alice'"]),
+    Rule("peer_disconnect", PEER_DISCONNECT_PATTERN, ("peer #",), CloseSession("handle", int),
+         examples=["[I 12:30:00,000] [network] Removed peer #7", "[I 12:30:00,000] Disconnecting peer #7"]),
+]
+
+
+# Standardregeln (Rolle, Berechtigungen): die erste Regel mit einer Berechtigung des Spielers gewinnt.
+# Mit `role_rules_path` ersetzt eine Datei im Format `Rolle = Berechtigung, ...` diese Liste.
+ROLE_RULES = [
+    ("Admin", ("CanKickBan",)),
+    ("Community", ("CanAccessInventories", "CanEditBase", "CanExtendBase")),
+    ("Guest", ()),
+]
+
+
+def assign_role(player, sources):
+    """Weist eine Rolle basierend auf den Berechtigungen zu."""
+    return sources.rules.role(player["permissions"])
+
+
+@functools.lru_cache(maxsize=256)
+def _seconds_of_day(prefix):
+    """Sekunden seit Mitternacht für '[I 12:34:56,' oder None; Regex und int() laufen nur einmal pro Logsekunde."""
+    match = LOG_TIME_PATTERN.fullmatch(prefix)
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def parse_log_time(line):
+    """Sekunden seit Mitternacht aus dem Präfix '[I 12:34:56,789]'."""
+    seconds = _seconds_of_day(line[:12])
+    millis = line[12:15]
+    if seconds is None or line[15:16] != "]" or not millis.isdecimal():
+        return None
+    return seconds + int(millis) / 1000
+
+
+# Login/Logout-Erkennung für Enshrouded (Sessions über Player-Handles, Rollen über Berechtigungen).
+ENSHROUDED = GameDefinition(
+    name="enshrouded",
+    display_name="Enshrouded",
+    rules=LOG_RULES,
+    key_field="id",
+    key_label="Handle",
+    player_fields=("id", "name", "permissions", "role", "last_seen"),
+    role=assign_role,
+    defaults={"permissions": list},
+    parse_log_time=parse_log_time,
+    log_time_of_day=True,
+    role_rules=ROLE_RULES,
+    role_rules_setting="role_rules_path",
+)
@@ -0,0 +1,80 @@
+import functools
+import re
+import time
+
+from parser_core.engine import CloseSession, GameDefinition, Login, OpenSession, Rule
+
+# --- Regex-Muster (vereinfacht, um auf nativen & Docker-Logs zu funktionieren) ---
+# Wir suchen nur noch nach den einzigartigen Teilen der Nachricht, unabhängig vom Präfix.
+PLAYER_CONNECT_PATTERN = re.compile(r"Got connection SteamID (?P<steamid>\d{17})")
+PLAYER_NAME_LOGIN_PATTERN = re.compile(r"Got character ZDOID from (?P<playername>[^:]+)\s+:")
+PLAYER_DISCONNECT_PATTERN = re.compile(r"Closing socket (?P<steamid>\d{17})")
+LOG_TIME_PATTERN = re.compile(r"(\d{2})/(\d{2})/(\d{4}) (\d{2}):(\d{2}):(\d{2})")
+
+# Regeln in Vorrang-Reihenfolge: Muster, Literale für den Vorfilter, Zustandsübergang, Beispielzeilen.
+LOG_RULES = [
+    Rule("connect", PLAYER_CONNECT_PATTERN, ("Got connection",), OpenSession("steamid"),
+         examples=["02/14/2024 12:00:01: Got connection SteamID 76561198000000001"]),
+    # Ein erneuter Spawn (z.B. nach dem Tod) eines angemeldeten Spielers aktualisiert nur last_seen.
+    Rule("name_login", PLAYER_NAME_LOGIN_PATTERN, ("Got character ZDOID",),
+         Login("playername", 60, strip=True, touch_if_active=True),
+         examples=["02/14/2024 12:00:05: Got character ZDOID from Viking1 : -123456:1"]),
+    Rule("disconnect", PLAYER_DISCONNECT_PATTERN, ("Closing socket",), CloseSession("steamid"),
+         examples=["02/14/2024 12:30:00: Closing socket 76561198000000001"]),
+]
+
+
+@functools.lru_cache(maxsize=64)
+def _hour_start(year, month, day, hour):
+    """Unix-Zeit des Stundenbeginns (lokale Zeit); mktime läuft so nur einmal pro Logstunde."""
+    return time.mktime((int(year), int(month), int(day), int(hour), 0, 0, 0, 0, -1))
+
+
+@functools.lru_cache(maxsize=256)
+def _log_second(prefix):
+    """Unix-Zeit für '02/14/2024 12:34:56' oder None; Regex und int() laufen nur einmal pro Logsekunde."""
+    match = LOG_TIME_PATTERN.fullmatch(prefix)
+    if match is None:
+        return None
+    month, day, year, hour, minutes, seconds = match.groups()
+    return _hour_start(year, month, day, hour) + int(minutes) * 60 + int(seconds)
+
+
+def parse_log_time(line):
+    """Unix-Zeit aus dem Präfix '02/14/2024 12:34:56:' (lokale Zeit des Servers)."""
+    return _log_second(line[:19])
+
+
+def assign_role(player, sources):
+    """Weist einem Spieler basierend auf Admin-, Bann- und Whitelist eine Rolle zu.
+
+    Bann- und Whitelist werden nur mit `server_list_roles = true` geladen; sonst sind sie leer
+    und es gibt wie bisher nur 'Admin' und 'Community'.
+    """
+    steam_id = player["steam_id"]
+    if steam_id in sources["admins"]:
+        return "Admin"
+    if steam_id in sources["banned"]:
+        return "Banned"
+    # Eine nicht leere permittedlist.txt ist eine Whitelist; wer (nicht mehr) darauf steht, ist Gast.
+    permitted = sources["permitted"]
+    if permitted and steam_id not in permitted:
+        return "Guest"
+    return "Community"
+
+
+# Login/Logout-Erkennung für Valheim (Sessions über SteamIDs, Rollen über adminlist.txt, bannedlist.txt und permittedlist.txt).
+VALHEIM = GameDefinition(
+    name="valheim",
+    display_name="Valheim",
+    rules=LOG_RULES,
+    key_field="steam_id",
+    key_label="SteamID",
+    player_fields=("name", "steam_id", "role", "last_seen"),
+    role=assign_role,
+    parse_log_time=parse_log_time,
+    # 'Banned' und 'Guest' sind zusätzliche Rollenwerte in der API; daher nur mit server_list_roles = true.
+    list_settings={"admins": "admin_list_path",
+                   "banned": ("banned_list_path", "server_list_roles"),
+                   "permitted": ("permitted_list_path", "server_list_roles")},
+)
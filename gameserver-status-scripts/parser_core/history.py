@@ -0,0 +1,254 @@
+import logging
+import sqlite3
+import time
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# Längste Lücke (z.B. Parser gestoppt), die beim Fortschreiben der Stunden-Rollups aufgefüllt wird.
+MAX_HOUR_FILL = 24 * 31
+
+# Das Schema liest auch flask_api/modules/session_history.py (nur lesend).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    login REAL NOT NULL,
+    logout REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_player ON sessions (player, login);
+CREATE INDEX IF NOT EXISTS sessions_open ON sessions (login) WHERE logout IS NULL;
+CREATE TABLE IF NOT EXISTS player_daily (
+    day INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    playtime REAL NOT NULL,
+    last_logout REAL NOT NULL,
+    PRIMARY KEY (day, player)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_totals (
+    player TEXT PRIMARY KEY,
+    sessions INTEGER NOT NULL,
+    playtime REAL NOT NULL,
+    first_login REAL NOT NULL,
+    last_logout REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hourly (
+    hour INTEGER PRIMARY KEY,
+    peak INTEGER NOT NULL,
+    logins INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT_TOTALS = """
+INSERT INTO player_totals (player, sessions, playtime, first_login, last_logout) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player) DO UPDATE SET
+    sessions = sessions + excluded.sessions,
+    playtime = playtime + excluded.playtime,
+    first_login = min(first_login, excluded.first_login),
+    last_logout = max(last_logout, excluded.last_logout)
+"""
+
+UPSERT_DAILY = """
+INSERT INTO player_daily (day, player, sessions, playtime, last_logout) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (day, player) DO UPDATE SET
+    sessions = sessions + excluded.sessions,
+    playtime = playtime + excluded.playtime,
+    last_logout = max(last_logout, excluded.last_logout)
+"""
+
+UPSERT_HOURLY = """
+INSERT INTO hourly (hour, peak, logins) VALUES (?, ?, ?)
+ON CONFLICT (hour) DO UPDATE SET peak = max(peak, excluded.peak), logins = logins + excluded.logins
+"""
+
+
+class SessionHistory:
+    """Schreibt An- und Abmeldungen in eine SQLite-Datenbank (WAL) für die Statistiken der API.
+
+    Ereignisse werden im Speicher gesammelt und spätestens `flush_interval` Sekunden später
+    (oder ab `batch_size` Ereignissen) in einer Transaktion geschrieben. Pro Session entstehen
+    ein INSERT beim Login und ein UPDATE beim Logout; dazu werden Rollups fortgeschrieben:
+    Summen pro Spieler gesamt (`player_totals`) und pro Tag (`player_daily`, UTC-Tag des
+    Logins) sowie Spitzenwert gleichzeitiger Spieler und Logins pro Stunde (`hourly`).
+    Abfragen über lange Zeiträume lesen so nur wenige Zeilen.
+
+    Beim Beenden bleiben offene Sessions offen. Der nächste Start übernimmt sie, wenn der
+    Spieler (nach einem Replay) noch online ist, und schließt sie sonst zum Zeitpunkt des
+    letzten Schreibvorgangs (`heartbeat`).
+    """
+
+    def __init__(self, path, flush_interval=5.0, batch_size=500, clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.clock = clock
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Im WAL-Modus reicht NORMAL: nach einem Absturz fehlen höchstens die letzten Transaktionen.
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.next_id = (self.conn.execute("SELECT max(id) FROM sessions").fetchone()[0] or 0) + 1
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'heartbeat'").fetchone()
+        self.previous_heartbeat = row[0] if row else None
+        self.orphans = {player: (session_id, login) for session_id, player, login in
+                        self.conn.execute("SELECT id, player, login FROM sessions WHERE logout IS NULL")}
+        self.reconciled = False
+        self.online = {}  # Spieler -> (Session-ID, Login)
+        self.inserts = []
+        self.updates = []
+        self.totals = {}  # Spieler -> [Sessions, Spielzeit, erster Login, letzter Logout]
+        self.daily = {}   # (Tag, Spieler) -> [Sessions, Spielzeit, letzter Logout]
+        self.hours = {}   # Stundenbeginn -> [Spitzenwert, Logins]
+        self.current_hour = None
+        self.heartbeat = None
+        self.dirty = False
+        self.last_flush = clock()
+        self.sessions_written = 0
+        self.transactions = 0
+
+    def reconcile(self, active_players, now):
+        """Übernimmt offene Sessions des letzten Laufs für noch aktive Spieler und schließt die übrigen."""
+        self.reconciled = True
+        closed_at = self.previous_heartbeat
+        for player, (session_id, login) in self.orphans.items():
+            if player in active_players:
+                self.online[player] = (session_id, login)
+            else:
+                self._close(session_id, player, login, max(login, closed_at or login))
+        if self.orphans:
+            logger.info(f"Historie: {len(self.online)} offene Session(s) übernommen, "
+                        f"{len(self.orphans) - len(self.online)} geschlossen.")
+        self.orphans = {}
+        for player in active_players:
+            if player not in self.online:
+                self.login(player, now)
+        self._advance(now)
+
+    def login(self, player, timestamp):
+        if not self.reconciled:
+            self.reconcile((), timestamp)
+        if player in self.online:
+            return
+        session_id = self.next_id
+        self.next_id += 1
+        self.online[player] = (session_id, timestamp)
+        self.inserts.append((session_id, player, timestamp))
+        bucket = self._advance(timestamp)
+        bucket[0] = max(bucket[0], len(self.online))
+        bucket[1] += 1
+        self.dirty = True
+
+    def logout(self, player, timestamp):
+        if not self.reconciled:
+            self.reconcile((), timestamp)
+        entry = self.online.pop(player, None)
+        if entry is None:
+            return
+        session_id, login = entry
+        self._advance(timestamp)
+        self._close(session_id, player, login, max(timestamp, login))
+
+    def tick(self, now):
+        """Periodisch aufrufen: führt die Stunden-Rollups fort und hält den Heartbeat aktuell."""
+        if not self.reconciled:
+            self.reconcile((), now)
+        self._advance(now)
+        if self.online:
+            self.heartbeat = now
+            self.dirty = True
+
+    def _close(self, session_id, player, login, logout):
+        self.updates.append((logout, session_id))
+        key = (int(login // SECONDS_PER_DAY) * SECONDS_PER_DAY, player)
+        daily = self.daily.get(key)
+        if daily is None:
+            self.daily[key] = [1, logout - login, logout]
+        else:
+            daily[0] += 1
+            daily[1] += logout - login
+            daily[2] = max(daily[2], logout)
+        totals = self.totals.get(player)
+        if totals is None:
+            self.totals[player] = [1, logout - login, login, logout]
+        else:
+            totals[0] += 1
+            totals[1] += logout - login
+            totals[2] = min(totals[2], login)
+            totals[3] = max(totals[3], logout)
+        self.dirty = True
+
+    def _bucket(self, hour):
+        bucket = self.hours.get(hour)
+        if bucket is None:
+            bucket = self.hours[hour] = [0, 0]
+        return bucket
+
+    def _advance(self, timestamp):
+        """Legt beim Stundenwechsel Buckets mit der Zahl der weiterhin angemeldeten Spieler an."""
+        hour = int(timestamp // SECONDS_PER_HOUR) * SECONDS_PER_HOUR
+        if self.current_hour is None or hour > self.current_hour:
+            start = hour if self.current_hour is None else max(self.current_hour + SECONDS_PER_HOUR,
+                                                               hour - MAX_HOUR_FILL * SECONDS_PER_HOUR)
+            if self.online:
+                for filled in range(start, hour + 1, SECONDS_PER_HOUR):
+                    bucket = self._bucket(filled)
+                    bucket[0] = max(bucket[0], len(self.online))
+                self.dirty = True
+            self.current_hour = hour
+        return self._bucket(hour)
+
+    def seconds_until_flush(self):
+        if not self.dirty:
+            return None
+        return max(0.0, self.last_flush + self.flush_interval - self.clock())
+
+    def flush_if_due(self):
+        if self.dirty and (self.clock() - self.last_flush >= self.flush_interval
+                           or len(self.inserts) + len(self.updates) >= self.batch_size):
+            self.flush()
+
+    def flush(self):
+        """Schreibt alle gesammelten Ereignisse und Rollups in einer Transaktion."""
+        self.last_flush = self.clock()
+        if not self.dirty:
+            return True
+        heartbeat = max([self.heartbeat or 0] + [row[2] for row in self.inserts] + [row[0] for row in self.updates])
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany("INSERT INTO sessions (id, player, login) VALUES (?, ?, ?)", self.inserts)
+                self.conn.executemany("UPDATE sessions SET logout = ? WHERE id = ?", self.updates)
+                self.conn.executemany(UPSERT_TOTALS, [(player, *totals) for player, totals in self.totals.items()])
+                self.conn.executemany(UPSERT_DAILY, [(*key, *daily) for key, daily in self.daily.items()])
+                self.conn.executemany(UPSERT_HOURLY, [(hour, *bucket) for hour, bucket in self.hours.items()])
+                if heartbeat:
+                    self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('heartbeat', ?)", (heartbeat,))
+        except sqlite3.Error as e:
+            # Gesammelte Ereignisse bleiben erhalten und werden beim nächsten Flush erneut versucht.
+            logger.error(f"Historie konnte nicht geschrieben werden: {e}")
+            return False
+        self.sessions_written += len(self.inserts)
+        self.transactions += 1
+        self.inserts = []
+        self.updates = []
+        self.totals = {}
+        self.daily = {}
+        self.hours = {}
+        self.heartbeat = None
+        self.dirty = False
+        return True
+
+    def close(self):
+        """Schreibt ausstehende Ereignisse; offene Sessions bleiben für den nächsten Start offen."""
+        if self.reconciled:
+            self.heartbeat = time.time()
+            self.dirty = True
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,207 @@
+import collections
+import logging
+import os
+import re
+import select
+import threading
+import time
+
+from parser_core.metrics import Histogram
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+QUEUE_POLICIES = ("drop", "block")
+DEFAULT_HIGH_WATERMARK_LINES = 50000
+DEFAULT_LOW_WATERMARK_LINES = 10000
+DEFAULT_BATCH_LINES = 10000
+# Mit 'drop' bleiben unter Druck nur Zeilen mit einem Literal übrig; erst bei diesem Vielfachen
+# des Hochwassers pausiert auch dann das Lesen (Zeilen mit möglichen Ereignissen gehen nie verloren).
+DROP_LIMIT_FACTOR = 4
+# Wartezeit eines Batches in der Warteschlange (Sekunden).
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueuedBatch:
+    """Entnommene Zeilen samt Docker-Zeitstempeln (oder None) und Leseposition dahinter (oder None)."""
+
+    __slots__ = ("lines", "docker_timestamps", "position")
+
+    def __init__(self, lines, docker_timestamps, position):
+        self.lines = lines
+        self.docker_timestamps = docker_timestamps
+        self.position = position
+
+
+class LineQueue:
+    """Begrenzte Warteschlange zwischen Lese-Thread und Verarbeitung einer Instanz.
+
+    Der Lese-Thread (Tail bzw. Docker-Stream) legt jeden gelesenen Batch mit `put()` ab und
+    liest sofort weiter; ein langsamer Snapshot staut so nicht mehr die Pipe von
+    `docker logs`. Die Verarbeitung entnimmt mit `get_batch()` alles Angesammelte bis
+    `batch_lines` Zeilen auf einmal und wartet mit `wait()` per select, sodass auch weitere
+    FDs (siehe GameParser.watched_fileno) und Timer sie wecken.
+
+    Erreicht die Warteschlange `high_watermark` Zeilen, greift die Policy, bis sie wieder
+    auf `low_watermark` gesunken ist: 'block' pausiert das Lesen, 'drop' verwirft die Zeilen,
+    die der Literal-Vorfilter des LineMatcher ohnehin verwerfen würde (die letzte Zeile eines
+    Batches bleibt für die Zeitachse erhalten). Der Spielerzustand ist danach derselbe; nur
+    `gameserver_parser_lines_total` zählt die verworfenen Zeilen nicht mit. Die Wartezeit
+    eines Ereignisses bleibt damit durch das Hochwasser geteilt durch den Durchsatz begrenzt.
+
+    :param high_watermark: Zeilen in der Warteschlange, ab denen die Policy greift.
+    :param low_watermark: Zeilen, bei denen der Druck wieder endet.
+    :param policy: 'drop' oder 'block' (ohne Literale, z.B. ohne LineMatcher, immer 'block').
+    :param literals: Literale des Vorfilters für 'drop'.
+    :param batch_lines: Höchstens so viele Zeilen fasst `get_batch()` zusammen (ein größerer Batch bleibt ganz).
+    """
+
+    def __init__(self, high_watermark=DEFAULT_HIGH_WATERMARK_LINES, low_watermark=DEFAULT_LOW_WATERMARK_LINES,
+                 policy="drop", literals=(), batch_lines=DEFAULT_BATCH_LINES, log=None):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"queue_policy muss {' oder '.join(QUEUE_POLICIES)} sein, nicht '{policy}'.")
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError(f"queue_low_watermark_lines ({low_watermark}) muss kleiner als "
+                             f"queue_high_watermark_lines ({high_watermark}) sein.")
+        if batch_lines <= 0:
+            raise ValueError("queue_batch_lines muss größer als 0 sein.")
+        self.logger = log or logger
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.batch_lines = batch_lines
+        self.prefilter = None
+        if policy == "drop" and literals:
+            self.prefilter = re.compile("|".join(re.escape(literal) for literal in literals))
+        self.policy = policy if self.prefilter is not None else "block"
+        self.limit = high_watermark * DROP_LIMIT_FACTOR if self.prefilter is not None else high_watermark
+        self.items = collections.deque()  # (Zeilen, Docker-Zeitstempel, Position, eingereiht um)
+        self.condition = threading.Condition()
+        self.wake_read, self.wake_write = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self.closed = False
+        self.depth = 0
+        self.pressure = False
+        # Metriken
+        self.max_depth = 0
+        self.lines_dropped = 0
+        self.stall_seconds = 0.0
+        self.pressure_episodes = 0
+        self.wait_seconds = Histogram(WAIT_BUCKETS)
+        self._episode_dropped = 0
+        self._episode_stalled = 0.0
+
+    def put(self, lines, docker_timestamps=None, position=None):
+        """Reiht einen gelesenen Batch ein (Lese-Thread); blockiert nur unter Druck bzw. am Limit."""
+        if not lines:
+            return
+        if self.pressure and self.prefilter is not None:
+            lines, docker_timestamps = self._strip_noise(lines, docker_timestamps)
+        with self.condition:
+            if self.depth and self._must_wait(len(lines)):
+                started = time.monotonic()
+                while self.depth and not self.closed and self._must_wait(len(lines)):
+                    self.condition.wait()
+                stalled = time.monotonic() - started
+                self.stall_seconds += stalled
+                self._episode_stalled += stalled
+            was_empty = not self.items
+            self.items.append((lines, docker_timestamps, position, time.monotonic()))
+            self.depth += len(lines)
+            self.max_depth = max(self.max_depth, self.depth)
+            if not self.pressure and self.depth >= self.high_watermark:
+                self.pressure = True
+                self.pressure_episodes += 1
+                action = "Zeilen ohne mögliches Ereignis werden verworfen" if self.policy == "drop" else "Lesen pausiert"
+                self.logger.warning(f"Warteschlange hat {self.depth} Zeilen (Hochwasser {self.high_watermark}): "
+                                    f"Verarbeitung kommt nicht nach, {action}.")
+        if was_empty:
+            self._wake()
+
+    def _must_wait(self, count):
+        if self.policy == "block":
+            return self.pressure
+        return self.depth + count > self.limit
+
+    def _strip_noise(self, lines, docker_timestamps):
+        """Behält nur Zeilen mit einem Literal und die letzte Zeile (Zeitachse)."""
+        search = self.prefilter.search
+        last = len(lines) - 1
+        keep = [index for index, line in enumerate(lines) if index == last or search(line)]
+        dropped = len(lines) - len(keep)
+        self.lines_dropped += dropped
+        self._episode_dropped += dropped
+        if docker_timestamps is not None:
+            docker_timestamps = [docker_timestamps[index] for index in keep]
+        return [lines[index] for index in keep], docker_timestamps
+
+    def get_batch(self):
+        """Entnimmt die ältesten Batches (zusammen bis `batch_lines` Zeilen) als QueuedBatch oder None."""
+        with self.condition:
+            if not self.items:
+                return None
+            taken = [self.items.popleft()]
+            count = len(taken[0][0])
+            while self.items and count + len(self.items[0][0]) <= self.batch_lines:
+                taken.append(self.items.popleft())
+                count += len(taken[-1][0])
+            self.depth -= count
+            if self.pressure and self.depth <= self.low_watermark:
+                self.pressure = False
+                self.logger.info(f"Warteschlange wieder unter {self.low_watermark} Zeilen: {self._episode_dropped} "
+                                 f"Zeile(n) verworfen, Lesen {self._episode_stalled:.2f}s pausiert.")
+                self._episode_dropped = 0
+                self._episode_stalled = 0.0
+            self.condition.notify_all()
+        self.wait_seconds.observe(time.monotonic() - taken[0][3])
+        if len(taken) == 1:
+            lines, docker_timestamps, position, _ = taken[0]
+            return QueuedBatch(lines, docker_timestamps, position)
+        lines = [line for item in taken for line in item[0]]
+        docker_timestamps = None
+        if taken[0][1] is not None:
+            docker_timestamps = [timestamp for item in taken for timestamp in item[1]]
+        return QueuedBatch(lines, docker_timestamps, taken[-1][2])
+
+    def wait(self, timeout, extra_fds=()):
+        """Wartet höchstens `timeout` Sekunden auf neue Zeilen, das Schließen oder einen lesbaren FD aus `extra_fds`."""
+        readable, _, _ = select.select([self.wake_read, *extra_fds], [], [], timeout)
+        if self.wake_read in readable:
+            try:
+                while os.read(self.wake_read, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def _wake(self):
+        try:
+            os.write(self.wake_write, b"\0")
+        except BlockingIOError:
+            # Pipe voll: die Verarbeitung ist ohnehin schon geweckt.
+            pass
+
+    def close(self):
+        """Vom Lese-Thread an seinem Ende: die Verarbeitung leert die Warteschlange und endet dann."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self._wake()
+
+    def release(self):
+        """Schließt die Wake-Pipe (nach dem Ende beider Threads)."""
+        for fd in (self.wake_read, self.wake_write):
+            os.close(fd)
+        self.wake_read = self.wake_write = -1
+
+
+def create_line_queue(parser):
+    """LineQueue aus den Einstellungen der Instanz oder None (queue_high_watermark_lines = 0).
+
+    Ungültige Werte lösen ValueError aus (Konfigurationsfehler beim Start).
+    """
+    settings = parser.settings
+    high_watermark = int(settings.get('queue_high_watermark_lines', DEFAULT_HIGH_WATERMARK_LINES))
+    if high_watermark <= 0:
+        return None
+    low_watermark = int(settings.get('queue_low_watermark_lines', min(DEFAULT_LOW_WATERMARK_LINES, high_watermark // 5)))
+    literals = parser.matcher.literals if parser.matcher is not None else ()
+    return LineQueue(high_watermark, low_watermark, settings.get('queue_policy', 'drop').strip().lower(), literals,
+                     int(settings.get('queue_batch_lines', DEFAULT_BATCH_LINES)), log=parser.logger)
@@ -0,0 +1,26 @@
+class LineMatcher:
+    """Erkennt, welches Ereignis eine Logzeile beschreibt, und liefert dessen benannte Gruppen.
+
+    Jede Regel besteht aus einem Namen, einem Regex-Muster mit benannten Gruppen und
+    Literalen, von denen mindestens eines in einer passenden Zeile vorkommen muss. Die
+    weit überwiegenden Zeilen ohne Ereignis werden allein über diesen Vorfilter (`in`)
+    verworfen. Enthält eine Zeile ein Literal, läuft nur die Regex der zugehörigen Regel;
+    passt sie nicht, werden die weiteren Literale geprüft. Die Reihenfolge der Regeln
+    bestimmt damit wie bisher den Vorrang.
+
+    :param rules: Liste von (name, pattern, literals); pattern als kompilierte Regex.
+    """
+
+    def __init__(self, rules):
+        self.names = [name for name, _, _ in rules]
+        self.entries = [(literal, name, pattern) for name, pattern, literals in rules for literal in literals]
+        self.literals = tuple(dict.fromkeys(literal for literal, _, _ in self.entries))
+
+    def match(self, line):
+        """Gibt (Regelname, {Gruppe: Wert}) oder None zurück."""
+        for literal, name, pattern in self.entries:
+            if literal in line:
+                match = pattern.search(line)
+                if match is not None:
+                    return name, match.groupdict()
+        return None
@@ -0,0 +1,228 @@
+import bisect
+import logging
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from parser_core.docker_source import _timestamp_to_unix
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+# Obergrenzen (Sekunden) der Histogramm-Buckets für Batch- und Schreibzeiten.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Histogramm im Prometheus-Format. `observe` kostet ein bisect und drei Additionen."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def buckets(self):
+        """Kumulierte (le, Anzahl)-Paare inklusive '+Inf'."""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class ParserMetrics:
+    """Zähler einer Parser-Instanz.
+
+    Im Hot-Path wird nur pro Batch gemessen (Zeilen, Dauer) und pro erkanntem Ereignis ein
+    Dict-Eintrag erhöht; die Zeilen ohne Ereignis kosten damit nichts zusätzlich. Alles
+    Weitere (Tail-Lag, aktive Spieler, Schreibvorgänge) wird erst beim Abruf gelesen.
+    """
+
+    def __init__(self, rule_names):
+        self.lines = 0
+        self.batches = 0
+        self.processing_seconds = 0.0
+        self.batch_seconds = Histogram()
+        self.events = dict.fromkeys(rule_names, 0)
+
+    def observe_batch(self, lines, seconds):
+        self.lines += lines
+        self.batches += 1
+        self.processing_seconds += seconds
+        self.batch_seconds.observe(seconds)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsText:
+    """Sammelt Samples nach Metrik-Namen und gibt sie im Prometheus-Textformat aus."""
+
+    def __init__(self):
+        self.families = {}
+
+    def add(self, name, kind, help_text, labels, value):
+        family = self.families.setdefault(name, (kind, help_text, []))
+        family[2].append(f"{name}{_labels(labels)} {value}")
+
+    def add_histogram(self, name, help_text, labels, histogram):
+        family = self.families.setdefault(name, ("histogram", help_text, []))
+        for bound, count in histogram.buckets():
+            family[2].append(f"{name}_bucket{_labels(dict(labels, le=bound))} {count}")
+        family[2].append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        family[2].append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def tail_lag_bytes(follower):
+    """Bytes zwischen Leseposition und Dateiende (0, solange keine Datei offen ist)."""
+    if follower is None or follower.inode is None:
+        return 0
+    try:
+        size = os.stat(follower.filepath).st_size
+    except OSError:
+        return 0
+    return max(0, size - follower.offset)
+
+
+def render_parser_metrics(parsers):
+    """Prometheus-Text für alle Parser eines Prozesses."""
+    text = MetricsText()
+    for parser in parsers:
+        labels = {"instance": parser.instance_name or parser.game_name.lower(), "game": parser.game_name.lower()}
+        metrics = parser.metrics
+        text.add("gameserver_parser_lines_total", "counter", "Verarbeitete Logzeilen.", labels, metrics.lines)
+        text.add("gameserver_parser_batches_total", "counter", "Verarbeitete Zeilen-Batches.", labels, metrics.batches)
+        for rule, count in list(metrics.events.items()):
+            text.add("gameserver_parser_events_total", "counter", "Erkannte Ereignisse pro Regel.",
+                     dict(labels, rule=rule), count)
+        text.add("gameserver_parser_processing_seconds_total", "counter",
+                 "Zeit in der Zeilenverarbeitung (process_log_lines).", labels, metrics.processing_seconds)
+        text.add_histogram("gameserver_parser_batch_seconds", "Verarbeitungszeit pro Zeilen-Batch.", labels,
+                           metrics.batch_seconds)
+        text.add("gameserver_parser_active_players", "gauge", "Aktuell aktive Spieler.", labels,
+                 len(parser.store.active_players))
+        text.add("gameserver_parser_pending_sessions", "gauge", "Sessions, die noch auf einen Spielernamen warten.",
+                 labels, len(parser.store.pending))
+        text.add("gameserver_parser_sessions", "gauge", "Offene Sessions (benannt und unbenannt).", labels,
+                 len(parser.store.sessions))
+        for reason, count in (("ttl", parser.store.pending_expired), ("capacity", parser.store.pending_evicted)):
+            text.add("gameserver_parser_pending_sessions_evicted_total", "counter",
+                     "Verworfene unbenannte Sessions (abgelaufen bzw. über max_pending_sessions verdrängt).",
+                     dict(labels, reason=reason), count)
+
+        writer = parser.snapshot_writer
+        for result, count in (("written", writer.writes_performed), ("unchanged", writer.writes_unchanged),
+                              ("coalesced", writer.writes_coalesced)):
+            text.add("gameserver_parser_snapshot_writes_total", "counter",
+                     "Snapshot-Schreibvorgänge (geschrieben, unverändert übersprungen, zusammengefasst).",
+                     dict(labels, result=result), count)
+        text.add_histogram("gameserver_parser_snapshot_write_seconds", "Dauer eines Snapshot-Schreibvorgangs.",
+                           labels, writer.write_seconds)
+
+        text.add("gameserver_parser_log_time_seconds", "gauge",
+                 "Zeit der zuletzt verarbeiteten Logzeile (Differenz zur Uhrzeit: Rückstand beim Aufholen).", labels,
+                 parser.clock.last)
+        if parser.log_follower is not None:
+            text.add("gameserver_parser_tail_lag_bytes", "gauge", "Noch nicht gelesene Bytes der Logdatei.", labels,
+                     tail_lag_bytes(parser.log_follower))
+        source = parser.docker_source
+        if source is not None:
+            text.add("gameserver_parser_docker_restarts_total", "counter", "Neustarts des Docker-Logstreams.", labels,
+                     source.restarts)
+            text.add("gameserver_parser_docker_lines_skipped_total", "counter",
+                     "Nach einem Neustart übersprungene, bereits verarbeitete Zeilen.", labels, source.lines_skipped)
+            if source.last_timestamp:
+                text.add("gameserver_parser_docker_last_line_timestamp_seconds", "gauge",
+                         "Docker-Zeitstempel der zuletzt verarbeiteten Zeile.", labels,
+                         _timestamp_to_unix(source.last_timestamp))
+        line_queue = parser.line_queue
+        if line_queue is not None:
+            text.add("gameserver_parser_queue_depth_lines", "gauge",
+                     "Gelesene, noch nicht verarbeitete Zeilen in der Warteschlange.", labels, line_queue.depth)
+            text.add("gameserver_parser_queue_max_depth_lines", "gauge",
+                     "Höchster Füllstand der Warteschlange seit dem Start.", labels, line_queue.max_depth)
+            text.add("gameserver_parser_queue_dropped_lines_total", "counter",
+                     "Unter Druck verworfene Zeilen ohne mögliches Ereignis (queue_policy = drop).", labels,
+                     line_queue.lines_dropped)
+            text.add("gameserver_parser_queue_stall_seconds_total", "counter",
+                     "Zeit, in der das Lesen wegen einer vollen Warteschlange pausiert war.", labels,
+                     line_queue.stall_seconds)
+            text.add("gameserver_parser_queue_pressure_total", "counter",
+                     "Wie oft die Warteschlange das Hochwasser erreicht hat.", labels, line_queue.pressure_episodes)
+            text.add_histogram("gameserver_parser_queue_wait_seconds",
+                               "Wartezeit eines Batches zwischen Lesen und Verarbeitung.", labels, line_queue.wait_seconds)
+        if parser.history is not None:
+            text.add("gameserver_parser_history_transactions_total", "counter",
+                     "Schreibtransaktionen der Session-Historie.", labels, parser.history.transactions)
+    return text.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    parsers = ()
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_parser_metrics(self.parsers).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keine Zugriffslogs für Scrapes.
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start_metrics_server(address, parsers):
+    """Startet /metrics in einem Hintergrund-Thread; gibt den Server oder bei Fehlern None zurück.
+
+    :param address: 'host:port' (z.B. '127.0.0.1:9101') oder 'unix:/pfad/zum/socket'.
+    :param parsers: Liste der Parser, deren Zähler ausgegeben werden.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"parsers": parsers})
+    try:
+        if address.startswith("unix:"):
+            path = address[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)
+            server = _UnixHTTPServer(path, handler)
+        else:
+            host, _, port = address.rpartition(":")
+            server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+            server.daemon_threads = True
+    except (OSError, ValueError) as e:
+        logger.error(f"Metrik-Endpunkt '{address}' konnte nicht gestartet werden: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Metriken unter {address} (/metrics) verfügbar.")
+    return server
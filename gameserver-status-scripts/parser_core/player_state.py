@@ -0,0 +1,175 @@
+import logging
+from collections import OrderedDict
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    """Eine Verbindung: Zeitpunkt des Öffnens und der zugeordnete Spielername (None solange unbenannt)."""
+
+    __slots__ = ("opened", "name")
+
+    def __init__(self, opened, name=None):
+        self.opened = opened
+        self.name = name
+
+
+class PlayerStore:
+    """Spielerzustand eines Servers mit expliziten Indizes, alle Übergänge in O(1).
+
+    Eine Session wird über einen spielspezifischen Schlüssel identifiziert (Enshrouded:
+    Player-Handle, Valheim: SteamID). Sessions ohne Namen warten in einer FIFO-Queue
+    (nach Alter sortiert), bis eine Login-Zeile ihnen einen Spielernamen zuordnet.
+
+    Verbindungen, die nie einen Login abschließen (Steam-Abfragen, Portscanner, abgestürzte
+    Clients), bleiben nicht liegen: Unbenannte Sessions verfallen nach `pending_ttl`
+    Sekunden (`evict_stale`, beim Login-Abgleich auch nach dessen Zeitfenster), und es gibt
+    höchstens `max_pending` davon; darüber wird die älteste verdrängt. Beides entfernt auch
+    den Session-Eintrag und wird in `pending_expired` bzw. `pending_evicted` gezählt.
+    """
+
+    def __init__(self, pending_ttl=120.0, max_pending=1000):
+        self.pending_ttl = pending_ttl
+        self.max_pending = max_pending
+        self.sessions = {}           # Session-Schlüssel -> Session
+        self.pending = OrderedDict() # Unbenannte Sessions, älteste zuerst
+        self.awaiting_permissions = None
+        self.active_players = {}     # Spielername -> Daten für die JSON-Ausgabe
+        self.key_to_name = {}
+        self.name_to_key = {}
+        self.pending_expired = 0
+        self.pending_evicted = 0
+
+    def open_session(self, key, timestamp):
+        """Legt eine neue, noch unbenannte Session an. False, wenn sie bereits existiert."""
+        if key in self.sessions:
+            return False
+        self.sessions[key] = Session(timestamp)
+        self.pending[key] = timestamp
+        if len(self.pending) > self.max_pending:
+            self._discard_pending(self.pending.popitem(last=False)[0])
+            self.pending_evicted += 1
+        return True
+
+    def claim_pending(self, timestamp, max_age):
+        """Entnimmt die älteste unbenannte Session, die jünger als `max_age` Sekunden ist.
+
+        Ältere Einträge am Anfang der Queue können nie mehr zugeordnet werden und
+        werden dabei samt Session verworfen.
+        """
+        while self.pending:
+            key, started = self.pending.popitem(last=False)
+            if timestamp - started < max_age:
+                return key
+            self._discard_pending(key)
+            self.pending_expired += 1
+        return None
+
+    def evict_stale(self, now):
+        """Verwirft unbenannte Sessions, die älter als `pending_ttl` Sekunden sind; gibt deren Anzahl zurück."""
+        pending = self.pending
+        expired = 0
+        while pending:
+            key, started = pending.popitem(last=False)
+            if now - started < self.pending_ttl:
+                # Jüngster verbliebener Eintrag: zurück an den Anfang der Queue.
+                pending[key] = started
+                pending.move_to_end(key, last=False)
+                break
+            self._discard_pending(key)
+            expired += 1
+        self.pending_expired += expired
+        return expired
+
+    def _discard_pending(self, key):
+        """Entfernt die Session einer verworfenen, noch unbenannten Verbindung."""
+        session = self.sessions.get(key)
+        if session is not None and session.name is None:
+            del self.sessions[key]
+
+    def activate(self, key, name, player_data):
+        """Ordnet der Session einen Spielernamen zu und nimmt den Spieler in die aktiven Spieler auf."""
+        self.pending.pop(key, None)
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = Session(player_data.get("last_seen"))
+        session.name = name
+        previous_key = self.name_to_key.get(name)
+        if previous_key is not None and previous_key != key:
+            # Reconnect unter gleichem Namen: die alte Session verweist nicht mehr auf den Spieler.
+            self.key_to_name.pop(previous_key, None)
+        self.key_to_name[key] = name
+        self.name_to_key[name] = key
+        self.active_players[name] = player_data
+
+    def set_awaiting_permissions(self, key):
+        self.awaiting_permissions = key
+
+    def awaiting_player(self):
+        """Daten des Spielers, dessen Berechtigungszeilen gerade erwartet werden (oder None)."""
+        name = self.key_to_name.get(self.awaiting_permissions)
+        return self.active_players.get(name) if name is not None else None
+
+    def key_for_name(self, name):
+        return self.name_to_key.get(name)
+
+    def name_for_key(self, key):
+        return self.key_to_name.get(key)
+
+    def remove_player(self, name):
+        """Entfernt einen aktiven Spieler samt Session. True, wenn er aktiv war."""
+        key = self.name_to_key.pop(name, None)
+        if key is not None:
+            self._drop_session(key)
+        return self.active_players.pop(name, None) is not None
+
+    def remove_session(self, key):
+        """Entfernt eine Session (z.B. bei Disconnect). Gibt den Namen eines dabei entfernten aktiven Spielers zurück."""
+        name = self.key_to_name.get(key)
+        self._drop_session(key)
+        if name is not None and self.name_to_key.get(name) == key:
+            del self.name_to_key[name]
+            if self.active_players.pop(name, None) is not None:
+                return name
+        return None
+
+    def to_state(self):
+        """Kompletter Zustand als JSON-taugliche Listen (für Checkpoints; Schlüssel behalten ihren Typ)."""
+        return {
+            "sessions": [[key, session.opened, session.name] for key, session in self.sessions.items()],
+            "pending": [[key, started] for key, started in self.pending.items()],
+            "active_players": [[name, player] for name, player in self.active_players.items()],
+            "key_to_name": [[key, name] for key, name in self.key_to_name.items()],
+            "name_to_key": [[name, key] for name, key in self.name_to_key.items()],
+            "awaiting_permissions": self.awaiting_permissions,
+        }
+
+    def restore(self, state):
+        """Übernimmt einen mit `to_state` gesicherten Zustand (ganz oder bei Formatfehlern gar nicht)."""
+        sessions = {key: Session(opened, name) for key, opened, name in state["sessions"]}
+        pending = OrderedDict((key, started) for key, started in state["pending"])
+        active_players = {name: dict(player) for name, player in state["active_players"]}
+        key_to_name = {key: name for key, name in state["key_to_name"]}
+        name_to_key = {name: key for name, key in state["name_to_key"]}
+        self.awaiting_permissions = state["awaiting_permissions"]
+        self.sessions, self.pending, self.active_players = sessions, pending, active_players
+        self.key_to_name, self.name_to_key = key_to_name, name_to_key
+
+    def shift_timestamps(self, delta):
+        """Verschiebt alle gespeicherten Zeitstempel um `delta` Sekunden."""
+        for key in self.pending:
+            self.pending[key] += delta
+        for session in self.sessions.values():
+            if session.opened is not None:
+                session.opened += delta
+        for player in self.active_players.values():
+            if "last_seen" in player:
+                player["last_seen"] += delta
+
+    def _drop_session(self, key):
+        self.sessions.pop(key, None)
+        self.pending.pop(key, None)
+        self.key_to_name.pop(key, None)
+        if self.awaiting_permissions == key:
+            self.awaiting_permissions = None
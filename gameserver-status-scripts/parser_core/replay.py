@@ -0,0 +1,184 @@
+import glob
+import gzip
+import logging
+import math
+import mmap
+import os
+import time
+
+from parser_core.tail import normalize_newlines
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+REPLAY_CHUNK_SIZE = 8 * 1024 * 1024
+SECONDS_PER_DAY = 86400
+# Springt die Uhrzeit um mehr als das zurück, hat ein neuer Tag begonnen.
+DAY_ROLLOVER_TOLERANCE = 3600
+
+
+class ReplayClock:
+    """Liefert beim Replay die Ereigniszeit aus den Logzeilen statt time.time().
+
+    Logs mit vollständigem Datum (Valheim) liefern absolute Zeitstempel. Logs mit reiner
+    Uhrzeit (Enshrouded: '[I 12:34:56,789]') werden ab dem Tag von `start` fortgezählt; ein
+    Rücksprung der Uhrzeit gilt als Tageswechsel. Nach dem Replay verschiebt `align_to`
+    das Ergebnis um ganze Tage, sodass das letzte Ereignis innerhalb der 24 Stunden vor
+    der letzten Änderung der Logdatei liegt.
+    """
+
+    def __init__(self, time_of_day, start):
+        self.time_of_day = time_of_day
+        local = time.localtime(start)
+        self.day_start = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+        self.last_seconds = None
+        self.last = start
+
+    def timestamp(self, value):
+        """Wandelt das Ergebnis von `parse_log_time` in einen Zeitstempel um (None: letzter bekannter)."""
+        if value is None:
+            return self.last
+        if self.time_of_day:
+            if self.last_seconds is not None and value < self.last_seconds - DAY_ROLLOVER_TOLERANCE:
+                self.day_start += SECONDS_PER_DAY
+            self.last_seconds = value
+            value += self.day_start
+        self.last = value
+        return value
+
+    def align_to(self, anchor):
+        """Verschiebung in Sekunden (ganze Tage), damit das letzte Ereignis vor `anchor` liegt."""
+        if not self.time_of_day:
+            return 0
+        return math.floor((anchor - self.last) / SECONDS_PER_DAY) * SECONDS_PER_DAY
+
+
+def find_log_files(log_path):
+    """Rotierte Archive (`log.1`, `log.2.gz`, `log-20240501`, ...) nach Alter sortiert, danach die aktuelle Datei."""
+    archives = set(glob.glob(glob.escape(log_path) + ".*") + glob.glob(glob.escape(log_path) + "-*"))
+    archives.discard(log_path)
+    archives = [path for path in archives if os.path.isfile(path) and not path.endswith(".tmp")]
+    archives.sort(key=lambda path: (os.path.getmtime(path), path))
+    return archives + ([log_path] if os.path.exists(log_path) else [])
+
+
+def _decode(data):
+    """Text eines Blocks vollständiger Zeilen; CRLF wird zu LF, auch am Ende des Blocks."""
+    data = normalize_newlines(data)
+    if data.endswith(b"\r"):
+        data = data[:-1]
+    return data.decode("utf-8", errors="replace")
+
+
+def iter_text_blocks(path, include_partial_line=True, chunk_size=REPLAY_CHUNK_SIZE, start=0):
+    """Liest eine (ggf. gzip-komprimierte) Datei in großen Blöcken vollständiger Zeilen.
+
+    Liefert (Text, Offset nach dem Block). Unkomprimierte Dateien werden per mmap gelesen,
+    auf Wunsch ab dem Byte-Offset `start`. Ohne `include_partial_line` endet das Lesen hinter
+    dem letzten Zeilenumbruch, damit das Live-Tail eine noch unvollständige Zeile später
+    vollständig liest.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            partial = b""
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                data = partial + data
+                newline = data.rfind(b"\n")
+                if newline < 0:
+                    partial = data
+                    continue
+                partial = data[newline + 1:]
+                yield _decode(data[:newline]), None
+            if partial and include_partial_line:
+                yield _decode(partial), None
+        return
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            position = start
+            while position < size:
+                end = min(position + chunk_size, size)
+                newline = mm.rfind(b"\n", position, end)
+                if newline < 0 and end < size:
+                    newline = mm.find(b"\n", end)
+                if newline < 0:
+                    if include_partial_line:
+                        yield _decode(mm[position:size]), size
+                    return
+                yield _decode(mm[position:newline]), newline + 1
+                position = newline + 1
+
+
+def candidate_starts(text, literals):
+    """Aufsteigende Anfangspositionen der Zeilen eines Textblocks, die mindestens eines der Literale enthalten.
+
+    Alle anderen Zeilen können keine Regel des LineMatchers treffen und werden gar nicht erst
+    zerlegt; gesucht wird mit str.find über den ganzen Block.
+    """
+    starts = set()
+    for literal in literals:
+        position = text.find(literal)
+        while position >= 0:
+            starts.add(text.rfind("\n", 0, position) + 1)
+            position = text.find(literal, position + len(literal))
+    return sorted(starts)
+
+
+def candidate_lines(text, literals):
+    """Zeilen eines Textblocks, die mindestens eines der Literale enthalten, in Originalreihenfolge."""
+    lines = []
+    for start in candidate_starts(text, literals):
+        end = text.find("\n", start)
+        lines.append(text[start:] if end < 0 else text[start:end])
+    return lines
+
+
+def replay_log(parser, log_path, include_archives=True):
+    """Spielt die vorhandenen Logs durch die Handler des Parsers und baut so den aktuellen Zustand auf.
+
+    Gibt (Inode, Offset) der aktuellen Logdatei zurück, ab dem das Live-Tail fortsetzen
+    soll, oder None, wenn die Datei nicht existiert.
+    """
+    files = find_log_files(log_path) if include_archives else ([log_path] if os.path.exists(log_path) else [])
+    if not files:
+        parser.logger.warning(f"Replay: Keine Logdateien unter {log_path} gefunden.")
+        return None
+
+    literals = parser.matcher.literals
+    started = time.perf_counter()
+    total_bytes = 0
+    matched = 0
+    position = None
+    parser.begin_replay(ReplayClock(parser.log_time_of_day, os.path.getmtime(files[0])))
+    # Historische An-/Abmeldungen nicht einzeln protokollieren.
+    module_logger = parser.logger.logger
+    previous_level = module_logger.level
+    module_logger.setLevel(logging.ERROR)
+    try:
+        for path in files:
+            is_live = path == log_path
+            inode = os.stat(path).st_ino
+            offset = 0
+            for text, block_end in iter_text_blocks(path, include_partial_line=not is_live):
+                total_bytes += len(text)
+                for line in candidate_lines(text, literals):
+                    parser.process_log_line(line)
+                    matched += 1
+                if block_end is not None:
+                    offset = block_end
+            if is_live:
+                position = (inode, offset)
+    finally:
+        module_logger.setLevel(previous_level)
+    parser.finish_replay(os.path.getmtime(files[-1]))
+
+    elapsed = time.perf_counter() - started
+    parser.logger.info(f"Replay von {len(files)} Datei(en) abgeschlossen: {total_bytes / 1048576:.1f} MiB, "
+                       f"{matched} Kandidatenzeilen in {elapsed:.2f}s, {len(parser.store.active_players)} Spieler online.")
+    return position
@@ -0,0 +1,209 @@
+import abc
+import logging
+import os
+
+from parser_core.tail import InotifyWatcher
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+
+class WatchedFile(abc.ABC):
+    """Konfigurationsdatei, die im laufenden Betrieb neu geladen wird (Basis für IdList und RoleRules).
+
+    `reload()` liest die Datei nur, wenn sich (mtime_ns, Größe, Inode) geändert haben, und gibt
+    dann den vorherigen Wert zurück, sofern sich auch der Inhalt geändert hat (sonst None).
+    Eine fehlende Datei ergibt `empty()`; ohne Pfad (nicht konfiguriert) bleibt es dabei.
+    """
+
+    def __init__(self, path, log=logger):
+        self.path = path or None
+        self.logger = log
+        self.loaded = False
+        self.stat_key = None
+        self.value = self.empty()
+
+    @abc.abstractmethod
+    def empty(self):
+        """Wert ohne Datei (fehlend oder nicht konfiguriert)."""
+
+    @abc.abstractmethod
+    def parse(self, text):
+        """Wert aus dem Dateiinhalt; ValueError bei einem ungültigen Inhalt."""
+
+    @abc.abstractmethod
+    def describe(self):
+        """Kurzbeschreibung des geladenen Inhalts für das Log."""
+
+    def _stat_key(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def changed_on_disk(self):
+        """Ohne inotify: hat sich die Datei seit dem letzten Laden geändert?"""
+        return self.path is not None and self._stat_key() != self.stat_key
+
+    def reload(self):
+        """Lädt die Datei, falls sie sich geändert hat; gibt den vorherigen Wert oder None zurück."""
+        if self.path is None:
+            return None
+        stat_key = self._stat_key()
+        if self.loaded and stat_key == self.stat_key:
+            return None
+        self.loaded = True
+        name = os.path.basename(self.path)
+        value = self.empty()
+        if stat_key is None:
+            if self.stat_key is not None:
+                self.logger.warning(f"{name} wurde entfernt. Verwende leere Liste bzw. Standardregeln.")
+            else:
+                self.logger.warning(f"{name} unter {self.path} nicht gefunden.")
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                    value = self.parse(f.read())
+            except FileNotFoundError:
+                stat_key = None
+            except (OSError, ValueError) as e:
+                # Alten Stand behalten, bis die Datei erneut geändert wird.
+                self.stat_key = stat_key
+                self.logger.error(f"Beim Lesen von {self.path}: {e}")
+                return None
+        self.stat_key = stat_key
+        if value == self.value:
+            return None
+        previous, self.value = self.value, value
+        if stat_key is not None:
+            self.logger.info(f"{name} geladen: {self.describe()}.")
+        return previous
+
+
+class IdList(WatchedFile):
+    """IDs aus einer Textdatei (eine ID pro Zeile), z.B. adminlist.txt, bannedlist.txt oder permittedlist.txt von Valheim.
+
+    Leerzeilen und Kommentare ('//' wie in den Vorlagen von Valheim, '#') werden ignoriert.
+    """
+
+    def empty(self):
+        return frozenset()
+
+    def parse(self, text):
+        ids = {line.strip() for line in text.splitlines()}
+        return frozenset(player_id for player_id in ids if player_id and not player_id.startswith(("//", "#")))
+
+    def describe(self):
+        return f"{len(self.value)} ID(s)"
+
+    def __contains__(self, player_id):
+        return player_id is not None and str(player_id) in self.value
+
+    def __len__(self):
+        return len(self.value)
+
+
+class RoleRules(WatchedFile):
+    """Regeln Berechtigungen -> Rolle, optional aus einer Datei (sonst die Standardregeln des Spiels).
+
+    Jede Zeile hat die Form `Rolle = Berechtigung, Berechtigung, ...`; die erste Zeile mit
+    einer Berechtigung des Spielers gewinnt, eine Zeile ohne Berechtigungen gilt immer.
+    Passt keine Zeile, gilt die Auffangrolle der Standardregeln.
+
+    :param defaults: Liste von (Rolle, Berechtigungen); die letzte ohne Berechtigungen ist die Auffangrolle.
+    """
+
+    def __init__(self, path, defaults, log=logger):
+        self.defaults = tuple((role, frozenset(permissions)) for role, permissions in defaults)
+        self.fallback = next((role for role, permissions in reversed(self.defaults) if not permissions), None)
+        super().__init__(path, log)
+
+    def empty(self):
+        return self.defaults
+
+    def parse(self, text):
+        rules = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            role, separator, permissions = line.partition("=")
+            if not separator or not role.strip():
+                raise ValueError(f"Zeile {number}: erwartet 'Rolle = Berechtigung, ...', gefunden {line!r}")
+            rules.append((role.strip(), frozenset(p.strip() for p in permissions.split(",") if p.strip())))
+        return tuple(rules)
+
+    def describe(self):
+        return f"{len(self.value)} Rollenregel(n)"
+
+    def role(self, permissions):
+        for role, required in self.value:
+            if not required or not required.isdisjoint(permissions):
+                return role
+        return self.fallback
+
+
+class RoleSources:
+    """ID-Listen und Rollenregeln einer Instanz, gemeinsam über einen inotify-FD überwacht.
+
+    Rollenfunktionen einer GameDefinition erhalten dieses Objekt: `sources['admins']` ist eine
+    IdList (leer, wenn nicht konfiguriert), `sources.rules` die RoleRules des Spiels oder None.
+    Ohne inotify meldet `changed()` Änderungen per os.stat; der Parser prüft dann periodisch.
+
+    :param lists: Dict Name -> IdList.
+    :param rules: RoleRules oder None.
+    """
+
+    def __init__(self, lists, rules=None, log=logger):
+        self.lists = lists
+        self.rules = rules
+        self.watcher = None
+        paths = [watched.path for watched in self.files() if watched.path]
+        if paths:
+            try:
+                self.watcher = InotifyWatcher(*paths)
+            except OSError as e:
+                log.warning(f"inotify für Admin-Listen/Rollenregeln nicht nutzbar ({e}); Änderungen werden periodisch geprüft.")
+
+    def __getitem__(self, name):
+        return self.lists[name]
+
+    def files(self):
+        return list(self.lists.values()) + ([self.rules] if self.rules is not None else [])
+
+    def configured(self):
+        return any(watched.path for watched in self.files())
+
+    def fileno(self):
+        return None if self.watcher is None else self.watcher.fileno()
+
+    def changed(self):
+        """True, wenn eine der Dateien geändert wurde; mit inotify ein einziger nicht blockierender read()."""
+        if self.watcher is not None:
+            return self.watcher.drain()
+        return any(watched.changed_on_disk() for watched in self.files())
+
+    def reload(self):
+        """Lädt geänderte Dateien neu; gibt (Menge der hinzugekommenen oder entfernten IDs, alle neu berechnen) zurück.
+
+        Alle Spieler sind betroffen, wenn sich die Regeln geändert haben oder eine Liste zwischen
+        leer und nicht leer wechselt: Eine Rollenfunktion darf eine leere Liste anders behandeln
+        (z.B. eine Whitelist, die erst mit dem ersten Eintrag gilt), dann zählen auch Spieler,
+        die nicht auf der Liste stehen.
+        """
+        changed_ids = set()
+        recompute_all = False
+        for id_list in self.lists.values():
+            previous = id_list.reload()
+            if previous is not None:
+                changed_ids |= previous ^ id_list.value
+                recompute_all = recompute_all or bool(previous) != bool(id_list.value)
+        if self.rules is not None and self.rules.reload() is not None:
+            recompute_all = True
+        return changed_ids, recompute_all
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
@@ -0,0 +1,174 @@
+import os
+import socket
+import subprocess
+import threading
+import time
+
+from parser_core.docker_source import DockerLogError, DockerLogSource
+from parser_core.line_queue import create_line_queue
+from parser_core.tail import FileFollower, follow_file, follow_pipe
+
+# Längstes Warten der Verarbeitung ohne neue Zeilen (wie tick_interval der Tail-Schleifen).
+QUEUE_TICK_SECONDS = 10.0
+
+
+def tail_log_file(parser, filepath, start_position=None):
+    """Liest eine Logdatei ereignisgesteuert per inotify (für den 'native' Modus).
+
+    `start_position` ist das Ergebnis von replay_log oder restore_checkpoint: Fortsetzen hinter
+    den bereits verarbeiteten Zeilen. Mit einer LineQueue (Standard) liest ein eigener Thread,
+    verarbeitet wird in diesem.
+    """
+    line_queue = create_line_queue(parser)
+    try:
+        follower = parser.log_follower = FileFollower(filepath, log=parser.logger, start_position=start_position)
+        if line_queue is None:
+            follow_file(filepath, parser.process_log_lines, on_tick=parser.run_timers,
+                        timeout_func=parser.next_timer_timeout, follower=follower, extra_fds=_extra_fds(parser))
+        else:
+            if parser.position is None and start_position is not None:
+                # Nach einem Replay: Checkpoints gelten ab hier, auch bevor der erste Batch verarbeitet ist.
+                parser.position = {"inode": start_position[0], "offset": start_position[1]}
+            run_queued(parser, line_queue, lambda put: follow_file(filepath, put, follower=follower))
+    except Exception as e:
+        parser.logger.critical(f"Kritischer Fehler in tail_log_file: {e}", exc_info=True)
+
+
+def run_queued(parser, line_queue, read):
+    """Entkoppelt Lesen und Verarbeitung über `line_queue`.
+
+    `read(put)` läuft in einem Daemon-Thread und übergibt jeden gelesenen Batch an
+    `put(lines, docker_timestamps=None)`; der aufrufende Thread verarbeitet die Batches, führt
+    die Timer aus und kehrt zurück, sobald `read` beendet und die Warteschlange leer ist.
+    """
+    parser.line_queue = line_queue
+
+    def put(lines, docker_timestamps=None):
+        # Position hinter dem Batch, im Lese-Thread erfasst (der Follower ist der Verarbeitung voraus).
+        line_queue.put(lines, docker_timestamps, parser.read_position() if parser.checkpoint is not None else None)
+
+    def reader():
+        try:
+            read(put)
+        except Exception as e:
+            parser.logger.critical(f"Kritischer Fehler im Lese-Thread: {e}", exc_info=True)
+        finally:
+            line_queue.close()
+
+    threading.Thread(target=reader, name="log-reader", daemon=True).start()
+    extra_fds = _extra_fds(parser)
+    while True:
+        # Vor get_batch lesen: nach close() kommen keine Zeilen mehr hinzu.
+        closed = line_queue.closed
+        batch = line_queue.get_batch()
+        if batch is not None:
+            parser.process_log_lines(batch.lines, batch.docker_timestamps, batch.position)
+            continue
+        if closed:
+            line_queue.release()
+            return
+        timeout = parser.next_timer_timeout()
+        line_queue.wait(QUEUE_TICK_SECONDS if timeout is None else min(QUEUE_TICK_SECONDS, timeout), extra_fds)
+        parser.run_timers()
+
+
+def _extra_fds(parser):
+    """Weitere FDs, die das Warten der Tail-Schleife beenden (Änderungen an der Admin-Liste usw.)."""
+    fd = parser.watched_fileno()
+    return () if fd is None else (fd,)
+
+
+def engine_socket(parser, socket_path):
+    """Gibt den Docker-Socket zurück, wenn er konfiguriert ist und existiert; sonst None (CLI)."""
+    if not socket_path:
+        return None
+    if not os.path.exists(socket_path):
+        parser.logger.warning(f"Docker-Socket '{socket_path}' nicht gefunden. Verwende die docker-CLI.")
+        return None
+    return socket_path
+
+
+def log_docker_stderr(parser, line):
+    """Meldungen der docker-CLI als Warnung; Container-Ausgaben auf stderr (mit Zeitstempel) nur im Debug-Log."""
+    line = line.rstrip()
+    if not line:
+        return
+    if line[:1].isdigit() and "T" in line.split(" ", 1)[0]:
+        parser.logger.debug(f"docker logs (stderr): {line}")
+    else:
+        parser.logger.warning(f"docker logs: {line}")
+
+
+def _drain_stderr(parser, stream):
+    for raw in iter(stream.readline, b""):
+        log_docker_stderr(parser, raw.decode("utf-8", errors="replace"))
+    stream.close()
+
+
+def _open_docker_stream(parser, source):
+    """Startet den Log-Stream; gibt (lesbares Objekt, Prozess oder None) zurück."""
+    if source.socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(source.socket_path)
+            sock.sendall(source.api_request())
+        except OSError:
+            sock.close()
+            raise
+        return sock, None
+    process = subprocess.Popen(source.cli_command(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    threading.Thread(target=_drain_stderr, args=(parser, process.stderr), daemon=True).start()
+    return process.stdout, process
+
+
+def tail_docker_logs(parser, container_name, docker_socket=None, start_position=None):
+    """Liest Logs eines Docker-Containers (für den 'docker' Modus).
+
+    Nach einem Abbruch wird ab dem zuletzt verarbeiteten Zeitstempel fortgesetzt (siehe
+    DockerLogSource). Mit `docker_socket` wird statt der CLI die Docker Engine API verwendet.
+    `start_position` (Zeitstempel, Anzahl) aus einem Checkpoint setzt genau dort fort.
+    Mit einer LineQueue (Standard) liest ein eigener Thread, sodass eine langsame Verarbeitung
+    den Stream nicht staut.
+    """
+    parser.logger.info(f"Überwache Docker-Logs für Container: {container_name}")
+    source = parser.docker_source = DockerLogSource(container_name, engine_socket(parser, docker_socket))
+    if start_position is not None:
+        source.resume(*start_position)
+    line_queue = create_line_queue(parser)
+    if line_queue is None:
+        _follow_docker(parser, container_name, source, lambda lines: parser.process_log_lines(lines, source.line_timestamps),
+                       on_tick=parser.run_timers, timeout_func=parser.next_timer_timeout, extra_fds=_extra_fds(parser))
+    else:
+        run_queued(parser, line_queue,
+                   lambda put: _follow_docker(parser, container_name, source, lambda lines: put(lines, source.line_timestamps)))
+
+
+def _follow_docker(parser, container_name, source, on_lines, **follow_options):
+    """Startet den Log-Stream bei jedem Abbruch neu; `follow_options` gehen an follow_pipe."""
+    while True:
+        source.restart()
+        try:
+            stream, process = _open_docker_stream(parser, source)
+            via = "Engine API" if source.socket_path else "docker logs -f"
+            parser.logger.info(f"{via} für '{container_name}' gestartet (ab {source.last_timestamp or 'jetzt'}).")
+        except Exception as e:
+            parser.logger.error(f"Konnte Docker-Logs nicht starten: {e}", exc_info=True)
+            time.sleep(10)
+            continue
+
+        try:
+            follow_pipe(stream, on_lines, splitter=source, **follow_options)
+        except DockerLogError as e:
+            parser.logger.error(f"Docker Engine API: {e}")
+            time.sleep(9)
+        finally:
+            if process is not None:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+                process.stdout.close()
+            else:
+                stream.close()
+        parser.logger.warning(f"Docker-Logstream beendet (bisher {source.lines_skipped} doppelte Zeilen übersprungen). "
+                              f"Versuche Neustart...")
+        time.sleep(1)
@@ -0,0 +1,74 @@
+import mmap
+import os
+import struct
+import time
+
+# Layout der Snapshot-Datei (Little Endian), identisch zu flask_api/modules/shm_snapshot.py:
+#   0  magic     8 Bytes  b"GSSNAP01"
+#   8  seq       u64      ungerade = Schreibvorgang läuft (Seqlock)
+#  16  version   u64      streng monoton, Mikrosekunden seit Epoch
+#  24  length    u64      Länge der JSON-Daten
+#  32  capacity  u64      Größe des Datenbereichs
+#  64  Daten
+MAGIC = b"GSSNAP01"
+HEADER_SIZE = 64
+_SEQ = struct.Struct("<Q")
+_FIELDS = struct.Struct("<QQQ")
+_SEQ_OFFSET = 8
+_FIELDS_OFFSET = 16
+DEFAULT_CAPACITY = 64 * 1024
+
+
+class ShmSnapshotPublisher:
+    """Veröffentlicht die Spielerliste in einer per mmap geteilten Datei (z.B. unter /dev/shm).
+
+    Leser prüfen vor und nach dem Kopieren die Sequenznummer und wiederholen bei einem
+    gleichzeitigen Schreibvorgang (Seqlock); eine Sperre gibt es nicht. Die Datei wird nur
+    vergrößert, nie verkleinert, damit bestehende Mappings der Leser gültig bleiben.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.fd).st_size
+        if size < HEADER_SIZE + capacity:
+            os.ftruncate(self.fd, HEADER_SIZE + capacity)
+            size = HEADER_SIZE + capacity
+        self.map = mmap.mmap(self.fd, size)
+        self.seq = 0
+        self.version = 0
+        if self.map[:8] == MAGIC:
+            # Nach einem Neustart weiterzählen, damit Leser keinen Rückschritt sehen.
+            self.seq = _SEQ.unpack_from(self.map, _SEQ_OFFSET)[0]
+            self.version = _FIELDS.unpack_from(self.map, _FIELDS_OFFSET)[0]
+            self.seq += self.seq & 1
+        else:
+            self.map[:8] = MAGIC
+
+    def publish(self, payload):
+        """Schreibt `payload` (bytes) als neue Version und gibt die Versionsnummer zurück."""
+        capacity = len(self.map) - HEADER_SIZE
+        if len(payload) > capacity:
+            self._grow(len(payload))
+            capacity = len(self.map) - HEADER_SIZE
+        self.version = max(self.version + 1, time.time_ns() // 1000)
+
+        _SEQ.pack_into(self.map, _SEQ_OFFSET, self.seq + 1)
+        self.map[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        _FIELDS.pack_into(self.map, _FIELDS_OFFSET, self.version, len(payload), capacity)
+        self.seq += 2
+        _SEQ.pack_into(self.map, _SEQ_OFFSET, self.seq)
+        return self.version
+
+    def _grow(self, needed):
+        capacity = len(self.map) - HEADER_SIZE
+        while capacity < needed:
+            capacity *= 2
+        # resize() vergrößert auch die Datei; die Leser mappen neu, sobald `length` nicht mehr passt.
+        self.map.resize(HEADER_SIZE + capacity)
+
+    def close(self):
+        if self.fd >= 0:
+            self.map.close()
+            os.close(self.fd)
+            self.fd = -1
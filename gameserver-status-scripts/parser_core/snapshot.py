@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from parser_core.metrics import Histogram
+from parser_core.shm_snapshot import ShmSnapshotPublisher
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWriter:
+    """Schreibt die Spielerliste gebündelt, atomar und nur bei geändertem Inhalt.
+
+    Änderungen setzen lediglich ein Dirty-Flag (`mark_dirty`). Geschrieben wird frühestens
+    `flush_interval` Sekunden nach dem letzten Schreibvorgang; weitere Änderungen in
+    diesem Fenster werden zusammengefasst. Die Datei wird als temporäre Datei im selben
+    Verzeichnis erzeugt und per `os.replace` ersetzt, Leser sehen also nie einen halben Stand.
+
+    Mit `shm_path` wird derselbe Inhalt zusätzlich per ShmSnapshotPublisher in eine
+    gemeinsam genutzte Datei veröffentlicht; die JSON-Datei bleibt als Fallback bestehen.
+    """
+
+    def __init__(self, path, source, flush_interval=1.0, clock=time.monotonic, shm_path=None):
+        self.path = path
+        self.shm = ShmSnapshotPublisher(shm_path) if shm_path else None
+        self.source = source
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.dirty = False
+        self.last_flush = float("-inf")
+        self.last_hash = None
+        self.writes_performed = 0
+        self.writes_coalesced = 0
+        self.writes_unchanged = 0
+        self.write_seconds = Histogram()
+
+    def mark_dirty(self):
+        """Merkt eine Änderung vor. Zählt Änderungen, die in einen offenen Snapshot fallen."""
+        if self.dirty:
+            self.writes_coalesced += 1
+        self.dirty = True
+
+    def seconds_until_flush(self):
+        """Zeit bis zum nächsten fälligen Schreibvorgang oder None, wenn nichts ansteht."""
+        if not self.dirty:
+            return None
+        return max(0.0, self.last_flush + self.flush_interval - self.clock())
+
+    def flush_if_due(self):
+        """Schreibt, wenn Änderungen anstehen und das Debounce-Intervall abgelaufen ist."""
+        if self.dirty and self.clock() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Serialisiert die Daten kompakt und ersetzt die Zieldatei atomar, falls sich der Inhalt geändert hat."""
+        self.dirty = False
+        self.last_flush = self.clock()
+        started = time.perf_counter()
+        try:
+            payload = json.dumps(self.source(), separators=(",", ":")).encode("utf-8")
+            digest = hashlib.blake2b(payload, digest_size=16).digest()
+            if digest == self.last_hash:
+                self.writes_unchanged += 1
+                return False
+            if self.shm is not None:
+                self.shm.publish(payload)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            self.last_hash = digest
+            self.writes_performed += 1
+            self.write_seconds.observe(time.perf_counter() - started)
+            logger.debug(f"Snapshot geschrieben ({len(payload)} Bytes). {self.stats()}")
+            return True
+        except Exception as e:
+            # Beim nächsten fälligen Zeitpunkt erneut versuchen.
+            self.dirty = True
+            logger.error(f"Beim Schreiben der JSON-Datei: {e}", exc_info=True)
+            return False
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+
+    def stats(self):
+        """Zähler für geschriebene, zusammengefasste und wegen gleichen Inhalts übersprungene Snapshots."""
+        return {
+            "writes_performed": self.writes_performed,
+            "writes_coalesced": self.writes_coalesced,
+            "writes_unchanged": self.writes_unchanged,
+        }
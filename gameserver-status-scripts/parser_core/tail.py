@@ -0,0 +1,369 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import time
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+# --- inotify-Konstanten (siehe <sys/inotify.h>) ---
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+_DIR_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
+
+
+def _load_libc():
+    """Lädt die libc mit den inotify-Funktionen oder gibt None zurück."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class InotifyWatcher:
+    """Blockiert auf inotify-Events der Verzeichnisse, in denen die Datei(en) liegen.
+
+    Das Verzeichnis (nicht die Datei) wird überwacht, damit auch Rotation
+    (rename + neu anlegen) und das spätere Anlegen einer fehlenden Datei erkannt werden.
+    """
+
+    def __init__(self, filepath, *more_filepaths):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify nicht verfügbar")
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.filenames = {}  # Watch-Deskriptor des Verzeichnisses -> überwachte Dateinamen
+        for path in (filepath,) + more_filepaths:
+            directory = os.path.dirname(os.path.abspath(path))
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(directory), _DIR_EVENTS)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(err, f"{os.strerror(err)}: {directory}")
+            self.filenames.setdefault(wd, set()).add(os.fsencode(os.path.basename(path)))
+        self.wakeups = 0
+
+    def fileno(self):
+        return self.fd
+
+    def drain(self):
+        """Liest alle anstehenden Events und meldet, ob eine der überwachten Dateien betroffen war."""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, _mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if name in self.filenames.get(wd, ()):
+                    relevant = True
+
+    def wait(self, timeout, extra_fds=()):
+        """Wartet höchstens `timeout` Sekunden auf Änderungen an der Logdatei.
+
+        Wird einer der `extra_fds` lesbar (z.B. der Watcher der Admin-Liste), endet das Warten
+        vorzeitig mit False; der Aufrufer verarbeitet ihn im anschließenden Tick.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.fd, *extra_fds], [], [], remaining)
+            self.wakeups += 1
+            if not readable:
+                return False
+            if self.fd not in readable:
+                return False
+            if self.drain():
+                return True
+            if len(readable) > 1:
+                return False
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Fallback ohne inotify: prüft Größe/Inode der Datei in einem festen Intervall."""
+
+    def __init__(self, filepath, poll_interval=1.0):
+        self.filepath = filepath
+        self.poll_interval = poll_interval
+        self.last_stat = self._stat()
+        self.wakeups = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.filepath)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def fileno(self):
+        return None
+
+    def wait(self, timeout, extra_fds=()):
+        """Schläft in Schritten von `poll_interval`, bis sich die Datei ändert oder `timeout` abläuft."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            step = self.poll_interval
+            if deadline is not None:
+                step = min(step, max(0.0, deadline - time.monotonic()))
+            readable, _, _ = select.select(list(extra_fds), [], [], step)
+            self.wakeups += 1
+            if readable:
+                return False
+            current = self._stat()
+            if current != self.last_stat:
+                self.last_stat = current
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        pass
+
+
+def create_watcher(filepath, poll_interval=1.0):
+    """Erzeugt einen inotify-Watcher, fällt bei Bedarf auf Polling zurück."""
+    try:
+        return InotifyWatcher(filepath)
+    except OSError as e:
+        logger.warning(f"inotify nicht nutzbar ({e}). Nutze Polling alle {poll_interval}s.")
+        return PollingWatcher(filepath, poll_interval)
+
+
+def normalize_newlines(data):
+    """CRLF -> LF wie beim Lesen im Textmodus (Windows-Server, Container mit TTY)."""
+    return data.replace(b"\r\n", b"\n") if b"\r" in data else data
+
+
+class LineSplitter:
+    """Zerlegt Byte-Blöcke in Zeilen und puffert eine unvollständige letzte Zeile.
+
+    Zeilen enden mit LF oder CRLF; das CR gehört nicht zur Zeile (sonst träfen mit `$`
+    verankerte Regeln nicht).
+    """
+
+    def __init__(self):
+        self.partial = b""
+
+    def reset(self):
+        self.partial = b""
+
+    def feed(self, data):
+        if not data:
+            return []
+        lines = normalize_newlines(self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def feed_block(self, data):
+        """Wie feed, liefert die vollständigen Zeilen aber als einen Bytes-Block ohne letzten Umbruch (oder None)."""
+        if not data:
+            return None
+        data = normalize_newlines(self.partial + data)
+        end = data.rfind(b"\n")
+        if end < 0:
+            self.partial = data
+            return None
+        self.partial = data[end + 1:]
+        return data[:end]
+
+
+class FileFollower:
+    """Liest neu angehängte Daten einer Logdatei blockweise und zerlegt sie in Zeilen.
+
+    Rotation wird über einen Inode-Wechsel des Pfades erkannt, Truncation über eine
+    Dateigröße kleiner als die aktuelle Leseposition. `start_position` (Inode, Offset),
+    z.B. das Ergebnis eines Replays, setzt beim ersten Öffnen genau dort fort, sofern die
+    Datei noch denselben Inode hat.
+    """
+
+    def __init__(self, filepath, chunk_size=DEFAULT_CHUNK_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, start_at_end=True, log=None,
+                 start_position=None):
+        self.filepath = filepath
+        self.logger = log or logger
+        self.chunk_size = chunk_size
+        self.max_batch_bytes = max_batch_bytes
+        self.start_at_end = start_at_end
+        self.start_position = start_position
+        self.fd = None
+        self.inode = None
+        self.offset = 0
+        self.splitter = LineSplitter()
+
+    def open(self):
+        """Öffnet die Datei. Gibt False zurück, wenn sie (noch) nicht existiert."""
+        try:
+            fd = os.open(self.filepath, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        except FileNotFoundError:
+            # Eine später angelegte Datei ist neu und wird vollständig gelesen.
+            self.start_at_end = False
+            return False
+        st = os.fstat(fd)
+        self.fd = fd
+        self.inode = st.st_ino
+        # Nur beim allerersten Öffnen ans Ende springen; nach einer Rotation von vorne lesen.
+        if self.start_position is not None and self.start_position[0] == st.st_ino:
+            self.offset = self.start_position[1]
+        else:
+            self.offset = st.st_size if self.start_at_end else 0
+        self.start_at_end = False
+        self.start_position = None
+        self.splitter.reset()
+        self.logger.info(f"Überwache Logdatei: {self.filepath} (Inode {self.inode}, Offset {self.offset})")
+        return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _read_available(self):
+        """Liest ab `offset` bis EOF oder bis `max_batch_bytes` erreicht sind."""
+        chunks = []
+        total = 0
+        while total < self.max_batch_bytes:
+            data = os.pread(self.fd, self.chunk_size, self.offset)
+            if not data:
+                break
+            chunks.append(data)
+            total += len(data)
+            self.offset += len(data)
+        return b"".join(chunks)
+
+    def read_lines(self):
+        """Gibt alle vollständigen, neuen Zeilen als Liste zurück (ohne Zeilenumbruch)."""
+        parts = self._read(self.splitter.feed)
+        if len(parts) == 1:
+            return parts[0]
+        return [line for part in parts for line in part]
+
+    def read_block(self):
+        """Wie read_lines, aber als ein Bytes-Block vollständiger Zeilen (oder None); für Worker-Prozesse."""
+        blocks = [block for block in self._read(self.splitter.feed_block) if block is not None]
+        return b"\n".join(blocks) if blocks else None
+
+    def _read(self, feed):
+        """Liest neue Daten; gibt `feed(Daten)` pro gelesener Datei zurück (nach einer Rotation zwei Einträge)."""
+        if self.fd is None and not self.open():
+            return []
+
+        try:
+            path_inode = os.stat(self.filepath).st_ino
+        except FileNotFoundError:
+            path_inode = None
+
+        size = os.fstat(self.fd).st_size
+        if size < self.offset:
+            self.logger.warning(f"Logdatei {self.filepath} wurde gekürzt. Lese ab Anfang.")
+            self.offset = 0
+            self.splitter.reset()
+
+        parts = [feed(self._read_available())]
+        if self.offset < os.fstat(self.fd).st_size:
+            # Batch-Grenze erreicht, Rest folgt im nächsten Aufruf.
+            return parts
+
+        if path_inode != self.inode:
+            # Alte Datei ist vollständig gelesen; ein evtl. unvollständiger Rest wird verworfen.
+            self.logger.info(f"Logdatei {self.filepath} wurde rotiert oder entfernt.")
+            self.close()
+            if path_inode is not None and self.open():
+                parts.extend(self._read(feed))
+        return parts
+
+    def has_pending(self):
+        """True, wenn bereits weitere Daten vorliegen (z.B. nach Erreichen der Batch-Grenze)."""
+        if self.fd is None:
+            return False
+        return self.offset < os.fstat(self.fd).st_size
+
+
+def _wait_timeout(tick_interval, timeout_func):
+    if timeout_func is None:
+        return tick_interval
+    timeout = timeout_func()
+    return tick_interval if timeout is None else min(tick_interval, max(0.0, timeout))
+
+
+def follow_file(filepath, on_lines, on_tick=None, tick_interval=10.0, poll_interval=1.0, timeout_func=None, log=None,
+                start_position=None, follower=None, extra_fds=()):
+    """Blockierende Tail-Schleife: ruft `on_lines(lines)` pro Batch und `on_tick()` nach jedem Warten auf.
+
+    `timeout_func` kann die Wartezeit verkürzen (z.B. bis ein verzögerter Snapshot fällig ist).
+    Ein vorab erzeugter `follower` (FileFollower) ersetzt `log` und `start_position`.
+    Ein lesbarer FD aus `extra_fds` beendet das Warten sofort (siehe GameParser.watched_fileno).
+    """
+    if follower is None:
+        follower = FileFollower(filepath, log=log, start_position=start_position)
+    watcher = create_watcher(filepath, poll_interval)
+    try:
+        if not follower.open():
+            follower.logger.error(f"Logdatei nicht gefunden: {filepath}. Warte auf Erstellung...")
+        while True:
+            lines = follower.read_lines()
+            if lines:
+                on_lines(lines)
+            if follower.has_pending():
+                continue
+            watcher.wait(_wait_timeout(tick_interval, timeout_func), extra_fds)
+            if on_tick:
+                on_tick()
+    finally:
+        watcher.close()
+        follower.close()
+
+
+def follow_pipe(pipe, on_lines, on_tick=None, tick_interval=10.0, timeout_func=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                splitter=None, extra_fds=()):
+    """Liest einen Pipe-Stream (z.B. `docker logs -f`) blockweise bis EOF.
+
+    Gewartet wird per select mit Timeout, damit `on_tick()` auch ohne neue Zeilen läuft.
+    `splitter` (Standard: LineSplitter) macht aus den gelesenen Bytes Zeilen. Ein lesbarer
+    FD aus `extra_fds` beendet das Warten wie ein Timeout.
+    """
+    fd = pipe.fileno()
+    if splitter is None:
+        splitter = LineSplitter()
+    while True:
+        readable, _, _ = select.select([fd, *extra_fds], [], [], _wait_timeout(tick_interval, timeout_func))
+        if fd in readable:
+            data = os.read(fd, chunk_size)
+            if not data:
+                return
+            lines = splitter.feed(data)
+            if lines:
+                on_lines(lines)
+        if on_tick:
+            on_tick()
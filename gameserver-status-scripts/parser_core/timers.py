@@ -0,0 +1,95 @@
+import heapq
+import itertools
+import logging
+import time
+
+# --- Logger initialisieren ---
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Einfache Timer auf Basis eines Heaps, sortiert nach Fälligkeit (monotone Uhr)."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.heap = []
+        self.counter = itertools.count()
+
+    def call_at(self, deadline, callback, interval=None):
+        heapq.heappush(self.heap, (deadline, next(self.counter), callback, interval))
+
+    def call_later(self, delay, callback):
+        self.call_at(self.clock() + delay, callback)
+
+    def call_every(self, interval, callback, first_delay=None):
+        """Ruft `callback` alle `interval` Sekunden auf."""
+        self.call_at(self.clock() + (interval if first_delay is None else first_delay), callback, interval)
+
+    def seconds_until_next(self):
+        """Zeit bis zum nächsten fälligen Timer oder None, wenn keiner geplant ist."""
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0][0] - self.clock())
+
+    def run_due(self):
+        """Führt alle fälligen Timer aus. Kostet O(1), wenn nichts fällig ist."""
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            deadline, _, callback, interval = heapq.heappop(self.heap)
+            if interval is not None:
+                # Vom Sollzeitpunkt aus weiterplanen, ohne verpasste Ticks nachzuholen.
+                self.call_at(max(deadline + interval, now), callback, interval)
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Fehler in Timer-Callback {getattr(callback, '__name__', callback)}: {e}", exc_info=True)
+
+
+class ExpiryTracker:
+    """Verfolgt die Lebendigkeit von Spielern über einen nach Deadline sortierten Heap.
+
+    `touch` aktualisiert nur die Deadline des Eintrags (O(1)). Jeder Spieler hat genau einen
+    Heap-Eintrag; ist dieser beim Abräumen veraltet, wird er mit der aktuellen Deadline neu
+    eingereiht. Ein Abräumen kostet damit O(abgelaufene) statt O(alle Spieler).
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.heap = []
+        self.tracked = {}  # Name -> [Deadline]; die Liste dient als Identität des Heap-Eintrags
+        self.counter = itertools.count()
+
+    def touch(self, name, now):
+        if self.timeout <= 0:
+            return
+        token = self.tracked.get(name)
+        if token is not None:
+            token[0] = now + self.timeout
+            return
+        token = [now + self.timeout]
+        self.tracked[name] = token
+        heapq.heappush(self.heap, (token[0], next(self.counter), name, token))
+
+    def forget(self, name):
+        self.tracked.pop(name, None)
+
+    def pop_expired(self, now):
+        """Gibt die Namen aller Spieler zurück, deren Deadline abgelaufen ist, und vergisst sie."""
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, name, token = heapq.heappop(self.heap)
+            if self.tracked.get(name) is not token:
+                continue
+            if token[0] > now:
+                heapq.heappush(self.heap, (token[0], next(self.counter), name, token))
+                continue
+            del self.tracked[name]
+            expired.append(name)
+        return expired
+
+    def shift(self, delta):
+        """Verschiebt alle Deadlines um `delta` Sekunden (nach einem Replay mit geschätztem Datum)."""
+        for token in self.tracked.values():
+            token[0] += delta
+        self.heap = [(token[0], next(self.counter), name, token) for name, token in self.tracked.items()]
+        heapq.heapify(self.heap)
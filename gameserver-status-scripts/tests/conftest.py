@@ -0,0 +1,9 @@
+import os
+import sys
+
+# parser_core liegt im Wurzelverzeichnis, die API-Module unter flask_api/ (Import als 'modules.*'),
+# Loggenerator und Regressionsabläufe unter benchmarks/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "flask_api"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,34 @@
+"""CheckpointWriter: nur bei geänderter Position oder geändertem Spielerzustand schreiben."""
+import json
+
+from parser_core.games import GAME_PARSERS
+
+LOGIN = ["02/14/2024 12:00:01: Got connection SteamID 76561198000000001",
+         "02/14/2024 12:00:05: Got character ZDOID from Alice : -123456:1"]
+
+
+def test_unchanged_state_is_not_written_again(tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    parser = GAME_PARSERS["valheim"]({
+        "output_json_path": str(tmp_path / "players.json"),
+        "checkpoint_path": str(checkpoint_path),
+    })
+    parser.start()
+    checkpoint = parser.checkpoint
+    parser.process_log_lines(LOGIN, position={"inode": 1, "offset": 120})
+    assert checkpoint.save() is True
+    saved = json.loads(checkpoint_path.read_text())["saved"]
+
+    # Später, aber mit gleicher Position und gleichem Zustand: kein neuer Schreibvorgang.
+    monkeypatch.setattr("time.time", lambda: saved + 60)
+    assert checkpoint.save() is False
+    assert checkpoint.save() is False
+    assert checkpoint.writes_performed == 1
+
+    parser.process_log_lines(["02/14/2024 12:01:00: World saved ( 312.112ms )"], position={"inode": 1, "offset": 170})
+    assert checkpoint.save() is True
+    data = json.loads(checkpoint_path.read_text())
+    assert data["saved"] == saved + 60
+    assert data["position"] == {"inode": 1, "offset": 170}
+    assert checkpoint.writes_performed == 2
+    parser.shutdown()
@@ -0,0 +1,166 @@
+"""DockerLogSource gegen eine nachgebaute docker-CLI und einen nachgebauten Engine-API-Socket."""
+import logging
+import os
+import socket
+import stat
+import sys
+import threading
+import types
+
+import pytest
+
+from parser_core.docker_source import DockerLogError, DockerLogSource
+from parser_core.runner import _open_docker_stream
+from parser_core.tail import follow_pipe
+
+PARSER = types.SimpleNamespace(logger=logging.getLogger("test_docker_source"))
+
+# Gibt die Zeilen aus FAKE_DOCKER_LOG ab dem Zeitstempel von --since aus (wie Docker: einschließlich).
+FAKE_DOCKER = f"""#!{sys.executable}
+import os, sys
+args = sys.argv[1:]
+with open(os.environ["FAKE_DOCKER_ARGS"], "a") as f:
+    f.write(" ".join(args) + "\\n")
+since = args[args.index("--since") + 1]
+with open(os.environ["FAKE_DOCKER_LOG"]) as f:
+    for line in f:
+        if since.endswith("s") or line.split(" ", 1)[0] >= since:
+            sys.stdout.write(line)
+"""
+
+
+def frame(stream, text):
+    payload = text.encode("utf-8")
+    return bytes([stream, 0, 0, 0]) + len(payload).to_bytes(4, "big") + payload
+
+
+def read_all(stream, source, chunk_size=65536):
+    lines, timestamps = [], []
+
+    def collect(new_lines):
+        lines.extend(new_lines)
+        timestamps.extend(source.line_timestamps)
+    follow_pipe(stream, collect, splitter=source, chunk_size=chunk_size)
+    return lines, timestamps
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "docker"
+    script.write_text(FAKE_DOCKER)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(tmp_path / "container.log"))
+    monkeypatch.setenv("FAKE_DOCKER_ARGS", str(tmp_path / "args.txt"))
+    return tmp_path
+
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    """Startet einen Unix-Socket, der auf eine Anfrage die übergebenen Bytestücke einzeln sendet."""
+    servers = []
+
+    def serve(*chunks):
+        path = str(tmp_path / f"docker{len(servers)}.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        requests = []
+
+        def respond():
+            conn, _ = server.accept()
+            with conn:
+                request = b""
+                while b"\r\n\r\n" not in request:
+                    request += conn.recv(4096)
+                requests.append(request.decode("ascii"))
+                for chunk in chunks:
+                    conn.sendall(chunk)
+        thread = threading.Thread(target=respond, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return path, requests
+
+    yield serve
+    for server, thread in servers:
+        thread.join(timeout=5)
+        server.close()
+
+
+def run_cli(source):
+    source.restart()
+    stream, process = _open_docker_stream(PARSER, source)
+    try:
+        return read_all(stream, source)
+    finally:
+        process.wait()
+        stream.close()
+
+
+def test_cli_restart_skips_lines_with_equal_timestamp(fake_cli):
+    log = fake_cli / "container.log"
+    # Der Stream bricht nach der zweiten von drei Zeilen mit gleichem Zeitstempel ab.
+    log.write_text("2024-05-01T12:00:00.1Z a\n"
+                   "2024-05-01T12:00:01.5Z b1\n"
+                   "2024-05-01T12:00:01.5Z b2\n")
+    source = DockerLogSource("valheim")
+    assert run_cli(source) == (["a", "b1", "b2"], [
+        "2024-05-01T12:00:00.1Z", "2024-05-01T12:00:01.5Z", "2024-05-01T12:00:01.5Z"])
+
+    log.write_text("2024-05-01T12:00:00.1Z a\n"
+                   "2024-05-01T12:00:01.5Z b1\n"
+                   "2024-05-01T12:00:01.5Z b2\n"
+                   "2024-05-01T12:00:01.5Z b3\n"
+                   "2024-05-01T12:00:02Z c\n")
+    lines, _ = run_cli(source)
+    assert lines == ["b3", "c"]
+    assert source.lines_skipped == 2
+    assert source.restarts == 1
+    calls = (fake_cli / "args.txt").read_text().splitlines()
+    assert calls == ["logs --timestamps --since 1s -f valheim",
+                     "logs --timestamps --since 2024-05-01T12:00:01.5Z -f valheim"]
+
+
+def test_engine_frames_split_across_reads(fake_engine):
+    body = (frame(1, "2024-05-01T12:00:00.000000001Z Got connection SteamID 1\n2024-05-01T12:00:01Z par")
+            + frame(1, "tial\n2024-05-01T12:00:01.2Z Closing socket 1\n"))
+    header = b"HTTP/1.0 200 OK\r\nContent-Type: application/vnd.docker.multiplexed-stream\r\n\r\n"
+    data = header + body
+    # Header, Frame-Köpfe und Nutzdaten kommen in Stücken quer zu den Frame-Grenzen an.
+    path, requests = fake_engine(*(data[offset:offset + 7] for offset in range(0, len(data), 7)))
+    source = DockerLogSource("valheim", path)
+    source.restart()
+    stream, _ = _open_docker_stream(PARSER, source)
+    with stream:
+        lines, timestamps = read_all(stream, source, chunk_size=5)
+
+    assert requests[0].startswith("GET /containers/valheim/logs?follow=1&stdout=1&stderr=0&timestamps=1&since=")
+    assert lines == ["Got connection SteamID 1", "partial", "Closing socket 1"]
+    assert timestamps == ["2024-05-01T12:00:00.000000001Z", "2024-05-01T12:00:01Z", "2024-05-01T12:00:01.2Z"]
+    assert source.demuxer.raw is False
+
+
+def test_engine_404_raises_docker_log_error(fake_engine):
+    path, _ = fake_engine(b"HTTP/1.0 404 Not Found\r\nContent-Type: application/json\r\n\r\n"
+                          b'{"message":"No such container: valheim"}\n')
+    source = DockerLogSource("valheim", path)
+    source.restart()
+    stream, _ = _open_docker_stream(PARSER, source)
+    with stream, pytest.raises(DockerLogError, match="404 Not Found.*No such container: valheim"):
+        read_all(stream, source)
+
+
+def test_engine_detects_raw_tty_stream(fake_engine):
+    path, _ = fake_engine(b"HTTP/1.0 200 OK\r\nContent-Type: application/vnd.docker.raw-stream\r\n\r\n2024-05-01T12:00:00Z ",
+                          b"Game server connected\n2024-05-01T12:00:03Z Closing socket 1\n")
+    source = DockerLogSource("valheim", path)
+    source.restart()
+    stream, _ = _open_docker_stream(PARSER, source)
+    with stream:
+        lines, timestamps = read_all(stream, source)
+
+    assert source.demuxer.raw is True
+    assert lines == ["Game server connected", "Closing socket 1"]
+    assert timestamps == ["2024-05-01T12:00:00Z", "2024-05-01T12:00:03Z"]
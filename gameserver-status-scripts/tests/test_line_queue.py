@@ -0,0 +1,87 @@
+"""LineQueue: Hoch-/Niedrigwasser mit den Policies 'drop' und 'block'."""
+import threading
+
+import pytest
+
+from parser_core.line_queue import LineQueue
+
+NOISE = ["02/14/2024 12:00:00: World saved ( 312.112ms )"] * 3
+EVENT = "02/14/2024 12:00:01: Got connection SteamID 76561198000000001"
+
+
+def test_drop_discards_noise_until_low_watermark():
+    queue = LineQueue(high_watermark=10, low_watermark=4, policy="drop", literals=("Got connection",), batch_lines=3)
+    for _ in range(3):
+        queue.put(NOISE)
+    assert not queue.pressure
+    queue.put(NOISE)
+    assert queue.pressure
+    assert queue.pressure_episodes == 1
+
+    # Zwischen Niedrig- und Hochwasser bleibt der Druck bestehen.
+    assert len(queue.get_batch().lines) == 3
+    assert queue.depth == 9 and queue.pressure
+
+    # Nur Zeilen mit Literal und die letzte Zeile (Zeitachse) bleiben, samt ihrer Zeitstempel.
+    queue.put(["noise a", EVENT, "noise b", "noise c"], ["t1", "t2", "t3", "t4"], position=7)
+    assert queue.lines_dropped == 2
+    assert queue.depth == 11
+    assert queue.max_depth == 12
+
+    queue.get_batch()
+    queue.get_batch()
+    assert queue.pressure
+    queue.get_batch()
+    assert queue.depth == 2 and not queue.pressure
+
+    batch = queue.get_batch()
+    assert batch.lines == [EVENT, "noise c"]
+    assert batch.docker_timestamps == ["t2", "t4"]
+    assert batch.position == 7
+
+    # Ohne Druck geht keine Zeile verloren.
+    queue.put(NOISE)
+    assert queue.lines_dropped == 2
+    assert queue.get_batch().lines == NOISE
+    queue.release()
+
+
+def test_block_resumes_reading_only_below_low_watermark():
+    queue = LineQueue(high_watermark=10, low_watermark=4, policy="block", batch_lines=2)
+    for _ in range(5):
+        queue.put(["x", "x"])
+    assert queue.pressure
+
+    writer = threading.Thread(target=queue.put, args=(["y", "y"],))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive()
+
+    # 8 und 6 Zeilen: noch über dem Niedrigwasser, der Lese-Thread bleibt pausiert.
+    for depth in (8, 6):
+        queue.get_batch()
+        assert queue.depth == depth
+        writer.join(0.2)
+        assert writer.is_alive()
+
+    queue.get_batch()
+    writer.join(5)
+    assert not writer.is_alive()
+    assert not queue.pressure
+    assert queue.depth == 6
+    assert queue.lines_dropped == 0
+    assert queue.stall_seconds >= 0.6
+    assert [queue.get_batch().lines for _ in range(3)] == [["x", "x"], ["x", "x"], ["y", "y"]]
+    queue.release()
+
+
+def test_drop_without_literals_falls_back_to_block():
+    queue = LineQueue(high_watermark=10, low_watermark=4, policy="drop", literals=())
+    assert queue.policy == "block"
+    queue.release()
+
+
+@pytest.mark.parametrize("high, low, policy", [(10, 10, "drop"), (10, 4, "spill")])
+def test_invalid_settings(high, low, policy):
+    with pytest.raises(ValueError):
+        LineQueue(high_watermark=high, low_watermark=low, policy=policy)
@@ -0,0 +1,115 @@
+"""Long-Poll und SSE: Wecken durch den ChangeNotifier, Timeout mit 304, Wiederaufnahme per Last-Event-ID."""
+import json
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from modules.change_notifier import ChangeNotifier
+from modules.live_updates import events_response, players_response
+from modules.player_cache import PlayerCache
+from test_player_cache import ALICE, BOB, write_players
+
+# Großzügig, damit ein langsamer Testrechner nicht mit einem Timeout verwechselt wird.
+LONG_POLL_TIMEOUT = 10.0
+
+
+@pytest.fixture
+def players_json(tmp_path):
+    path = str(tmp_path / "players.json")
+    write_players(path, [ALICE])
+    return path
+
+
+@pytest.fixture
+def cache(players_json):
+    # Eigener Notifier pro Test (inotify auf tmp_path); der Cache prüft selbst nur einmal pro Stunde.
+    return PlayerCache(players_json, revalidate_interval=3600, notifier=ChangeNotifier())
+
+
+@pytest.fixture
+def client(cache):
+    app = Flask(__name__)
+    app.add_url_rule("/players", "players", lambda: players_response(cache))
+    app.add_url_rule("/events", "events", lambda: events_response(cache))
+    return app.test_client()
+
+
+def later(seconds, func, *args):
+    timer = threading.Timer(seconds, func, args)
+    timer.start()
+    return timer
+
+
+def test_long_poll_wakes_on_change(client, cache, players_json):
+    version = cache.get().version
+    cache.notifier.ensure_started()
+    timer = later(0.2, write_players, players_json, [ALICE, BOB])
+    started = time.monotonic()
+    response = client.get(f"/players?wait={version}&timeout={LONG_POLL_TIMEOUT}")
+    elapsed = time.monotonic() - started
+    timer.join()
+
+    assert response.status_code == 200
+    assert response.get_json() == [ALICE, BOB]
+    assert int(response.headers["X-Players-Version"]) > version
+    assert elapsed < LONG_POLL_TIMEOUT / 2
+
+
+def test_long_poll_timeout_returns_304(client, cache):
+    version = cache.get().version
+    started = time.monotonic()
+    response = client.get(f"/players?wait={version}&timeout=0.2")
+    assert time.monotonic() - started >= 0.2
+    assert response.status_code == 304
+    assert response.headers["X-Players-Version"] == str(version)
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_long_poll_with_outdated_version_answers_immediately(client, cache):
+    version = cache.get().version
+    started = time.monotonic()
+    response = client.get(f"/players?wait={version - 1}&timeout={LONG_POLL_TIMEOUT}")
+    assert time.monotonic() - started < LONG_POLL_TIMEOUT / 2
+    assert response.status_code == 200
+    assert response.headers["X-Players-Version"] == str(version)
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode("utf-8").strip().split("\n"))
+    return fields["event"], int(fields["id"]), json.loads(fields["data"])
+
+
+def open_stream(client, **headers):
+    response = client.get("/events", headers=headers, buffered=False)
+    assert response.headers["Content-Type"].startswith("text/event-stream")
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 3000\n\n"
+    return response, chunks
+
+
+def test_sse_reconnect_with_current_version_gets_only_deltas(client, cache, players_json):
+    version = cache.get().version
+    cache.notifier.ensure_started()
+    response, chunks = open_stream(client, **{"Last-Event-ID": str(version)})
+    # Kein erneuter Snapshot: das nächste Event ist erst das Delta der folgenden Änderung.
+    timer = later(0.2, write_players, players_json, [ALICE, BOB])
+    event, event_id, data = parse_event(next(chunks))
+    timer.join()
+    response.close()
+
+    assert event == "delta"
+    assert event_id == cache.get().version
+    assert data == {"joined": [BOB], "left": [], "updated": [], "version": event_id, "previous_version": version}
+
+
+def test_sse_reconnect_with_old_version_gets_snapshot(client, cache):
+    version = cache.get().version
+    response, chunks = open_stream(client, **{"Last-Event-ID": str(version - 1)})
+    event, event_id, data = parse_event(next(chunks))
+    response.close()
+
+    assert event == "snapshot"
+    assert event_id == version
+    assert data == {"version": version, "players": [ALICE]}
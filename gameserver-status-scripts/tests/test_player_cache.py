@@ -0,0 +1,122 @@
+"""PlayerCache und snapshot_response: bedingte GETs (ETag, If-Modified-Since), gzip und Wiederverwendung."""
+import gzip
+import json
+import os
+
+import pytest
+from flask import Flask
+
+from modules.change_notifier import ChangeNotifier
+from modules.player_cache import PlayerCache, snapshot_response
+
+ALICE = {"name": "Alice", "steam_id": "76561198000000001", "role": "Admin"}
+BOB = {"name": "Bob", "steam_id": "76561198000000002", "role": "Community"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_players(path, players):
+    """Ersetzt die JSON-Datei wie der Parser atomar; die mtime steigt sicher."""
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(players, f)
+    mtime = max(os.stat(tmp).st_mtime_ns, previous + 1_000_000_000)
+    os.utime(tmp, ns=(mtime, mtime))
+    os.replace(tmp, path)
+
+
+@pytest.fixture
+def players_json(tmp_path):
+    path = str(tmp_path / "players.json")
+    write_players(path, [ALICE])
+    return path
+
+
+@pytest.fixture
+def client(players_json):
+    cache = PlayerCache(players_json, revalidate_interval=0, notifier=ChangeNotifier())
+    app = Flask(__name__)
+    app.add_url_rule("/players", "players", lambda: snapshot_response(cache.get(), max_age=5))
+    return app.test_client()
+
+
+def test_etag_and_if_none_match(client):
+    response = client.get("/players")
+    assert response.status_code == 200
+    assert response.get_json() == [ALICE]
+    etag = response.headers["ETag"]
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Cache-Control"] == "public, max-age=5"
+    assert "Content-Encoding" not in response.headers
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/players", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+    assert client.get("/players", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since(client):
+    last_modified = client.get("/players").headers["Last-Modified"]
+    assert client.get("/players", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/players", headers={"If-Modified-Since": "Thu, 01 Jan 2015 00:00:00 GMT"}).status_code == 200
+    # If-None-Match hat Vorrang.
+    response = client.get("/players", headers={"If-Modified-Since": last_modified, "If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_gzip_negotiation(client):
+    plain = client.get("/players")
+    response = client.get("/players", headers={"Accept-Encoding": "br, gzip;q=0.8"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.data) == plain.data
+    gzip_etag = response.headers["ETag"]
+    assert gzip_etag != plain.headers["ETag"]
+
+    response = client.get("/players", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == gzip_etag
+
+    for accept_encoding in ("gzip;q=0", "identity", "br"):
+        response = client.get("/players", headers={"Accept-Encoding": accept_encoding})
+        assert "Content-Encoding" not in response.headers, accept_encoding
+        assert response.data == plain.data
+
+
+def test_cache_reuses_snapshot_until_stat_changes(players_json, monkeypatch):
+    clock = FakeClock()
+    cache = PlayerCache(players_json, revalidate_interval=1.0, clock=clock, notifier=ChangeNotifier())
+    loads = []
+    load = cache._load
+    monkeypatch.setattr(cache, "_load", lambda *args: loads.append(args) or load(*args))
+
+    first = cache.get()
+    assert first.players == [ALICE]
+    assert len(loads) == 1
+
+    # Innerhalb des Intervalls wird nicht einmal per stat geprüft.
+    write_players(players_json, [ALICE, BOB])
+    clock.now = 0.5
+    assert cache.get() is first
+
+    clock.now = 1.0
+    second = cache.get()
+    assert second.players == [ALICE, BOB]
+    assert second.version > first.version
+    assert second.etag != first.etag
+    assert len(loads) == 2
+
+    # Unveränderte Datei: derselbe Snapshot, nichts neu gelesen.
+    clock.now = 5.0
+    assert cache.get() is second
+    assert len(loads) == 2
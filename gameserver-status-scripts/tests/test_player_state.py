@@ -0,0 +1,165 @@
+"""PlayerStore: aufgezeichnete Enshrouded- und Valheim-Logauszüge abspielen und den Zustand prüfen.
+
+Die Auszüge unter tests/logs/ enthalten Session-Start, Login-Fenster (auch ein verpasstes),
+Berechtigungen, Logout, Peer-Disconnect und eine Wiederverbindung unter demselben Namen.
+"""
+import os
+import time
+
+from parser_core.games import GAME_PARSERS
+from parser_core.player_state import PlayerStore
+
+LOGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+
+def excerpt(game):
+    with open(os.path.join(LOGS, f"{game}_excerpt.log"), encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def new_parser(tmp_path, game):
+    parser = GAME_PARSERS[game]({"output_json_path": str(tmp_path / "players.json")})
+    parser.start()
+    return parser
+
+
+def replay_until(parser, lines, marker):
+    """Verarbeitet die Zeilen bis einschließlich der ersten, die `marker` enthält; gibt den Rest zurück."""
+    end = next(index for index, line in enumerate(lines) if marker in line) + 1
+    parser.process_log_lines(lines[:end])
+    return lines[end:]
+
+
+def indexes(store):
+    return store.key_to_name, store.name_to_key
+
+
+def test_enshrouded_excerpt(tmp_path):
+    parser = new_parser(tmp_path, "enshrouded")
+    store = parser.store
+    lines = excerpt("enshrouded")
+
+    # Session-Start: Handle 3 wartet ohne Namen.
+    rest = replay_until(parser, lines, "Player handle: 3(1)")
+    assert list(store.pending) == [3]
+    assert store.sessions[3].name is None
+    assert not store.active_players
+
+    # Login im Fenster, danach die Berechtigungen.
+    rest = replay_until(parser, rest, "CanKickBan")
+    assert list(store.pending) == []
+    assert store.active_players["Alice"]["id"] == 3
+    assert store.active_players["Alice"]["permissions"] == [
+        "CanAccessInventories", "CanEditBase", "CanExtendBase", "CanKickBan"]
+    assert store.active_players["Alice"]["role"] == "Admin"
+    assert store.awaiting_permissions == 3
+
+    rest = replay_until(parser, rest, "'Bob' logged in")
+    assert store.awaiting_permissions == 4
+
+    # Carol loggt sich erst nach Ablauf der 30 s ein: Handles 5 und 6 verfallen, kein Spieler.
+    rest = replay_until(parser, rest, "'Carol' logged in")
+    assert "Carol" not in store.active_players
+    assert store.pending_expired == 2
+    assert set(store.sessions) == {3, 4}
+    assert store.awaiting_permissions == 4
+
+    # Logout entfernt Bob, der nachfolgende Peer-Disconnect findet nichts mehr.
+    rest = replay_until(parser, rest, "Remove Player 'Bob'")
+    assert set(store.active_players) == {"Alice"}
+    rest = replay_until(parser, rest, "Removed peer #4")
+    assert set(store.sessions) == {3}
+    assert indexes(store) == ({3: "Alice"}, {"Alice": 3})
+
+    # Alice verbindet sich neu, bevor der Disconnect des alten Handles ankommt.
+    rest = replay_until(parser, rest, "'Alice' logged in")
+    assert indexes(store) == ({7: "Alice"}, {"Alice": 7})
+    parser.process_log_lines(rest)
+
+    # Enshrouded loggt nur die Uhrzeit; die EventClock ergänzt das Datum.
+    state = store.to_state()
+    opened = state["sessions"][0][1]
+    assert time.localtime(opened)[3:6] == (20, 21, 0)
+    assert state == {
+        "sessions": [[7, opened, "Alice"]],
+        "pending": [],
+        "active_players": [["Alice", {
+            "id": 7,
+            "name": "Alice",
+            "permissions": ["CanAccessInventories"],
+            "role": "Community",
+            "last_seen": opened + 1.0,
+        }]],
+        "key_to_name": [[7, "Alice"]],
+        "name_to_key": [["Alice", 7]],
+        "awaiting_permissions": 7,
+    }
+    parser.shutdown()
+
+
+def test_valheim_excerpt(tmp_path):
+    parser = new_parser(tmp_path, "valheim")
+    store = parser.store
+    lines = excerpt("valheim")
+    alice, bob, carol = "76561198000000001", "76561198000000002", "76561198000000003"
+
+    rest = replay_until(parser, lines, f"SteamID {alice}")
+    assert list(store.pending) == [alice]
+
+    rest = replay_until(parser, rest, "from Bob")
+    assert indexes(store) == ({alice: "Alice", bob: "Bob"}, {"Alice": alice, "Bob": bob})
+    assert store.awaiting_permissions is None
+
+    # Erneute ZDOID (Respawn) eines aktiven Spielers: nur last_seen, keine neue Session.
+    rest = replay_until(parser, rest, "-123456:7")
+    assert store.active_players["Alice"]["last_seen"] == parser.parse_log_time(
+        "02/14/2024 19:05:00: Got character ZDOID from Alice : -123456:7")
+    assert list(store.pending) == []
+
+    # Carols ZDOID kommt nach Ablauf der 60 s: ihre SteamID verfällt.
+    rest = replay_until(parser, rest, "from Carol")
+    assert "Carol" not in store.active_players
+    assert carol not in store.sessions
+    assert store.pending_expired == 1
+
+    rest = replay_until(parser, rest, f"Closing socket {alice}")
+    assert not store.active_players
+    assert not store.sessions
+    assert indexes(store) == ({}, {})
+
+    parser.process_log_lines(rest)
+    reconnected = parser.parse_log_time("02/14/2024 19:11:40: Got character ZDOID from Alice : -123456:9")
+    assert store.to_state() == {
+        "sessions": [[alice, reconnected - 10.0, "Alice"]],
+        "pending": [],
+        "active_players": [["Alice", {
+            "name": "Alice",
+            "steam_id": alice,
+            "role": "Community",
+            "last_seen": reconnected,
+        }]],
+        "key_to_name": [[alice, "Alice"]],
+        "name_to_key": [["Alice", alice]],
+        "awaiting_permissions": None,
+    }
+    parser.shutdown()
+
+
+def test_reconnect_keeps_player_when_old_session_closes():
+    store = PlayerStore()
+    store.open_session(1, 100.0)
+    assert store.claim_pending(101.0, 30) == 1
+    store.activate(1, "Alice", {"name": "Alice"})
+    store.open_session(2, 200.0)
+    assert store.claim_pending(201.0, 30) == 2
+    store.activate(2, "Alice", {"name": "Alice"})
+    assert indexes(store) == ({2: "Alice"}, {"Alice": 2})
+
+    # Der verspätete Disconnect der alten Session lässt den Spieler aktiv.
+    store.remove_session(1)
+    assert set(store.active_players) == {"Alice"}
+    assert set(store.sessions) == {2}
+
+    restored = PlayerStore()
+    restored.restore(store.to_state())
+    assert restored.to_state() == store.to_state()
@@ -0,0 +1,99 @@
+"""Endzustand der Regressionsabläufe (benchmarks/bench_regression.py) für jedes Spiel und jede Quelle.
+
+Parser, JSON-Datei und API-Cache müssen nach Rotationen, Stream-Abbrüchen und Reconnect-Stürmen
+genau die laut Szenario angemeldeten Spieler mit ihren Rollen zeigen. Die Zeitmessung bleibt
+im Benchmark. Dazu ein Logauszug mit CRLF-Zeilenenden über jeden Lesepfad.
+"""
+import argparse
+import json
+import os
+
+import pytest
+
+from bench_regression import replay
+from parser_core.docker_source import DockerLogSource
+from parser_core.fanout import _static_parse_log_time, match_block
+from parser_core.games import GAME_PARSERS
+from parser_core.replay import replay_log
+from parser_core.tail import FileFollower
+
+ARGS = argparse.Namespace(lines=20000, players=40, noise_ratio=0.9, seed=1, storms=3,
+                          rotations=2, restarts=2, chunk_lines=500)
+# Viking0 bis Viking4 stehen auf der Admin-Liste (Valheim).
+ADMINS = [str(76561198000000000 + index) for index in range(5)]
+
+
+@pytest.mark.parametrize("source", ["file", "docker"])
+@pytest.mark.parametrize("game", ["enshrouded", "valheim"])
+def test_end_state(tmp_path, game, source):
+    admins = ADMINS if game == "valheim" else ()
+    scenario, run, details = replay(game, source, str(tmp_path), ARGS, admins)
+    parser = run.parser
+    key_field = GAME_PARSERS[game].definition.key_field
+
+    # Die Abläufe haben wirklich rotiert bzw. den Stream neu gestartet.
+    assert details.get("rotations", details.get("restarts")) == 2
+    assert scenario.expected
+
+    expected = {name: (key, "Admin" if str(key) in admins else "Community")
+                for name, key in scenario.expected.items()}
+    players = {name: (player[key_field], player["role"]) for name, player in parser.store.active_players.items()}
+    assert players == expected
+    assert parser.store.name_to_key == scenario.expected
+    assert parser.store.key_to_name == {key: name for name, key in scenario.expected.items()}
+
+    snapshot = parser.snapshot_data()
+    with open(run.json_path) as f:
+        assert json.load(f) == snapshot
+    assert run.cache.snapshot.players == snapshot
+
+
+# Enshrouded-Auszug aus tests/logs/ mit CRLF (Windows-Server, Container mit TTY). Die Berechtigungszeilen
+# treffen nur ohne CR am Ende (Regel mit `$`); sonst bliebe Alice ohne Berechtigungen.
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "enshrouded_excerpt.log"), encoding="utf-8") as f:
+    EXCERPT = f.read().splitlines()
+CRLF_EXCERPT = "".join(f"{line}\r\n" for line in EXCERPT).encode("utf-8")
+
+
+def read_file(parser, path):
+    follower = FileFollower(path, start_at_end=False, chunk_size=100)
+    parser.process_log_lines(follower.read_lines())
+    follower.close()
+
+
+def read_blocks(parser, path):
+    follower = FileFollower(path, start_at_end=False, chunk_size=100)
+    text = follower.read_block().decode("utf-8")
+    follower.close()
+    parser.apply_matches(*match_block(parser.matcher, _static_parse_log_time(parser), text), 0.0)
+
+
+def read_replay(parser, path):
+    replay_log(parser, path, include_archives=False)
+
+
+def read_docker(parser, path):
+    # `docker logs --timestamps` eines TTY-Containers, in Stücken quer zu CR und LF.
+    source = DockerLogSource("enshrouded")
+    source.restart()
+    data = b"".join(b"2024-02-14T" + line[3:11].encode("ascii") + b"Z " + line.encode("utf-8") + b"\r\n"
+                    for line in EXCERPT)
+    for offset in range(0, len(data), 13):
+        lines = source.feed(data[offset:offset + 13])
+        if lines:
+            parser.process_log_lines(lines, source.line_timestamps)
+
+
+@pytest.mark.parametrize("read", [read_file, read_blocks, read_replay, read_docker])
+def test_crlf_excerpt(tmp_path, read):
+    path = tmp_path / "enshrouded.log"
+    path.write_bytes(CRLF_EXCERPT)
+    parser = GAME_PARSERS["enshrouded"]({"output_json_path": str(tmp_path / "players.json")})
+    parser.start()
+    read(parser, str(path))
+
+    players = {name: (player["id"], player["permissions"], player["role"])
+               for name, player in parser.store.active_players.items()}
+    assert players == {"Alice": (7, ["CanAccessInventories"], "Community")}
+    assert parser.metrics.events["permission"] == 6
+    parser.shutdown()
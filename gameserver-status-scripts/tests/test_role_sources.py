@@ -0,0 +1,80 @@
+"""Admin-Listen und Rollenregeln: Neuladen und Neuberechnung der Rollen aktiver Spieler."""
+import os
+
+from parser_core.games import GAME_PARSERS
+
+ALICE = "76561198000000001"
+BOB = "76561198000000002"
+LOGINS = [
+    f"02/14/2024 12:00:01: Got connection SteamID {ALICE}",
+    "02/14/2024 12:00:05: Got character ZDOID from Alice : -123456:1",
+    f"02/14/2024 12:00:10: Got connection SteamID {BOB}",
+    "02/14/2024 12:00:15: Got character ZDOID from Bob : -123456:1",
+]
+
+
+def write(path, ids):
+    with open(path, "w") as f:
+        f.write("".join(f"{player_id}\n" for player_id in ids))
+    # Gleiche Größe und mtime innerhalb derselben Zeitscheibe: stat-Schlüssel sicher ändern.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def valheim_parser(tmp_path, **settings):
+    settings = {
+        "output_json_path": str(tmp_path / "players.json"),
+        "admin_list_path": str(tmp_path / "adminlist.txt"),
+        "permitted_list_path": str(tmp_path / "permittedlist.txt"),
+        "server_list_roles": "true",
+        **settings,
+    }
+    parser = GAME_PARSERS["valheim"](settings)
+    parser.start()
+    parser.process_log_lines(LOGINS)
+    return parser
+
+
+def roles(parser):
+    return {name: player["role"] for name, player in parser.store.active_players.items()}
+
+
+def test_admin_promotion_recomputes_only_that_player(tmp_path):
+    write(tmp_path / "adminlist.txt", [])
+    parser = valheim_parser(tmp_path)
+    assert roles(parser) == {"Alice": "Community", "Bob": "Community"}
+    writes = parser.snapshot_writer.writes_performed
+
+    write(tmp_path / "adminlist.txt", [ALICE])
+    parser.reload_role_sources()
+    assert roles(parser) == {"Alice": "Admin", "Bob": "Community"}
+    parser.snapshot_writer.flush()
+    assert parser.snapshot_writer.writes_performed == writes + 1
+    parser.shutdown()
+
+
+def test_server_list_roles_are_off_by_default(tmp_path):
+    write(tmp_path / "permittedlist.txt", [ALICE])
+    parser = valheim_parser(tmp_path, server_list_roles="false")
+    assert parser.role_sources["permitted"].path is None
+    assert roles(parser) == {"Alice": "Community", "Bob": "Community"}
+    parser.shutdown()
+
+
+def test_permitted_list_becoming_non_empty_recomputes_all_players(tmp_path):
+    write(tmp_path / "permittedlist.txt", [])
+    parser = valheim_parser(tmp_path)
+    assert roles(parser) == {"Alice": "Community", "Bob": "Community"}
+
+    # Nur Alice steht auf der Liste; als Whitelist betrifft sie aber auch Bob.
+    write(tmp_path / "permittedlist.txt", [ALICE])
+    parser.reload_role_sources()
+    fresh = valheim_parser(tmp_path)
+    assert roles(parser) == roles(fresh) == {"Alice": "Community", "Bob": "Guest"}
+
+    # Leer: die Whitelist gilt nicht mehr, auch Bob ist wieder Community.
+    write(tmp_path / "permittedlist.txt", [])
+    parser.reload_role_sources()
+    assert roles(parser) == {"Alice": "Community", "Bob": "Community"}
+    parser.shutdown()
+    fresh.shutdown()